@@ -1,38 +1,74 @@
 """
 Authentication API endpoints.
-Handles user login and registration.
+Handles user login, registration and token refresh.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from ..database.connection import get_db
-from ..schemas.schemas import LoginRequest, LoginResponse, RegisterRequest
-from ..services.auth_service import AuthService
-from ..core.security import get_current_user_id
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database.connection import get_async_db
+from ..schemas.schemas import LoginRequest, LoginResponse, RegisterRequest, RefreshRequest
+from ..services.auth_service import AsyncAuthService
+from ..services.login_throttle import login_throttle
+from ..core.security import get_current_user_id, get_current_principal, Principal
 
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/login", response_model=LoginResponse)
-def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+async def login(request: Request, login_data: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Login endpoint.
     
     Authenticates user and returns JWT token with user data.
+    The password is checked in a worker process.
+    Attempts are rate limited per client IP and per username; rejected
+    attempts get 429 with a Retry-After header.
     """
-    return AuthService.login(db, login_data)
+    # Behind a proxy listed in FORWARDED_ALLOW_IPS, uvicorn has already
+    # replaced this with the client address from X-Forwarded-For
+    client_ip = request.client.host if request.client else "unknown"
+    login_throttle.check(client_ip, login_data.username)
+    return await AsyncAuthService.login(db, login_data)
 
 
 @router.post("/register", response_model=LoginResponse, status_code=status.HTTP_201_CREATED)
-def register(register_data: RegisterRequest, db: Session = Depends(get_db)):
+async def register(register_data: RegisterRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Registration endpoint.
     
     Creates a new user and optionally a new group.
     Returns JWT token with user data.
     """
-    return AuthService.register(db, register_data)
+    return await AsyncAuthService.register(db, register_data)
+
+
+@router.post("/refresh", response_model=LoginResponse)
+async def refresh(refresh_data: RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Token refresh endpoint.
+    
+    Exchanges a refresh token for a new access token and a new refresh
+    token. Each refresh token works once; reusing one revokes all of the
+    user's sessions.
+    """
+    return await AsyncAuthService.refresh(db, refresh_data.refresh_token)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    logout_data: Optional[RefreshRequest] = None,
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Logout endpoint.
+    
+    Revokes the access token used for this request and, if given, the
+    session's refresh token.
+    """
+    await AsyncAuthService.logout(db, principal, logout_data.refresh_token if logout_data else None)
 
 
 @router.post("/verify")
@@ -5,12 +5,13 @@ Handles fuel log creation and retrieval.
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from ..database.connection import get_db
+from ..database.connection import get_db, get_async_db
 from ..schemas.schemas import FuelLogCreate, FuelLogResponse
-from ..services.fuel_service import FuelLogService
-from ..services.websocket_manager import manager
-from ..core.security import get_current_user_id, get_current_user_group_id
+from ..services.fuel_service import FuelLogService, AsyncFuelLogService
+from ..services.outbox_service import outbox_dispatcher
+from ..core.security import get_current_user_id
 
 
 router = APIRouter(prefix="/fuel-logs", tags=["Fuel Logs"])
@@ -20,19 +21,17 @@ router = APIRouter(prefix="/fuel-logs", tags=["Fuel Logs"])
 async def create_fuel_log(
     fuel_log_data: FuelLogCreate,
     user_id: int = Depends(get_current_user_id),
-    group_id: int = Depends(get_current_user_group_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new fuel log.
     
     Records fuel usage for a reservation and updates user's fuel balance.
     """
-    fuel_log = FuelLogService.create_fuel_log(db, user_id, fuel_log_data)
+    fuel_log = await AsyncFuelLogService.create_fuel_log(db, user_id, fuel_log_data)
     
-    # Broadcast to WebSocket clients
-    fuel_log_dict = FuelLogResponse.model_validate(fuel_log).model_dump(mode='json')
-    await manager.broadcast_fuel_log_created(fuel_log_dict, group_id)
+    # The event was committed to the outbox; broadcast it in the background
+    outbox_dispatcher.notify()
     
     return fuel_log
 
@@ -3,16 +3,21 @@ Reservations API endpoints.
 Handles CRUD operations for car reservations.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from datetime import datetime
-from ..database.connection import get_db
+from datetime import datetime, timedelta
+from ..database.connection import get_db, get_async_db, SessionLocal
 from ..schemas.schemas import (
-    ReservationCreate, ReservationUpdate, ReservationResponse, ReservationStatus
+    ReservationCreate, ReservationUpdate, ReservationResponse, ReservationStatus,
+    AvailabilityWindow, AvailabilityResponse,
+    ReservationSeriesCreate, ReservationSeriesResponse, SeriesConflict,
+    ReservationChangesResponse
 )
-from ..services.reservation_service import ReservationService
-from ..services.websocket_manager import manager
+from ..services.reservation_service import ReservationService, AsyncReservationService
+from ..services.outbox_service import outbox_dispatcher
 from ..core.security import get_current_user_id, get_current_user_group_id, get_current_user_is_admin
 
 
@@ -25,7 +30,7 @@ async def create_reservation(
     user_id: int = Depends(get_current_user_id),
     group_id: int = Depends(get_current_user_group_id),
     is_admin: bool = Depends(get_current_user_is_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new reservation.
@@ -33,23 +38,60 @@ async def create_reservation(
     Validates against rules and checks for overlaps.
     Broadcasts to WebSocket clients on success.
     """
-    reservation = ReservationService.create_reservation(
+    reservation = await AsyncReservationService.create_reservation(
         db, user_id, group_id, reservation_data, is_admin
     )
     
-    # Broadcast to WebSocket clients
-    reservation_dict = ReservationResponse.model_validate(reservation).model_dump(mode='json')
-    await manager.broadcast_reservation_created(reservation_dict, group_id)
+    # The event was committed to the outbox; broadcast it in the background
+    outbox_dispatcher.notify()
     
     return reservation
 
 
+@router.post("/series", response_model=ReservationSeriesResponse, status_code=status.HTTP_201_CREATED)
+async def create_reservation_series(
+    series_data: ReservationSeriesCreate,
+    user_id: int = Depends(get_current_user_id),
+    group_id: int = Depends(get_current_user_group_id),
+    is_admin: bool = Depends(get_current_user_is_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Create a recurring reservation series.
+    
+    Expands the recurrence on the server and books every occurrence that
+    passes the rules and does not overlap an existing reservation.
+    Occurrences that could not be booked are listed under "conflicts".
+    Broadcasts a single event to WebSocket clients.
+    """
+    created, conflicts = await AsyncReservationService.create_reservation_series(
+        db, user_id, group_id, series_data, is_admin
+    )
+    
+    created_data = [ReservationResponse.model_validate(reservation) for reservation in created]
+    
+    # The event was committed to the outbox; broadcast it in the background
+    if created_data:
+        outbox_dispatcher.notify()
+    
+    return ReservationSeriesResponse(
+        created=created_data,
+        conflicts=[
+            SeriesConflict(start_time=start, end_time=end, reason=reason)
+            for start, end, reason in conflicts
+        ]
+    )
+
+
 @router.get("", response_model=List[ReservationResponse])
 def get_reservations(
+    response: Response,
     status: Optional[ReservationStatus] = Query(None),
     user_id_filter: Optional[int] = Query(None, alias="user_id"),
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=500),
     group_id: int = Depends(get_current_user_group_id),
     db: Session = Depends(get_db)
 ):
@@ -61,36 +103,117 @@ def get_reservations(
     - user_id: Filter by user ID
     - start_date: Filter by start date (reservations starting after this date)
     - end_date: Filter by end date (reservations ending before this date)
+    - limit: Page size; without it every matching reservation is returned
+    - cursor: Value of the X-Next-Cursor header from the previous page
+    
+    Results are ordered by start time, newest first. When more rows are
+    available the response carries an X-Next-Cursor header.
     """
-    reservations = ReservationService.get_reservations(
-        db, group_id, status, user_id_filter, start_date, end_date
+    reservations, next_cursor = ReservationService.get_reservations(
+        db, group_id, status, user_id_filter, start_date, end_date, cursor, limit
     )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return reservations
 
 
-@router.get("/{reservation_id}", response_model=ReservationResponse)
-def get_reservation(
-    reservation_id: int,
+@router.get("/stream")
+def stream_reservations(
+    status: Optional[ReservationStatus] = Query(None),
+    user_id_filter: Optional[int] = Query(None, alias="user_id"),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    group_id: int = Depends(get_current_user_group_id)
+):
+    """
+    Stream reservations as newline-delimited JSON.
+    
+    Takes the same filters as GET /reservations. Rows are read from the
+    database in chunks and written out as they are serialized, so memory
+    use does not grow with the size of the group's history.
+    """
+    def generate():
+        # The request's get_db session is closed before the body is sent,
+        # so the stream owns its own session.
+        db = SessionLocal()
+        try:
+            for reservation in ReservationService.stream_reservations(
+                db, group_id, status, user_id_filter, start_date, end_date
+            ):
+                yield ReservationResponse.model_validate(reservation).model_dump_json() + "\n"
+        finally:
+            db.close()
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@router.get("/changes", response_model=ReservationChangesResponse)
+def get_reservation_changes(
+    since: Optional[str] = Query(None),
+    limit: int = Query(500, ge=1, le=1000),
     group_id: int = Depends(get_current_user_group_id),
     db: Session = Depends(get_db)
 ):
     """
-    Get a specific reservation by ID.
+    Get reservations created, updated or cancelled since a cursor.
+    
+    Query parameters:
+    - since: next_cursor from the previous call; omit to start from the beginning
+    - limit: Maximum number of changes to return
+    
+    Clients should apply changes by ID and call again while has_more is true.
     """
-    from ..models.models import Reservation
+    changes, next_cursor, has_more = ReservationService.get_changes(db, group_id, since, limit)
+    return ReservationChangesResponse(
+        changes=changes, next_cursor=next_cursor, has_more=has_more
+    )
+
+
+@router.get("/availability", response_model=AvailabilityResponse)
+def get_availability(
+    range_start: datetime = Query(..., alias="from"),
+    range_end: datetime = Query(..., alias="to"),
+    min_duration: int = Query(0, ge=0, description="Minimum window length in minutes"),
+    group_id: int = Depends(get_current_user_group_id),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the free windows of the car within a time range.
     
-    reservation = db.query(Reservation).filter(
-        Reservation.id == reservation_id,
-        Reservation.group_id == group_id
-    ).first()
+    Query parameters:
+    - from: Start of the searched range
+    - to: End of the searched range
+    - min_duration: Only return windows at least this many minutes long
     
-    if not reservation:
+    The range is trimmed by the group's advance_booking_days rule, and
+    max_reservation_hours is returned so clients can size bookings.
+    """
+    if range_end <= range_start:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Reservation not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'to' must be after 'from'"
         )
     
-    return reservation
+    windows, max_hours = ReservationService.get_availability(
+        db, group_id, range_start, range_end, timedelta(minutes=min_duration)
+    )
+    
+    return AvailabilityResponse(
+        windows=[AvailabilityWindow(start_time=start, end_time=end) for start, end in windows],
+        max_reservation_hours=max_hours
+    )
+
+
+@router.get("/{reservation_id}", response_model=ReservationResponse)
+def get_reservation(
+    reservation_id: int,
+    group_id: int = Depends(get_current_user_group_id),
+    db: Session = Depends(get_db)
+):
+    """
+    Get a specific reservation by ID.
+    """
+    return ReservationService.get_reservation(db, reservation_id, group_id)
 
 
 @router.put("/{reservation_id}", response_model=ReservationResponse)
@@ -100,7 +223,7 @@ async def update_reservation(
     user_id: int = Depends(get_current_user_id),
     group_id: int = Depends(get_current_user_group_id),
     is_admin: bool = Depends(get_current_user_is_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update a reservation.
@@ -108,13 +231,12 @@ async def update_reservation(
     Users can update their own reservations.
     Admins can update any reservation.
     """
-    reservation = ReservationService.update_reservation(
+    reservation = await AsyncReservationService.update_reservation(
         db, reservation_id, user_id, group_id, update_data, is_admin
     )
     
-    # Broadcast to WebSocket clients
-    reservation_dict = ReservationResponse.model_validate(reservation).model_dump(mode='json')
-    await manager.broadcast_reservation_updated(reservation_dict, group_id)
+    # The event was committed to the outbox; broadcast it in the background
+    outbox_dispatcher.notify()
     
     return reservation
 
@@ -123,9 +245,8 @@ async def update_reservation(
 async def delete_reservation(
     reservation_id: int,
     user_id: int = Depends(get_current_user_id),
-    group_id: int = Depends(get_current_user_group_id),
     is_admin: bool = Depends(get_current_user_is_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete/cancel a reservation.
@@ -133,9 +254,9 @@ async def delete_reservation(
     Users can delete their own reservations.
     Admins can delete any reservation.
     """
-    ReservationService.delete_reservation(db, reservation_id, user_id, is_admin)
+    await AsyncReservationService.delete_reservation(db, reservation_id, user_id, is_admin)
     
-    # Broadcast to WebSocket clients
-    await manager.broadcast_reservation_deleted(reservation_id, group_id)
+    # The event was committed to the outbox; broadcast it in the background
+    outbox_dispatcher.notify()
     
     return None
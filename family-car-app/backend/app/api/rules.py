@@ -9,6 +9,8 @@ from typing import List
 from ..database.connection import get_db
 from ..schemas.schemas import RuleCreate, RuleUpdate, RuleResponse
 from ..models.models import Rule
+from ..services.outbox_service import OutboxService
+from ..services.rule_cache import rule_cache
 from ..core.security import get_current_user_group_id, require_admin
 
 
@@ -34,8 +36,12 @@ def create_rule(
     )
     
     db.add(new_rule)
+    db.flush()
+    # Tells other workers to drop their cached rules; sent on the next outbox poll
+    OutboxService.add(db, group_id, "rules_updated", {"id": new_rule.id})
     db.commit()
     db.refresh(new_rule)
+    rule_cache.invalidate(group_id)
     
     return new_rule
 
@@ -94,8 +100,10 @@ def update_rule(
     for key, value in update_dict.items():
         setattr(rule, key, value)
     
+    OutboxService.add(db, group_id, "rules_updated", {"id": rule.id})
     db.commit()
     db.refresh(rule)
+    rule_cache.invalidate(group_id)
     
     return rule
 
@@ -121,7 +129,9 @@ def delete_rule(
             detail="Rule not found"
         )
     
+    OutboxService.add(db, group_id, "rules_updated", {"id": rule.id})
     db.delete(rule)
     db.commit()
+    rule_cache.invalidate(group_id)
     
     return None
@@ -2,61 +2,176 @@
 WebSocket endpoint for real-time updates.
 """
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, Depends, HTTPException
+from ..services.reservation_service import ReservationService
 from ..services.websocket_manager import manager
-from ..core.security import decode_access_token
+from ..services.topic_index import EVENT_TYPES, Subscription
+from ..services.ws_codecs import negotiate, decode
+from ..core.timezones import to_utc_naive
+from ..core.security import principal_from_token, get_current_user_group_id, require_admin
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Close code for invalid subscription parameters. Application codes
+# (4000-4999) keep it apart from 1008, which clients treat as an auth failure.
+INVALID_SUBSCRIPTION_CLOSE_CODE = 4400
+
+
+def parse_subscription(
+    user_id: int,
+    events=None,
+    mine: bool = False,
+    window_start=None,
+    window_end=None
+) -> Subscription:
+    """
+    Build a subscription from query parameters or a subscribe message.
+    
+    Args:
+        user_id: ID of the connected user, used when mine is set
+        events: Event types, as a list or a comma-separated string; None for all
+        mine: Only events about the user's own reservations and fuel logs
+        window_start: Start of the time window (datetime or ISO 8601 string)
+        window_end: End of the time window
+        
+    Returns:
+        The subscription
+        
+    Raises:
+        ValueError: If an event type or the time window is invalid
+    """
+    if isinstance(events, str):
+        events = [event.strip() for event in events.split(",") if event.strip()]
+    if events is not None:
+        unknown = set(events) - EVENT_TYPES
+        if unknown:
+            raise ValueError(f"Unknown event types: {', '.join(sorted(unknown))}")
+        events = frozenset(events)
+    
+    bounds = []
+    for value in (window_start, window_end):
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        bounds.append(to_utc_naive(value))
+    window_start, window_end = bounds
+    if (window_start is None) != (window_end is None):
+        raise ValueError("A time window needs both from and to")
+    if window_start is not None and window_start >= window_end:
+        raise ValueError("from must be before to")
+    
+    return Subscription(
+        events=events,
+        user_id=user_id if mine else None,
+        window_start=window_start,
+        window_end=window_end,
+    )
+
 
 @router.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket, token: str = Query(...)):
+async def websocket_endpoint(
+    websocket: WebSocket,
+    token: str = Query(...),
+    resume_from: Optional[int] = Query(None, ge=0),
+    epoch: Optional[str] = Query(None),
+    encoding: Optional[str] = Query(None),
+    events: Optional[str] = Query(None),
+    mine: bool = Query(False),
+    window_start: Optional[datetime] = Query(None, alias="from"),
+    window_end: Optional[datetime] = Query(None, alias="to")
+):
     """
     WebSocket endpoint for real-time updates.
     
     Clients must provide a valid JWT token as a query parameter.
-    Messages are broadcasted to all clients in the same group.
+    Group events are sent to the clients in the same group that subscribed
+    to them; without subscription parameters a client receives them all.
+    A `subscribe` message replaces the subscription at any time.
     
     Query parameters:
     - token: JWT authentication token
+    - resume_from: Last `seq` received before reconnecting; missed events are replayed,
+      or a `snapshot_required` message is sent if they are no longer buffered
+    - epoch: `epoch` from the previous `connected` message
+    - encoding: `json` (default), `msgpack` or `cbor`; may instead be negotiated
+      with the `familycar.<encoding>` subprotocol
+    - events: Comma-separated event types to receive
+    - mine: Only events about the user's own reservations and fuel logs
+    - from, to: Only reservations overlapping this time window
     """
+    group_id = None
     try:
-        # Verify token and extract group_id
-        payload = decode_access_token(token)
-        group_id = payload.get("group_id")
-        user_id = payload.get("sub")
-        
-        if not group_id or not user_id:
+        # Verify token (or find it in the token cache) and extract group_id
+        try:
+            principal = principal_from_token(token)
+        except HTTPException:
+            principal = None
+        if principal is None or not principal.group_id:
             await websocket.close(code=1008, reason="Invalid token")
             return
+        user_id = principal.user_id
+        group_id = principal.group_id
+        
+        try:
+            subscription = parse_subscription(user_id, events, mine, window_start, window_end)
+        except ValueError as e:
+            await websocket.close(code=INVALID_SUBSCRIPTION_CLOSE_CODE, reason=str(e))
+            return
         
-        # Connect to WebSocket
-        await manager.connect(websocket, group_id)
+        wire_encoding, subprotocol = negotiate(encoding, websocket.scope.get("subprotocols", []))
         
-        # Send connection confirmation
-        await manager.send_personal_message({
-            "type": "connected",
-            "data": {"user_id": user_id, "group_id": group_id}
-        }, websocket)
+        # Lets the client catch up over /reservations/changes if it is later
+        # told to take a snapshot, e.g. after a restart
+        changes_cursor = ReservationService.get_changes_cursor()
         
-        # Keep connection alive and listen for messages
-        try:
-            while True:
-                # Receive messages (for ping/pong or client-initiated events)
-                data = await websocket.receive_text()
-                
-                # Echo back for now (can be extended for client-initiated events)
-                await manager.send_personal_message({
-                    "type": "echo",
-                    "data": data
-                }, websocket)
-                
-        except WebSocketDisconnect:
-            manager.disconnect(websocket, group_id)
-            logger.info(f"Client disconnected from group {group_id}")
+        # Connect to WebSocket, confirm, and replay missed events
+        await manager.connect(
+            websocket,
+            group_id,
+            greeting={
+                "type": "connected",
+                "data": {"user_id": user_id, "group_id": group_id, "changes_cursor": changes_cursor}
+            },
+            resume_from=resume_from,
+            epoch=epoch,
+            encoding=wire_encoding,
+            subprotocol=subprotocol,
+            subscription=subscription,
+        )
+        
+        # Listen for pongs, client pings and subscription changes; any message proves the client is alive
+        while True:
+            received = await websocket.receive()
+            if received["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(received.get("code", 1000))
+            manager.touch(websocket)
+            
+            try:
+                message = decode(received.get("text") or received.get("bytes") or "", wire_encoding)
+            except ValueError:
+                continue
+            if not isinstance(message, dict):
+                continue
+            if message.get("type") == "ping":
+                await manager.send_personal_message({"type": "pong", "data": message.get("data")}, websocket)
+            elif message.get("type") == "subscribe":
+                data = message.get("data") or {}
+                try:
+                    subscription = parse_subscription(
+                        user_id, data.get("events"), bool(data.get("mine")), data.get("from"), data.get("to")
+                    )
+                except (ValueError, TypeError, AttributeError) as e:
+                    await manager.send_personal_message({"type": "error", "data": {"detail": str(e)}}, websocket)
+                    continue
+                manager.subscribe(websocket, subscription)
+                await manager.send_personal_message({"type": "subscribed", "data": subscription.describe()}, websocket)
+    
+    except WebSocketDisconnect:
+        logger.info(f"Client disconnected from group {group_id}")
     
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
@@ -64,3 +179,21 @@ async def websocket_endpoint(websocket: WebSocket, token: str = Query(...)):
             await websocket.close(code=1011, reason="Internal server error")
         except:
             pass
+    
+    finally:
+        if group_id is not None:
+            manager.disconnect(websocket, group_id)
+
+
+@router.get("/ws/metrics", tags=["WebSocket"])
+def websocket_metrics(
+    group_id: int = Depends(get_current_user_group_id),
+    _: bool = Depends(require_admin)
+):
+    """
+    Get WebSocket queue metrics for the current group (admin only).
+    
+    Connection and queue figures cover the group's connections on this
+    worker; eviction counters are totals for the worker.
+    """
+    return manager.get_metrics(group_id)
@@ -4,7 +4,7 @@ Loads environment variables and provides centralized config.
 """
 
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 import os
 
 
@@ -17,24 +17,93 @@ class Settings(BaseSettings):
     DB_USER: str = "root"
     DB_PASSWORD: str = ""
     DB_NAME: str = "family_car_db"
+    ASYNC_DB_DRIVER: str = "aiomysql"
+    DATABASE_URL: Optional[str] = None  # Full override, e.g. sqlite:///./family_car.db
+    ASYNC_DATABASE_URL: Optional[str] = None  # Full override, e.g. sqlite+aiosqlite:///./family_car.db
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-this-in-production-min-32-chars"
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 10080  # 7 days
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15  # Clients renew them with a refresh token
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    REFRESH_REUSE_GRACE_SECONDS: int = 10  # A just-rotated refresh token used again gets the same successor
+    REVOCATION_REFRESH_SECONDS: float = 30  # How often each worker reloads revoked access tokens
+    REVOCATION_FALSE_POSITIVE_RATE: float = 0.001  # Valid tokens wrongly rejected (and refreshed)
+    TOKEN_CACHE_SIZE: int = 10000  # Verified tokens remembered per worker; 0 disables the cache
+    PASSWORD_HASH_WORKERS: int = 2  # Processes running bcrypt per worker; 0 runs it in threads
+    BCRYPT_ROUNDS: int = 12  # Cost of new password hashes; weaker hashes are rehashed on login
+    BCRYPT_TARGET_MS: int = 0  # If set, pick the cost at startup so one hash takes at most this long
+    
+    # Login throttling (token buckets per client IP and per username)
+    LOGIN_THROTTLE_ENABLED: bool = True
+    LOGIN_IP_BURST: int = 20
+    LOGIN_IP_PER_MINUTE: float = 10
+    LOGIN_USERNAME_BURST: int = 5
+    LOGIN_USERNAME_PER_MINUTE: float = 2
+    LOGIN_THROTTLE_MAX_KEYS: int = 10000  # Buckets kept per worker for each of IPs and usernames
+    # Reverse proxies whose X-Forwarded-For is trusted for the client IP (comma-separated, as in uvicorn)
+    FORWARDED_ALLOW_IPS: str = "127.0.0.1"
     
     # Application
     APP_NAME: str = "Family Car Manager"
     API_VERSION: str = "1.0.0"
     DEBUG: bool = True
-    
+    WORKERS: int = 1  # Uvicorn worker processes; use WS_EVENT_BUS=unix when above 1. DEBUG reload needs 1
+
+    # Reservations
+    RESERVATION_INDEX_ENABLED: bool = True
+    RESERVATION_INDEX_TTL_SECONDS: int = 300  # Reload a group's interval index after this long
+    MAX_SERIES_OCCURRENCES: int = 366
+    RESERVATION_STREAM_CHUNK_SIZE: int = 500  # Rows fetched per round trip when streaming
+    RESERVATION_SLOT_MINUTES: int = 15  # Granularity of the reservation_slots occupancy table
+    CHANGES_SAFETY_WINDOW_SECONDS: int = 5  # Delta sync re-sends rows this recent
+
+    # Archive
+    ARCHIVE_AFTER_DAYS: int = 90  # Completed/cancelled reservations older than this move to history
+    ARCHIVE_BATCH_SIZE: int = 500  # Rows moved per transaction
+    ARCHIVE_BATCH_PAUSE_SECONDS: float = 0.1  # Pause between batches to let other writers in
+
+    # Outbox
+    OUTBOX_BATCH_SIZE: int = 100  # Events claimed and broadcast per dispatcher transaction
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 1.0  # Check for events left by crashed or other workers
+    OUTBOX_CLAIM_TIMEOUT_SECONDS: int = 30  # Events claimed longer ago are taken to be lost and re-sent
+
+    # Rules
+    RULE_CACHE_MAX_GROUPS: int = 1000
+    RULE_CACHE_TTL_SECONDS: int = 60
+
+    # WebSocket
+    WS_SEND_TIMEOUT_SECONDS: float = 5.0  # Sockets slower than this to accept a frame are evicted
+    WS_SEND_QUEUE_SIZE: int = 100  # Frames waiting per connection
+    WS_OVERFLOW_POLICY: str = "drop_oldest"  # drop_oldest, coalesce or disconnect
+    WS_SLOW_CONSUMER_CLOSE_CODE: int = 1013  # Close code sent to evicted clients (try again later)
+    WS_REPLAY_BUFFER_SIZE: int = 256  # Recent events kept per group for resuming clients
+    WS_REPLAY_MAX_GROUPS: int = 10000
+    WS_HEARTBEAT_INTERVAL_SECONDS: float = 25.0  # Server ping interval; 0 disables heartbeat and reaper
+    WS_IDLE_TIMEOUT_SECONDS: float = 60.0  # Connections silent for this long are closed
+    WS_PER_MESSAGE_DEFLATE: bool = True  # Offer permessage-deflate to clients that ask for it
+    WS_COALESCE_WINDOW_MS: int = 0  # Hold group events this long to merge bursts; 0 sends at once
+    WS_COALESCE_MAX_EVENTS: int = 100  # Flush a window early once it holds this many events
+    WS_EVENT_BUS: str = "memory"  # memory (one worker), unix (one host) or module:ClassName
+    WS_EVENT_BUS_SOCKET_DIR: str = "/tmp/family-car-events"
+    WS_EVENT_BUS_BUFFER_BYTES: int = 1048576
+
     # CORS
     CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:3001", "http://localhost:5173"]
     
     @property
     def database_url(self) -> str:
-        """Construct database URL from components."""
+        """Construct database URL from components, unless one is given explicitly."""
+        if self.DATABASE_URL:
+            return self.DATABASE_URL
         return f"mysql+mysqlconnector://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+
+    @property
+    def async_database_url(self) -> str:
+        """Construct async database URL, unless one is given explicitly."""
+        if self.ASYNC_DATABASE_URL:
+            return self.ASYNC_DATABASE_URL
+        return f"mysql+{self.ASYNC_DB_DRIVER}://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
     
     class Config:
         env_file = ".env"
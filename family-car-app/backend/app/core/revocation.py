@@ -0,0 +1,94 @@
+"""
+In-memory filter of revoked access tokens.
+Holds the JWT IDs (jti) of revoked, not yet expired access tokens in a Bloom
+filter, so checking a token on every request is a few bit probes instead of
+a database query. The filter is rebuilt from the revoked_tokens table every
+REVOCATION_REFRESH_SECONDS (see token_service.RevocationRefresher).
+"""
+
+import hashlib
+import math
+import threading
+from typing import Iterable, Set
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter of strings.
+
+    Never misses an added item. Reports an item that was not added with
+    probability about false_positive_rate while it holds at most capacity
+    items.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float):
+        capacity = max(1, capacity)
+        self.size = max(8, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationFilter:
+    """
+    Revoked token IDs of this worker, in a Bloom filter.
+
+    A false positive rejects a valid token with 401; the client then gets a
+    new access token (with a new jti) from /auth/refresh.
+    """
+
+    # Smallest capacity a rebuilt filter is sized for, so revocations added
+    # between rebuilds keep the false positive rate near its target
+    MIN_CAPACITY = 1024
+
+    def __init__(self, false_positive_rate: float):
+        self.false_positive_rate = false_positive_rate
+        self._filter = BloomFilter(self.MIN_CAPACITY, false_positive_rate)
+        # Added since the last rebuild, which may have read the table before they were written
+        self._recent: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def might_contain(self, jti: str) -> bool:
+        """Check a token ID; False means certainly not revoked."""
+        return jti in self._filter
+
+    def add(self, jti: str) -> None:
+        """Add a token revoked by this worker, without waiting for the next rebuild."""
+        with self._lock:
+            self._filter.add(jti)
+            self._recent.add(jti)
+
+    def replace(self, jtis: Iterable[str]) -> None:
+        """
+        Swap in a filter built from the full list of revoked token IDs.
+
+        Args:
+            jtis: IDs of all revoked, unexpired access tokens
+        """
+        jtis = list(jtis)
+        rebuilt = BloomFilter(max(self.MIN_CAPACITY, 2 * len(jtis)), self.false_positive_rate)
+        for jti in jtis:
+            rebuilt.add(jti)
+        with self._lock:
+            for jti in self._recent:
+                rebuilt.add(jti)
+            self._recent.clear()
+            self._filter = rebuilt
+
+    def __len__(self) -> int:
+        return self._filter.count
@@ -3,17 +3,37 @@ Security and authentication utilities.
 Handles JWT tokens, password hashing, and user verification.
 """
 
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from passlib.hash import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from .config import settings
+from .revocation import RevocationFilter
 
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context. Hashes below the current cost are rehashed on login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# Calibration never picks a cost below this, however small the latency budget
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 20
 
 # Security scheme for token authentication
 security = HTTPBearer()
@@ -24,9 +44,153 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
-def get_password_hash(password: str) -> str:
-    """Generate a password hash."""
-    return pwd_context.hash(password)
+def get_password_hash(password: str, rounds: Optional[int] = None) -> str:
+    """Generate a password hash, at the current cost unless rounds is given."""
+    if rounds is None:
+        return pwd_context.hash(password)
+    return bcrypt.using(rounds=rounds).hash(password)
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Check whether a hash is weaker than the current cost."""
+    return pwd_context.needs_update(hashed_password)
+
+
+def bcrypt_rounds() -> int:
+    """Get the current bcrypt cost."""
+    return pwd_context.handler("bcrypt").default_rounds
+
+
+def set_bcrypt_rounds(rounds: int) -> None:
+    """
+    Change the bcrypt cost of new hashes.
+    
+    Existing hashes below the new cost are rehashed on the user's next
+    login; stronger ones are kept.
+    """
+    pwd_context.update(bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds)
+
+
+def time_bcrypt(rounds: int, samples: int = 2) -> float:
+    """Measure a bcrypt hash at the given cost on this host; best of samples, in milliseconds."""
+    handler = bcrypt.using(rounds=rounds)
+    best = float("inf")
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.hash("calibration")
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def calibrate_bcrypt_rounds(target_ms: float) -> int:
+    """
+    Pick the highest bcrypt cost whose hash time fits a latency budget.
+    
+    Each extra round doubles the hash time, so rounds are tried upwards from
+    BCRYPT_MIN_ROUNDS until the next one would not fit.
+    
+    Args:
+        target_ms: Latency budget for one hash, in milliseconds
+        
+    Returns:
+        bcrypt cost, at least BCRYPT_MIN_ROUNDS
+    """
+    rounds = BCRYPT_MIN_ROUNDS
+    elapsed = time_bcrypt(rounds)
+    while rounds < BCRYPT_MAX_ROUNDS and elapsed * 2 <= target_ms:
+        rounds += 1
+        elapsed = time_bcrypt(rounds)
+    if elapsed > target_ms and rounds > BCRYPT_MIN_ROUNDS:
+        rounds -= 1
+    return rounds
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a small pool of worker processes.
+    
+    A hash or verify costs a few hundred milliseconds of CPU. In worker
+    processes it neither holds this process's GIL nor takes threads from
+    the pool that runs sync endpoints, so a burst of logins does not slow
+    down other requests. At most PASSWORD_HASH_WORKERS run at once; further
+    calls wait for a free worker. With PASSWORD_HASH_WORKERS=0 the work runs
+    in threads instead.
+    """
+    
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Moving average of verify() durations, see wait_like_verify()
+        self.verify_seconds = 0.0
+    
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                # Spawned rather than forked: the server process runs threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+    
+    async def _run(self, function, *args):
+        executor = self._get_executor()
+        if executor is None:
+            return await asyncio.to_thread(function, *args)
+        return await asyncio.get_running_loop().run_in_executor(executor, function, *args)
+    
+    async def start(self) -> None:
+        """
+        Start the worker processes now rather than on the first login.
+        
+        With BCRYPT_TARGET_MS set, also measures bcrypt in a worker and sets
+        the cost to the highest one that fits the budget.
+        """
+        executor = self._get_executor()
+        if executor is not None:
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(loop.run_in_executor(executor, os.getpid) for _ in range(self.workers)))
+        if settings.BCRYPT_TARGET_MS > 0:
+            set_bcrypt_rounds(await self._run(calibrate_bcrypt_rounds, settings.BCRYPT_TARGET_MS))
+        # Seed verify_seconds before the first login
+        await self.verify("warmup", await self.hash("warmup"))
+    
+    async def hash(self, password: str) -> str:
+        """Async version of get_password_hash."""
+        # Workers have their own copy of pwd_context, so the cost is passed along
+        return await self._run(get_password_hash, password, bcrypt_rounds())
+    
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Async version of verify_password."""
+        started = time.perf_counter()
+        try:
+            return await self._run(verify_password, plain_password, hashed_password)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.verify_seconds = elapsed if not self.verify_seconds else 0.8 * self.verify_seconds + 0.2 * elapsed
+    
+    async def wait_like_verify(self) -> None:
+        """
+        Take about as long as verify() without using any CPU.
+        
+        Used for unknown usernames, so response times do not reveal which
+        usernames exist.
+        """
+        await asyncio.sleep(self.verify_seconds)
+    
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+# Global password hasher instance
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -53,6 +217,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         to_encode["sub"] = str(to_encode["sub"])
 
     to_encode.update({"exp": expire})
+    # Token ID, so this token can be revoked on its own
+    to_encode.setdefault("jti", uuid.uuid4().hex)
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -81,22 +247,20 @@ def decode_access_token(token: str) -> dict:
         )
 
 
-def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> int:
-    """
-    Dependency to extract current user ID from JWT token.
-    
-    Args:
-        credentials: HTTP bearer token credentials
-        
-    Returns:
-        User ID from token
-        
-    Raises:
-        HTTPException: If token is invalid or user_id is missing
-    """
-    token = credentials.credentials
-    payload = decode_access_token(token)
-    
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller, as stated by a verified access token."""
+    user_id: int
+    group_id: Optional[int]
+    is_admin: bool
+    username: Optional[str]
+    # Unix time the token expires at
+    expires_at: float
+    # Token ID; None for tokens issued before tokens could be revoked
+    jti: Optional[str] = None
+
+
+def _principal_from_payload(payload: dict) -> Principal:
     user_id = payload.get("sub")
     if user_id is None:
         raise HTTPException(
@@ -106,70 +270,185 @@ def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(secu
     
     # Convert to int if it's a string
     try:
-        return int(user_id)
+        user_id = int(user_id)
     except (ValueError, TypeError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid user ID in token",
         )
+    
+    group_id = payload.get("group_id")
+    if group_id is not None:
+        try:
+            group_id = int(group_id)
+        except (ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid group ID in token",
+            )
+    
+    return Principal(
+        user_id=user_id,
+        group_id=group_id,
+        is_admin=bool(payload.get("is_admin", False)),
+        username=payload.get("username"),
+        expires_at=float(payload.get("exp", 0)),
+        jti=payload.get("jti"),
+    )
 
 
-def get_current_user_group_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> int:
+class TokenCache:
     """
-    Dependency to extract current user's group ID from JWT token.
+    Bounded LRU of verified tokens and their principals.
+    
+    A hit skips the signature check and the payload parse. Entries are
+    dropped once their token expires, so an expired token is always
+    re-verified and rejected.
+    """
+    
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._principals: "OrderedDict[str, Principal]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, token: str) -> Optional[Principal]:
+        """Get the principal of a cached, unexpired token."""
+        with self._lock:
+            principal = self._principals.get(token)
+            if principal is None:
+                self.misses += 1
+                return None
+            if principal.expires_at <= time.time():
+                del self._principals[token]
+                self.misses += 1
+                return None
+            self._principals.move_to_end(token)
+            self.hits += 1
+            return principal
+    
+    def put(self, token: str, principal: Principal) -> None:
+        """Remember a verified token, evicting the least recently used beyond max_size."""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._principals[token] = principal
+            self._principals.move_to_end(token)
+            while len(self._principals) > self.max_size:
+                self._principals.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._principals.clear()
+
+
+# Global token cache instance
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE)
+
+# Global filter of revoked access tokens
+revoked_tokens = RevocationFilter(settings.REVOCATION_FALSE_POSITIVE_RATE)
+
+
+def principal_from_token(token: str) -> Principal:
+    """
+    Verify an access token, or find it in the token cache.
+    
+    Cached or not, the token is checked against the revocation filter.
     
     Args:
-        credentials: HTTP bearer token credentials
+        token: JWT token string
         
     Returns:
-        Group ID from token
+        The token's principal
         
     Raises:
-        HTTPException: If token is invalid or group_id is missing
+        HTTPException: If token is invalid, expired, revoked or lacks a user ID
     """
-    token = credentials.credentials
-    payload = decode_access_token(token)
+    principal = token_cache.get(token)
+    if principal is None:
+        principal = _principal_from_payload(decode_access_token(token))
+        if principal.expires_at:
+            token_cache.put(token, principal)
     
-    group_id = payload.get("group_id")
-    if group_id is None:
+    if principal.jti is not None and revoked_tokens.might_contain(principal.jti):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
         )
+    return principal
+
+
+def get_current_principal(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Principal:
+    """
+    Dependency that authenticates the request.
     
-    # Convert to int if it's a string
-    try:
-        return int(group_id)
-    except (ValueError, TypeError):
+    FastAPI resolves a dependency once per request, so the dependencies
+    below share one token verification.
+    
+    Args:
+        credentials: HTTP bearer token credentials
+        
+    Returns:
+        The authenticated principal
+    """
+    return principal_from_token(credentials.credentials)
+
+
+def get_current_user_id(principal: Principal = Depends(get_current_principal)) -> int:
+    """
+    Dependency to extract current user ID from JWT token.
+    
+    Args:
+        principal: Authenticated principal
+        
+    Returns:
+        User ID from token
+    """
+    return principal.user_id
+
+
+def get_current_user_group_id(principal: Principal = Depends(get_current_principal)) -> int:
+    """
+    Dependency to extract current user's group ID from JWT token.
+    
+    Args:
+        principal: Authenticated principal
+        
+    Returns:
+        Group ID from token
+        
+    Raises:
+        HTTPException: If group_id is missing
+    """
+    if principal.group_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid group ID in token",
+            detail="Could not validate credentials",
         )
+    return principal.group_id
 
 
-def get_current_user_is_admin(credentials: HTTPAuthorizationCredentials = Depends(security)) -> bool:
+def get_current_user_is_admin(principal: Principal = Depends(get_current_principal)) -> bool:
     """
     Dependency to check if current user is admin from JWT token.
     
     Args:
-        credentials: HTTP bearer token credentials
+        principal: Authenticated principal
         
     Returns:
         Boolean indicating if user is admin
     """
-    token = credentials.credentials
-    payload = decode_access_token(token)
-    
-    is_admin: bool = payload.get("is_admin", False)
-    return is_admin
+    return principal.is_admin
 
 
-def require_admin(credentials: HTTPAuthorizationCredentials = Depends(security)) -> bool:
+def require_admin(principal: Principal = Depends(get_current_principal)) -> bool:
     """
     Dependency that requires the user to be an admin.
     
     Args:
-        credentials: HTTP bearer token credentials
+        principal: Authenticated principal
         
     Returns:
         True if user is admin
@@ -177,10 +456,9 @@ def require_admin(credentials: HTTPAuthorizationCredentials = Depends(security))
     Raises:
         HTTPException: If user is not an admin
     """
-    is_admin = get_current_user_is_admin(credentials)
-    if not is_admin:
+    if not principal.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin privileges required",
         )
-    return True
\ No newline at end of file
+    return True
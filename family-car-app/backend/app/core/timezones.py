@@ -0,0 +1,27 @@
+"""
+Datetime normalization.
+The database stores naive DATETIME values in UTC. Every datetime taken from
+a request is brought to that form before it is stored or compared, so an
+offset-aware value means the same instant everywhere.
+"""
+
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def to_utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Convert a datetime to naive UTC.
+
+    Offset-aware values are converted to UTC before the offset is dropped;
+    naive values are taken to be UTC already and returned unchanged.
+
+    Args:
+        value: Datetime, or None
+
+    Returns:
+        The naive UTC datetime, or None
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
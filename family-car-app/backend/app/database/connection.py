@@ -5,8 +5,9 @@ Provides database engine, session maker, and connection utilities.
 
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from ..core.config import settings
 
 
@@ -15,12 +16,30 @@ engine = create_engine(
     settings.database_url,
     pool_pre_ping=True,  # Verify connections before using
     pool_recycle=3600,   # Recycle connections after 1 hour
-    echo=settings.DEBUG   # Log SQL queries in debug mode
+    echo=settings.DEBUG,  # Log SQL queries in debug mode
+    # SQLite (local development) is used from FastAPI's thread pool
+    connect_args={"check_same_thread": False} if settings.database_url.startswith("sqlite") else {}
 )
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Create async database engine for async endpoints
+async_engine = create_async_engine(
+    settings.async_database_url,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+    echo=settings.DEBUG
+)
+
+# Create async session factory. Objects stay loaded after commit, since
+# lazy refreshes are not possible outside the session's async context.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base class for ORM models
 Base = declarative_base()
 
@@ -40,6 +59,18 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency that provides an async database session.
+    Automatically closes the session after use.
+    
+    Yields:
+        Async database session
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db() -> None:
     """
     Initialize database tables.
@@ -7,6 +7,11 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .core.config import settings
 from .api import auth, reservations, fuel_logs, rules, users, websocket
+from .services.websocket_manager import manager
+from .services.event_bus import create_event_bus
+from .services.outbox_service import outbox_dispatcher
+from .core.security import password_hasher, bcrypt_rounds
+from .services.token_service import revocation_refresher
 import logging
 
 # Configure logging
@@ -32,6 +37,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
@@ -65,9 +71,19 @@ async def startup_event():
     logger.info(f"Starting {settings.APP_NAME} v{settings.API_VERSION}")
     logger.info(f"Debug mode: {settings.DEBUG}")
     logger.info(f"CORS origins: {settings.CORS_ORIGINS}")
+    await manager.start(create_event_bus())
+    logger.info(f"WebSocket event bus: {settings.WS_EVENT_BUS}")
+    await outbox_dispatcher.start()
+    await password_hasher.start()
+    await revocation_refresher.start()
+    logger.info(f"bcrypt cost: {bcrypt_rounds()}")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Shutdown event handler."""
     logger.info("Shutting down application")
+    await revocation_refresher.stop()
+    await outbox_dispatcher.stop()
+    await manager.stop()
+    password_hasher.shutdown()
@@ -3,7 +3,7 @@ SQLAlchemy ORM models for database tables.
 Defines the structure and relationships of all database entities.
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DECIMAL, TIMESTAMP, DateTime, Text, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Boolean, DECIMAL, TIMESTAMP, DateTime, Text, JSON, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -56,6 +56,12 @@ class User(Base):
 class Reservation(Base):
     """Car reservation."""
     __tablename__ = "reservations"
+    __table_args__ = (
+        # Keyset pagination on (start_time, id) within a group
+        Index("idx_group_start_id", "group_id", "start_time", "id"),
+        # Delta sync on (updated_at, id) within a group
+        Index("idx_group_updated_id", "group_id", "updated_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="RESTRICT"), nullable=False)
@@ -70,7 +76,54 @@ class Reservation(Base):
     # Relationships
     user = relationship("User", back_populates="reservations")
     group = relationship("Group", back_populates="reservations")
-    fuel_logs = relationship("FuelLog", back_populates="reservation", cascade="all, delete-orphan")
+    fuel_logs = relationship(
+        "FuelLog",
+        primaryjoin="Reservation.id == foreign(FuelLog.reservation_id)",
+        back_populates="reservation",
+        cascade="all, delete-orphan",
+    )
+
+
+class ReservationHistory(Base):
+    """
+    Archived (completed or cancelled) reservation.
+    
+    Rows are moved here from reservations by the archiver and keep their
+    original ID. On MySQL the table is partitioned by month of start_time,
+    which is why it has no foreign keys and start_time is part of the key.
+    """
+    __tablename__ = "reservations_history"
+    __table_args__ = (
+        Index("idx_history_group_start_id", "group_id", "start_time", "id"),
+        Index("idx_history_group_end", "group_id", "end_time"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    start_time = Column(DateTime, primary_key=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    group_id = Column(Integer, nullable=False)
+    end_time = Column(DateTime, nullable=False)
+    status = Column(SQLEnum(ReservationStatus), nullable=False)
+    notes = Column(Text, nullable=True)
+    created_at = Column(TIMESTAMP, nullable=True)
+    updated_at = Column(TIMESTAMP, nullable=True)
+    archived_at = Column(TIMESTAMP, server_default=func.current_timestamp())
+    
+    # Relationships
+    user = relationship(
+        "User",
+        primaryjoin="foreign(ReservationHistory.user_id) == User.id",
+        viewonly=True,
+    )
+
+
+class ReservationSlot(Base):
+    """Time bucket held by an active reservation; the primary key rejects double booking."""
+    __tablename__ = "reservation_slots"
+    
+    group_id = Column(Integer, ForeignKey("cgroups.id", ondelete="CASCADE"), primary_key=True)
+    time_bucket = Column(DateTime, primary_key=True)
+    reservation_id = Column(Integer, ForeignKey("reservations.id", ondelete="CASCADE"), nullable=False, index=True)
 
 
 class FuelLog(Base):
@@ -78,7 +131,8 @@ class FuelLog(Base):
     __tablename__ = "fuel_logs"
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    reservation_id = Column(Integer, ForeignKey("reservations.id", ondelete="CASCADE"), nullable=False)
+    # No foreign key: the reservation may have been moved to reservations_history
+    reservation_id = Column(Integer, nullable=False, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="RESTRICT"), nullable=False)
     fuel_before = Column(DECIMAL(5, 2), nullable=False, comment="Fuel level before (0-100%)")
     fuel_after = Column(DECIMAL(5, 2), nullable=False, comment="Fuel level after (0-100%)")
@@ -87,10 +141,48 @@ class FuelLog(Base):
     logged_at = Column(TIMESTAMP, server_default=func.current_timestamp())
     
     # Relationships
-    reservation = relationship("Reservation", back_populates="fuel_logs")
+    reservation = relationship(
+        "Reservation",
+        primaryjoin="foreign(FuelLog.reservation_id) == Reservation.id",
+        back_populates="fuel_logs",
+    )
     user = relationship("User", back_populates="fuel_logs")
 
 
+class OutboxEvent(Base):
+    """Group event written with the change it describes, waiting to be broadcast."""
+    __tablename__ = "outbox"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    group_id = Column(Integer, ForeignKey("cgroups.id", ondelete="CASCADE"), nullable=False)
+    event_type = Column(String(50), nullable=False)
+    payload = Column(JSON, nullable=False)
+    # Set when a dispatcher claims the event; NULL while it waits
+    claimed_at = Column(DateTime, nullable=True)
+    created_at = Column(TIMESTAMP, server_default=func.current_timestamp())
+
+
+class RefreshToken(Base):
+    """Refresh token of a login session. Only a hash of the token is stored."""
+    __tablename__ = "refresh_tokens"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    token_hash = Column(String(64), unique=True, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+    created_at = Column(TIMESTAMP, server_default=func.current_timestamp())
+
+
+class RevokedToken(Base):
+    """Revoked access token, kept until it would have expired anyway."""
+    __tablename__ = "revoked_tokens"
+    
+    jti = Column(String(32), primary_key=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    created_at = Column(TIMESTAMP, server_default=func.current_timestamp())
+
+
 class Rule(Base):
     """Admin-defined rules for the group."""
     __tablename__ = "rules"
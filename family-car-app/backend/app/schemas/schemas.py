@@ -5,9 +5,12 @@ Defines the structure of data sent to and from the API.
 
 from pydantic import BaseModel, Field, validator, ConfigDict
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, date, time
 from decimal import Decimal
 from enum import Enum
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from ..core.timezones import to_utc_naive
 
 
 # ============================================
@@ -36,9 +39,16 @@ class LoginResponse(BaseModel):
     """Response schema for successful login."""
     access_token: str
     token_type: str = "bearer"
+    expires_in: int  # Seconds until access_token expires
+    refresh_token: str
     user: "UserResponse"
 
 
+class RefreshRequest(BaseModel):
+    """Request schema for renewing an access token, and for logout."""
+    refresh_token: str = Field(..., min_length=1, max_length=255)
+
+
 class RegisterRequest(BaseModel):
     """Request schema for user registration."""
     username: str = Field(..., min_length=3, max_length=50)
@@ -121,6 +131,11 @@ class ReservationBase(BaseModel):
     end_time: datetime
     notes: Optional[str] = None
     
+    @validator('start_time', 'end_time')
+    def times_to_utc(cls, v):
+        """Store offset-aware times as naive UTC."""
+        return to_utc_naive(v)
+
     @validator('end_time')
     def end_time_must_be_after_start_time(cls, v, values):
         """Validate that end_time is after start_time."""
@@ -141,6 +156,11 @@ class ReservationUpdate(BaseModel):
     status: Optional[ReservationStatus] = None
     notes: Optional[str] = None
     
+    @validator('start_time', 'end_time')
+    def times_to_utc(cls, v):
+        """Store offset-aware times as naive UTC."""
+        return to_utc_naive(v)
+
     @validator('end_time')
     def end_time_must_be_after_start_time(cls, v, values):
         """Validate that end_time is after start_time if both are provided."""
@@ -162,6 +182,79 @@ class ReservationResponse(ReservationBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ReservationChangesResponse(BaseModel):
+    """Response schema for reservation delta sync."""
+    changes: List[ReservationResponse]
+    next_cursor: str
+    has_more: bool
+
+
+class ReservationSeriesCreate(BaseModel):
+    """Schema for creating a recurring reservation series."""
+    start_date: date
+    end_date: date
+    start_time: time
+    end_time: time
+    weekdays: List[int] = Field(default=[0, 1, 2, 3, 4], min_length=1, description="Days of the week (0=Monday, 6=Sunday)")
+    timezone: str = Field(default="UTC", description="IANA time zone of start_time and end_time, e.g. Europe/Berlin")
+    notes: Optional[str] = None
+    
+    @validator('end_date')
+    def end_date_must_not_be_before_start_date(cls, v, values):
+        """Validate that end_date is not before start_date."""
+        if 'start_date' in values and v < values['start_date']:
+            raise ValueError('end_date must not be before start_date')
+        return v
+    
+    @validator('end_time')
+    def end_time_must_be_after_start_time(cls, v, values):
+        """Validate that end_time is after start_time."""
+        if 'start_time' in values and v <= values['start_time']:
+            raise ValueError('end_time must be after start_time')
+        return v
+    
+    @validator('weekdays')
+    def weekdays_must_be_valid(cls, v):
+        """Validate that every weekday is between 0 and 6."""
+        if any(day < 0 or day > 6 for day in v):
+            raise ValueError('weekdays must be between 0 (Monday) and 6 (Sunday)')
+        return v
+
+    @validator('timezone')
+    def timezone_must_be_known(cls, v):
+        """Validate that timezone is an IANA time zone name."""
+        try:
+            ZoneInfo(v)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f'unknown time zone: {v}')
+        return v
+
+
+class SeriesConflict(BaseModel):
+    """An occurrence of a series that could not be booked."""
+    start_time: datetime
+    end_time: datetime
+    reason: str
+
+
+class ReservationSeriesResponse(BaseModel):
+    """Response schema for a created reservation series."""
+    created: List[ReservationResponse]
+    conflicts: List[SeriesConflict]
+
+
+class AvailabilityWindow(BaseModel):
+    """A time window in which the car is free."""
+    start_time: datetime
+    end_time: datetime
+
+
+class AvailabilityResponse(BaseModel):
+    """Response schema for an availability search."""
+    windows: List[AvailabilityWindow]
+    max_reservation_hours: Optional[float] = None
+
+
 # ============================================
 # Fuel Log Schemas
 # ============================================
@@ -0,0 +1,261 @@
+"""
+Reservation archive service.
+Moves completed and cancelled reservations out of the hot reservations
+table into reservations_history, and reads them back when needed.
+"""
+
+import logging
+import time
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Set
+from sqlalchemy import insert, delete, func, text
+from sqlalchemy.orm import Session, Query, joinedload, selectinload
+from ..core.config import settings
+from ..models.models import Reservation, ReservationHistory, ReservationStatus
+
+logger = logging.getLogger(__name__)
+
+# Statuses that can be archived; nothing changes them afterwards
+TERMINAL_STATUSES = (ReservationStatus.COMPLETED, ReservationStatus.CANCELLED)
+
+# Columns copied from reservations into reservations_history
+ARCHIVED_COLUMNS = (
+    "id", "user_id", "group_id", "start_time", "end_time",
+    "status", "notes", "created_at", "updated_at",
+)
+
+FUTURE_PARTITION = "p_future"
+
+
+def _month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _next_month(value: date) -> date:
+    if value.month == 12:
+        return date(value.year + 1, 1, 1)
+    return date(value.year, value.month + 1, 1)
+
+
+class ArchiveService:
+    """Service for archiving reservations and reading archived ones."""
+
+    @staticmethod
+    def archive_cutoff(days: Optional[int] = None) -> datetime:
+        """Reservations ending before this time are eligible for archiving."""
+        if days is None:
+            days = settings.ARCHIVE_AFTER_DAYS
+        return datetime.utcnow() - timedelta(days=days)
+
+    @staticmethod
+    def history_horizon(db: Session, group_id: int) -> Optional[datetime]:
+        """
+        Get the latest end time of the group's archived reservations.
+
+        Every archived reservation starts before this time, so a read whose
+        range begins at or after it never needs the history table.
+
+        Args:
+            db: Database session
+            group_id: Group ID
+
+        Returns:
+            The horizon, or None if the group has no archived reservations
+        """
+        return db.query(func.max(ReservationHistory.end_time)).filter(
+            ReservationHistory.group_id == group_id
+        ).scalar()
+
+    @staticmethod
+    def build_history_query(
+        db: Session,
+        group_id: int,
+        status: Optional[ReservationStatus] = None,
+        user_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Query:
+        """
+        Build the filtered history query, newest first.
+
+        Mirrors ReservationService.build_reservations_query so both tables
+        can be merged on (start_time, id).
+        """
+        query = db.query(ReservationHistory).options(selectinload(ReservationHistory.user)).filter(
+            ReservationHistory.group_id == group_id
+        )
+
+        if status:
+            query = query.filter(ReservationHistory.status == status)
+
+        if user_id:
+            query = query.filter(ReservationHistory.user_id == user_id)
+
+        if start_date:
+            query = query.filter(ReservationHistory.start_time >= start_date)
+
+        if end_date:
+            query = query.filter(ReservationHistory.end_time <= end_date)
+
+        return query.order_by(ReservationHistory.start_time.desc(), ReservationHistory.id.desc())
+
+    @staticmethod
+    def get_archived_reservation(db: Session, reservation_id: int, group_id: int) -> Optional[ReservationHistory]:
+        """Get a single archived reservation of a group, with its user."""
+        return db.query(ReservationHistory).options(joinedload(ReservationHistory.user)).filter(
+            ReservationHistory.id == reservation_id,
+            ReservationHistory.group_id == group_id
+        ).first()
+
+    @staticmethod
+    def ensure_partitions(db: Session, until: datetime) -> List[str]:
+        """
+        Make sure reservations_history has a monthly partition up to a date.
+
+        New months are split off the catch-all partition. The first run
+        starts from the oldest row to be archived (or already in the
+        history table), so older months get partitions of their own too.
+        Does nothing unless the table is partitioned (MySQL only).
+
+        Args:
+            db: Database session
+            until: Archive cutoff; reservations ending before it will be archived
+
+        Returns:
+            Names of the partitions created
+        """
+        if db.bind.dialect.name != "mysql":
+            return []
+
+        rows = db.execute(text(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'reservations_history' "
+            "AND PARTITION_NAME IS NOT NULL"
+        )).all()
+        existing: Set[str] = {row[0] for row in rows}
+        if FUTURE_PARTITION not in existing:
+            return []
+
+        monthly = sorted(name for name in existing if name != FUTURE_PARTITION)
+        if monthly:
+            last = datetime.strptime(monthly[-1], "p%Y%m").date()
+            month = _next_month(last)
+        else:
+            oldest = [
+                value for value in (
+                    db.query(func.min(Reservation.start_time)).filter(
+                        Reservation.status.in_(TERMINAL_STATUSES),
+                        Reservation.end_time < until
+                    ).scalar(),
+                    db.query(func.min(ReservationHistory.start_time)).scalar(),
+                )
+                if value is not None
+            ]
+            month = _month_start(min(oldest, default=until).date())
+
+        created = []
+        while month <= until.date():
+            name = month.strftime("p%Y%m")
+            db.execute(text(
+                f"ALTER TABLE reservations_history REORGANIZE PARTITION {FUTURE_PARTITION} INTO ("
+                f"PARTITION {name} VALUES LESS THAN (TO_DAYS('{_next_month(month).isoformat()}')), "
+                f"PARTITION {FUTURE_PARTITION} VALUES LESS THAN MAXVALUE)"
+            ))
+            created.append(name)
+            month = _next_month(month)
+
+        if created:
+            logger.info(f"Created history partitions: {', '.join(created)}")
+        return created
+
+    @staticmethod
+    def archive_batch(db: Session, cutoff: datetime, batch_size: int) -> int:
+        """
+        Move one batch of terminal reservations into the history table.
+
+        The batch is copied and deleted in a single short transaction; the
+        selected rows are locked so a concurrent update cannot slip in
+        between the copy and the delete.
+
+        Args:
+            db: Database session
+            cutoff: Only reservations ending before this time are moved
+            batch_size: Maximum number of rows to move
+
+        Returns:
+            Number of reservations moved
+        """
+        eligible = (
+            Reservation.status.in_(TERMINAL_STATUSES),
+            Reservation.end_time < cutoff,
+        )
+
+        ids = [
+            row[0] for row in db.query(Reservation.id)
+            .filter(*eligible)
+            .order_by(Reservation.id)
+            .limit(batch_size)
+            .with_for_update()
+            .all()
+        ]
+        if not ids:
+            db.rollback()
+            return 0
+
+        source = db.query(
+            *[getattr(Reservation, column) for column in ARCHIVED_COLUMNS]
+        ).filter(Reservation.id.in_(ids), *eligible)
+
+        db.execute(
+            insert(ReservationHistory).from_select(list(ARCHIVED_COLUMNS), source)
+        )
+        db.execute(
+            delete(Reservation)
+            .where(Reservation.id.in_(ids), *eligible)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+        return len(ids)
+
+    @staticmethod
+    def archive(
+        db: Session,
+        cutoff: Optional[datetime] = None,
+        batch_size: Optional[int] = None,
+        pause_seconds: Optional[float] = None,
+        max_batches: Optional[int] = None
+    ) -> int:
+        """
+        Archive every eligible reservation, batch by batch.
+
+        Args:
+            db: Database session
+            cutoff: Reservations ending before this are moved (default: ARCHIVE_AFTER_DAYS ago)
+            batch_size: Rows per transaction (default: ARCHIVE_BATCH_SIZE)
+            pause_seconds: Sleep between batches (default: ARCHIVE_BATCH_PAUSE_SECONDS)
+            max_batches: Optional limit on the number of batches
+
+        Returns:
+            Total number of reservations moved
+        """
+        cutoff = cutoff or ArchiveService.archive_cutoff()
+        batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+        if pause_seconds is None:
+            pause_seconds = settings.ARCHIVE_BATCH_PAUSE_SECONDS
+
+        ArchiveService.ensure_partitions(db, cutoff)
+
+        total = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            moved = ArchiveService.archive_batch(db, cutoff, batch_size)
+            total += moved
+            batches += 1
+            if moved < batch_size:
+                break
+            if pause_seconds:
+                time.sleep(pause_seconds)
+
+        logger.info(f"Archived {total} reservations ending before {cutoff.isoformat()}")
+        return total
@@ -3,18 +3,35 @@ Authentication service.
 Handles user authentication, registration, and token management.
 """
 
+from typing import Optional
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from datetime import timedelta
 from ..models.models import User, Group
 from ..schemas.schemas import LoginRequest, RegisterRequest, LoginResponse, UserResponse
-from ..core.security import verify_password, get_password_hash, create_access_token
+from ..core.security import verify_password, get_password_hash, needs_rehash, create_access_token, password_hasher, Principal
+from .token_service import TokenService
 from ..core.config import settings
 
 
 class AuthService:
     """Service for authentication operations."""
     
+    @staticmethod
+    def get_user_by_username(db: Session, username: str) -> Optional[User]:
+        """
+        Get a user by username.
+        
+        Args:
+            db: Database session
+            username: Username
+            
+        Returns:
+            User, or None if no user has this username
+        """
+        return db.query(User).filter(User.username == username).first()
+    
     @staticmethod
     def authenticate_user(db: Session, login_data: LoginRequest) -> User:
         """
@@ -30,7 +47,7 @@ class AuthService:
         Raises:
             HTTPException: If credentials are invalid
         """
-        user = db.query(User).filter(User.username == login_data.username).first()
+        user = AuthService.get_user_by_username(db, login_data.username)
         
         if not user:
             raise HTTPException(
@@ -44,8 +61,25 @@ class AuthService:
                 detail="Incorrect username or password",
             )
         
+        # Upgrade hashes made at a lower cost while the password is at hand
+        if needs_rehash(user.password_hash):
+            AuthService.update_password_hash(db, user, get_password_hash(login_data.password))
+        
         return user
     
+    @staticmethod
+    def update_password_hash(db: Session, user: User, password_hash: str) -> None:
+        """
+        Replace a user's password hash.
+        
+        Args:
+            db: Database session
+            user: User object
+            password_hash: New hash of the same password
+        """
+        user.password_hash = password_hash
+        db.commit()
+    
     @staticmethod
     def create_user_token(user: User) -> str:
         """
@@ -70,71 +104,126 @@ class AuthService:
         return access_token
     
     @staticmethod
-    def login(db: Session, login_data: LoginRequest) -> LoginResponse:
+    def issue_tokens(db: Session, user: User) -> LoginResponse:
         """
-        Login a user and return token with user data.
+        Start a session for an authenticated user.
         
         Args:
             db: Database session
-            login_data: Login credentials
+            user: User object
             
         Returns:
-            Login response with token and user data
+            Login response with access token, refresh token and user data
         """
-        user = AuthService.authenticate_user(db, login_data)
-        token = AuthService.create_user_token(user)
+        access_token = AuthService.create_user_token(user)
+        user_data = UserResponse.model_validate(user)
+        refresh_token = TokenService.create_refresh_token(db, user.id)
         
         return LoginResponse(
-            access_token=token,
+            access_token=access_token,
             token_type="bearer",
+            expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+            refresh_token=refresh_token,
+            user=user_data
+        )
+    
+    @staticmethod
+    def refresh(db: Session, refresh_token: str) -> LoginResponse:
+        """
+        Exchange a refresh token for a new access token and refresh token.
+        
+        The access token is built from the user's current data, so group
+        and admin changes take effect on the next refresh.
+        
+        Args:
+            db: Database session
+            refresh_token: Refresh token from login or the previous refresh
+            
+        Returns:
+            Login response with the new tokens and user data
+            
+        Raises:
+            HTTPException: If the refresh token is invalid, expired or already used
+        """
+        user, new_refresh_token = TokenService.rotate_refresh_token(db, refresh_token)
+        
+        return LoginResponse(
+            access_token=AuthService.create_user_token(user),
+            token_type="bearer",
+            expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+            refresh_token=new_refresh_token,
             user=UserResponse.model_validate(user)
         )
     
     @staticmethod
-    def register(db: Session, register_data: RegisterRequest) -> LoginResponse:
+    def login(db: Session, login_data: LoginRequest) -> LoginResponse:
         """
-        Register a new user and optionally create a new group.
+        Login a user and return token with user data.
         
         Args:
             db: Database session
-            register_data: Registration data
+            login_data: Login credentials
             
         Returns:
             Login response with token and user data
+        """
+        user = AuthService.authenticate_user(db, login_data)
+        return AuthService.issue_tokens(db, user)
+    
+    @staticmethod
+    def validate_registration(db: Session, register_data: RegisterRequest) -> None:
+        """
+        Check registration data before the password is hashed.
+        
+        Args:
+            db: Database session
+            register_data: Registration data
             
         Raises:
-            HTTPException: If username already exists
+            HTTPException: If username already exists or no group name is given
         """
         # Check if username already exists
-        existing_user = db.query(User).filter(User.username == register_data.username).first()
+        existing_user = AuthService.get_user_by_username(db, register_data.username)
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username already registered",
             )
         
-        # Create new group if group_name is provided
-        if register_data.group_name:
-            group = Group(
-                name=register_data.group_name,
-                car_model=register_data.car_model
-            )
-            db.add(group)
-            db.flush()  # Get the group ID
-            group_id = group.id
-        else:
+        if not register_data.group_name:
             # If no group_name, user must provide group_id (not implemented in this simple version)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Group name is required for new users",
             )
+    
+    @staticmethod
+    def create_user(db: Session, register_data: RegisterRequest, password_hash: str) -> User:
+        """
+        Create a new group and its first user.
+        
+        Args:
+            db: Database session
+            register_data: Registration data, checked by validate_registration
+            password_hash: Hash of the user's password
+            
+        Returns:
+            Created user
+        """
+        # Create new group
+        group = Group(
+            name=register_data.group_name,
+            car_model=register_data.car_model
+        )
+        db.add(group)
+        db.flush()  # Get the group ID
         
         # Create new user
         new_user = User(
             username=register_data.username,
-            password_hash=get_password_hash(register_data.password),
+            password_hash=password_hash,
             full_name=register_data.full_name,
-            group_id=group_id,
+            group_id=group.id,
             is_admin=register_data.is_admin
         )
         
@@ -142,11 +231,82 @@ class AuthService:
         db.commit()
         db.refresh(new_user)
         
-        # Create token
-        token = AuthService.create_user_token(new_user)
+        return new_user
+    
+    @staticmethod
+    def register(db: Session, register_data: RegisterRequest) -> LoginResponse:
+        """
+        Register a new user and optionally create a new group.
         
-        return LoginResponse(
-            access_token=token,
-            token_type="bearer",
-            user=UserResponse.model_validate(new_user)
-        )
+        Args:
+            db: Database session
+            register_data: Registration data
+            
+        Returns:
+            Login response with token and user data
+            
+        Raises:
+            HTTPException: If username already exists
+        """
+        AuthService.validate_registration(db, register_data)
+        new_user = AuthService.create_user(db, register_data, get_password_hash(register_data.password))
+        return AuthService.issue_tokens(db, new_user)
+
+
+class AsyncAuthService:
+    """
+    Async entry points for login and registration.
+    
+    Database work runs on the AsyncSession via run_sync, and bcrypt runs in
+    the password hasher's worker processes, so neither blocks the event loop.
+    """
+    
+    @staticmethod
+    async def authenticate_user(db: AsyncSession, login_data: LoginRequest) -> User:
+        """Async version of AuthService.authenticate_user."""
+        user = await db.run_sync(AuthService.get_user_by_username, login_data.username)
+        
+        if not user:
+            # No hash to check, but answer as slowly as if there were
+            await password_hasher.wait_like_verify()
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Incorrect username or password",
+            )
+        
+        if not await password_hasher.verify(login_data.password, user.password_hash):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Incorrect username or password",
+            )
+        
+        # Upgrade hashes made at a lower cost while the password is at hand
+        if needs_rehash(user.password_hash):
+            password_hash = await password_hasher.hash(login_data.password)
+            await db.run_sync(AuthService.update_password_hash, user, password_hash)
+        
+        return user
+    
+    @staticmethod
+    async def login(db: AsyncSession, login_data: LoginRequest) -> LoginResponse:
+        """Async version of AuthService.login."""
+        user = await AsyncAuthService.authenticate_user(db, login_data)
+        return await db.run_sync(AuthService.issue_tokens, user)
+    
+    @staticmethod
+    async def register(db: AsyncSession, register_data: RegisterRequest) -> LoginResponse:
+        """Async version of AuthService.register."""
+        await db.run_sync(AuthService.validate_registration, register_data)
+        password_hash = await password_hasher.hash(register_data.password)
+        new_user = await db.run_sync(AuthService.create_user, register_data, password_hash)
+        return await db.run_sync(AuthService.issue_tokens, new_user)
+    
+    @staticmethod
+    async def refresh(db: AsyncSession, refresh_token: str) -> LoginResponse:
+        """Async version of AuthService.refresh."""
+        return await db.run_sync(AuthService.refresh, refresh_token)
+    
+    @staticmethod
+    async def logout(db: AsyncSession, principal: Principal, refresh_token: Optional[str] = None) -> None:
+        """Async version of TokenService.logout."""
+        await db.run_sync(TokenService.logout, principal, refresh_token)
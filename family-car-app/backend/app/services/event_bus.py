@@ -0,0 +1,162 @@
+"""
+Publish/subscribe backplane for WebSocket events.
+Lets every worker process fan an event out to the sockets it holds, so a
+change made on one worker reaches clients connected to any other.
+"""
+
+import asyncio
+import importlib
+import json
+import logging
+import os
+import socket
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Optional
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Called by the bus for every event, on every worker: handler(message, group_id)
+EventHandler = Callable[[dict, int], Awaitable[None]]
+
+
+class EventBus(ABC):
+    """
+    Interface of an event backplane.
+
+    A backend for an external broker (Redis, NATS, ...) implements these
+    three methods and is selected by setting WS_EVENT_BUS to its dotted
+    path, e.g. "mypackage.buses:RedisEventBus".
+    """
+
+    @abstractmethod
+    async def start(self, handler: EventHandler) -> None:
+        """Start receiving events; handler is awaited once per event."""
+
+    @abstractmethod
+    async def publish(self, message: dict, group_id: int) -> None:
+        """Deliver an event to the handler of every worker, this one included."""
+
+    @abstractmethod
+    async def stop(self) -> None:
+        """Stop receiving events and release resources."""
+
+
+class InProcessEventBus(EventBus):
+    """Delivers events to this process only. Suitable for one worker and for tests."""
+
+    def __init__(self):
+        self.handler: Optional[EventHandler] = None
+
+    async def start(self, handler: EventHandler) -> None:
+        self.handler = handler
+
+    async def publish(self, message: dict, group_id: int) -> None:
+        if self.handler is not None:
+            await self.handler(message, group_id)
+
+    async def stop(self) -> None:
+        self.handler = None
+
+
+class UnixSocketEventBus(EventBus):
+    """
+    Single-host backplane over Unix datagram sockets.
+
+    Each worker binds worker-<pid>.sock in a shared directory. Publishing
+    delivers the event locally and sends one datagram to every other socket
+    in the directory; sockets of workers that have exited are removed.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or settings.WS_EVENT_BUS_SOCKET_DIR
+        self.path = os.path.join(self.directory, f"worker-{os.getpid()}.sock")
+        self.handler: Optional[EventHandler] = None
+        self.sock: Optional[socket.socket] = None
+        self._tasks = set()
+
+    async def start(self, handler: EventHandler) -> None:
+        self.handler = handler
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, settings.WS_EVENT_BUS_BUFFER_BYTES)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, settings.WS_EVENT_BUS_BUFFER_BYTES)
+        self.sock.bind(self.path)
+        asyncio.get_running_loop().add_reader(self.sock.fileno(), self._on_readable)
+        logger.info(f"Event bus listening on {self.path}")
+
+    def _on_readable(self) -> None:
+        while True:
+            try:
+                datagram = self.sock.recv(settings.WS_EVENT_BUS_BUFFER_BYTES)
+            except (BlockingIOError, InterruptedError):
+                return
+            try:
+                event = json.loads(datagram)
+                message, group_id = event["message"], event["group_id"]
+            except (ValueError, KeyError) as e:
+                logger.error(f"Ignoring malformed event bus datagram: {e}")
+                continue
+            task = asyncio.create_task(self.handler(message, group_id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def publish(self, message: dict, group_id: int) -> None:
+        datagram = json.dumps({"group_id": group_id, "message": message}).encode()
+
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if path == self.path or not name.endswith(".sock"):
+                continue
+            try:
+                self.sock.sendto(datagram, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # The worker is gone; clean up after it
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+            except BlockingIOError:
+                logger.warning(f"Event bus peer {name} is not keeping up; event dropped for it")
+            except OSError as e:
+                logger.error(f"Error publishing to event bus peer {name}: {e}")
+
+        await self.handler(message, group_id)
+
+    async def stop(self) -> None:
+        if self.sock is None:
+            return
+        asyncio.get_running_loop().remove_reader(self.sock.fileno())
+        self.sock.close()
+        self.sock = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def create_event_bus(name: Optional[str] = None) -> EventBus:
+    """
+    Create the event bus selected by WS_EVENT_BUS.
+
+    Args:
+        name: "memory", "unix", or a dotted path "module:ClassName" to an EventBus subclass
+
+    Returns:
+        A new, not yet started event bus
+    """
+    name = name or settings.WS_EVENT_BUS
+    if name == "memory":
+        return InProcessEventBus()
+    if name == "unix":
+        return UnixSocketEventBus()
+
+    module_name, _, class_name = name.partition(":")
+    if not class_name:
+        raise ValueError(f"Unknown event bus {name!r}; use memory, unix or module:ClassName")
+    bus_class = getattr(importlib.import_module(module_name), class_name)
+    return bus_class()
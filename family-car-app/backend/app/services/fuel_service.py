@@ -4,11 +4,13 @@ Handles fuel log creation and user fuel balance calculations.
 """
 
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from typing import List
 from decimal import Decimal
 from ..models.models import FuelLog, Reservation, User
-from ..schemas.schemas import FuelLogCreate, FuelLogUpdate
+from ..schemas.schemas import FuelLogCreate, FuelLogUpdate, FuelLogResponse
+from .outbox_service import OutboxService
 
 
 class FuelLogService:
@@ -66,8 +68,13 @@ class FuelLogService:
         # Update user's fuel balance
         FuelLogService.update_fuel_balance(db, user_id, new_fuel_log)
         
-        db.commit()
+        db.flush()
         db.refresh(new_fuel_log)
+        OutboxService.add(
+            db, reservation.group_id, "fuel_log_created",
+            FuelLogResponse.model_validate(new_fuel_log).model_dump(mode='json')
+        )
+        db.commit()
         
         return new_fuel_log
     
@@ -165,3 +172,21 @@ class FuelLogService:
             "total_fuel_added": float(total_fuel_added),
             "total_paid": float(total_paid)
         }
+
+
+class AsyncFuelLogService:
+    """
+    Async entry points for fuel log operations.
+    
+    Runs FuelLogService methods through AsyncSession.run_sync, so the
+    statements use the async driver instead of blocking the event loop.
+    """
+    
+    @staticmethod
+    async def create_fuel_log(
+        db: AsyncSession,
+        user_id: int,
+        fuel_log_data: FuelLogCreate
+    ) -> FuelLog:
+        """Async version of FuelLogService.create_fuel_log."""
+        return await db.run_sync(FuelLogService.create_fuel_log, user_id, fuel_log_data)
@@ -0,0 +1,283 @@
+"""
+In-memory interval index for reservation overlap checks.
+Keeps each group's active reservations sorted by start time so overlaps
+can be answered without a database round trip.
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..core.timezones import to_utc_naive
+from ..models.models import Reservation, ReservationStatus
+
+logger = logging.getLogger(__name__)
+
+# Statuses that block the car
+ACTIVE_STATUSES = (ReservationStatus.PENDING, ReservationStatus.APPROVED)
+
+
+class GroupIntervalIndex:
+    """Active reservations of a single group, sorted by (start, end, id)."""
+
+    def __init__(self):
+        self.intervals: List[Tuple[datetime, datetime, int]] = []
+        self.by_id: Dict[int, Tuple[datetime, datetime]] = {}
+        # Upper bound on the duration of any indexed interval; never shrinks
+        # until the next reload, which keeps overlap lookups correct.
+        self.max_duration = timedelta(0)
+        self.loaded_at = time.monotonic()
+
+    def add(self, reservation_id: int, start_time: datetime, end_time: datetime) -> None:
+        """Insert an interval, replacing any previous interval with the same ID."""
+        self.remove(reservation_id)
+        start_time, end_time = to_utc_naive(start_time), to_utc_naive(end_time)
+        insort(self.intervals, (start_time, end_time, reservation_id))
+        self.by_id[reservation_id] = (start_time, end_time)
+        if end_time - start_time > self.max_duration:
+            self.max_duration = end_time - start_time
+
+    def remove(self, reservation_id: int) -> None:
+        """Remove an interval by reservation ID, if present."""
+        existing = self.by_id.pop(reservation_id, None)
+        if existing is None:
+            return
+        key = (existing[0], existing[1], reservation_id)
+        position = bisect_left(self.intervals, key)
+        if position < len(self.intervals) and self.intervals[position] == key:
+            del self.intervals[position]
+
+    def find_overlap(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        exclude_reservation_id: Optional[int] = None
+    ) -> Optional[int]:
+        """
+        Find an indexed interval overlapping [start_time, end_time).
+
+        Only intervals starting in (start_time - max_duration, end_time) can
+        overlap, so the candidates are located with two binary searches.
+
+        Returns:
+            ID of an overlapping reservation, or None
+        """
+        start_time, end_time = to_utc_naive(start_time), to_utc_naive(end_time)
+        low = bisect_left(self.intervals, (start_time - self.max_duration,))
+        high = bisect_left(self.intervals, (end_time,))
+
+        for position in range(low, high):
+            _, existing_end, reservation_id = self.intervals[position]
+            if existing_end > start_time and reservation_id != exclude_reservation_id:
+                return reservation_id
+        return None
+
+    def intervals_between(self, start_time: datetime, end_time: datetime) -> List[Tuple[datetime, datetime]]:
+        """
+        List the indexed intervals overlapping [start_time, end_time).
+
+        Returns:
+            (start, end) pairs sorted by start time
+        """
+        start_time, end_time = to_utc_naive(start_time), to_utc_naive(end_time)
+        low = bisect_left(self.intervals, (start_time - self.max_duration,))
+        high = bisect_left(self.intervals, (end_time,))
+
+        return [
+            (existing_start, existing_end)
+            for existing_start, existing_end, _ in self.intervals[low:high]
+            if existing_end > start_time
+        ]
+
+    def __len__(self) -> int:
+        return len(self.intervals)
+
+
+class ReservationIntervalIndex:
+    """
+    Per-group interval indexes, loaded lazily from the database.
+
+    Groups are reloaded after RESERVATION_INDEX_TTL_SECONDS so that writes
+    made by other processes are picked up within a bounded delay.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._groups: Dict[int, GroupIntervalIndex] = {}
+        # Per-group change counters, used to detect writes that raced with a load
+        self._versions: Dict[int, int] = {}
+        self._epoch = 0
+        # Never held across a database round trip, so it is safe to take
+        # from the event loop as well as from worker threads
+        self._lock = threading.Lock()
+
+    def _bump(self, group_id: int) -> None:
+        """Record a change to a group. Must be called with the lock held."""
+        self._versions[group_id] = self._versions.get(group_id, 0) + 1
+
+    def _is_fresh(self, group_index: GroupIntervalIndex) -> bool:
+        return time.monotonic() - group_index.loaded_at < self.ttl_seconds
+
+    def _load_group(self, db: Session, group_id: int) -> GroupIntervalIndex:
+        """Load all active reservations of a group into a new index."""
+        rows = db.query(
+            Reservation.id, Reservation.start_time, Reservation.end_time
+        ).filter(
+            Reservation.group_id == group_id,
+            Reservation.status.in_(ACTIVE_STATUSES)
+        ).all()
+
+        group_index = GroupIntervalIndex()
+        for reservation_id, start_time, end_time in rows:
+            group_index.add(reservation_id, start_time, end_time)
+
+        logger.debug(f"Loaded interval index for group {group_id} ({len(group_index)} reservations)")
+        return group_index
+
+    def get_group(self, db: Session, group_id: int) -> GroupIntervalIndex:
+        """
+        Get the index for a group, loading it from the database if needed.
+
+        Args:
+            db: Database session used for lazy loading
+            group_id: Group ID
+
+        Returns:
+            The group's interval index
+        """
+        with self._lock:
+            group_index = self._groups.get(group_id)
+            if group_index is not None and self._is_fresh(group_index):
+                return group_index
+            version = (self._epoch, self._versions.get(group_id, 0))
+
+        group_index = self._load_group(db, group_id)
+
+        with self._lock:
+            # A write committed while loading may be missing from the rows
+            # just read; use them for this call but do not cache them
+            if (self._epoch, self._versions.get(group_id, 0)) == version:
+                self._groups[group_id] = group_index
+        return group_index
+
+    def find_overlap(
+        self,
+        db: Session,
+        group_id: int,
+        start_time: datetime,
+        end_time: datetime,
+        exclude_reservation_id: Optional[int] = None
+    ) -> Optional[int]:
+        """
+        Find an active reservation in the group overlapping the given range.
+
+        Returns:
+            ID of an overlapping reservation, or None
+        """
+        group_index = self.get_group(db, group_id)
+        with self._lock:
+            return group_index.find_overlap(start_time, end_time, exclude_reservation_id)
+
+    def intervals_between(
+        self,
+        db: Session,
+        group_id: int,
+        start_time: datetime,
+        end_time: datetime
+    ) -> List[Tuple[datetime, datetime]]:
+        """
+        List the group's active intervals overlapping the given range.
+
+        Returns:
+            (start, end) pairs sorted by start time
+        """
+        group_index = self.get_group(db, group_id)
+        with self._lock:
+            return group_index.intervals_between(start_time, end_time)
+
+    def apply(self, reservation: Reservation) -> None:
+        """
+        Reflect a committed reservation in the index of its group.
+
+        Active reservations are added (or moved), anything else is removed.
+        Groups that are not loaded yet are left alone; they will be read
+        from the database on first use.
+        """
+        self.apply_change(
+            reservation.group_id, reservation.id,
+            reservation.start_time, reservation.end_time, reservation.status
+        )
+
+    def apply_change(
+        self,
+        group_id: int,
+        reservation_id: int,
+        start_time: datetime,
+        end_time: datetime,
+        reservation_status: ReservationStatus
+    ) -> None:
+        """
+        Reflect a committed change described by its fields, e.g. from an event.
+
+        A change the index already holds, such as one this worker made
+        itself, is skipped.
+        """
+        active = reservation_status in ACTIVE_STATUSES
+        with self._lock:
+            self._bump(group_id)
+            group_index = self._groups.get(group_id)
+            if group_index is None:
+                return
+            held = group_index.by_id.get(reservation_id)
+            if held == ((to_utc_naive(start_time), to_utc_naive(end_time)) if active else None):
+                return
+            if active:
+                group_index.add(reservation_id, start_time, end_time)
+            else:
+                group_index.remove(reservation_id)
+
+    def apply_event(self, group_id: int, event_type: str, data) -> None:
+        """
+        Reflect a reservation event received from another worker.
+
+        Args:
+            group_id: Group ID of the event
+            event_type: reservation_created, _updated, _deleted or _series_created
+            data: The event's data; a list for a series
+        """
+        if event_type == "reservation_deleted":
+            self.discard(group_id, data["id"])
+            return
+        for item in (data if event_type == "reservation_series_created" else [data]):
+            self.apply_change(
+                group_id, item["id"],
+                datetime.fromisoformat(item["start_time"]),
+                datetime.fromisoformat(item["end_time"]),
+                ReservationStatus(item["status"])
+            )
+
+    def discard(self, group_id: int, reservation_id: int) -> None:
+        """Remove a reservation from the index of its group, if loaded."""
+        with self._lock:
+            self._bump(group_id)
+            group_index = self._groups.get(group_id)
+            if group_index is not None:
+                group_index.remove(reservation_id)
+
+    def invalidate(self, group_id: Optional[int] = None) -> None:
+        """Drop the index of one group, or of every group when group_id is None."""
+        with self._lock:
+            if group_id is None:
+                self._groups.clear()
+                self._epoch += 1
+            else:
+                self._groups.pop(group_id, None)
+                self._bump(group_id)
+
+
+# Global interval index instance
+reservation_index = ReservationIntervalIndex(settings.RESERVATION_INDEX_TTL_SECONDS)
@@ -0,0 +1,114 @@
+"""
+Login throttling.
+Token buckets per client IP and per username in front of the login
+endpoint, so a credential-stuffing burst is rejected before it reaches
+bcrypt. Bucket state is kept in bounded LRUs.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Tuple
+from fastapi import HTTPException, status
+from ..core.config import settings
+
+
+class TokenBuckets:
+    """
+    Token buckets keyed by an arbitrary string, in a bounded LRU.
+
+    Each bucket holds up to `burst` tokens and refills at `per_minute`
+    tokens a minute; a request takes one token. Evicting a bucket forgets
+    its history, which at worst gives that key a fresh burst.
+    """
+
+    def __init__(self, burst: int, per_minute: float, max_keys: int):
+        self.burst = burst
+        self.rate = per_minute / 60
+        self.max_keys = max_keys
+        # key -> (tokens, time of last refill)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str) -> float:
+        """
+        Take a token from a key's bucket.
+
+        Args:
+            key: Bucket key, e.g. a client IP
+
+        Returns:
+            0 if a token was taken, else seconds until one is available
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            elif self.rate > 0:
+                wait = (1 - tokens) / self.rate
+            else:
+                wait = math.inf
+
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+        return wait
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class LoginThrottle:
+    """Per-IP and per-username login limits."""
+
+    def __init__(self):
+        self.by_ip = TokenBuckets(
+            settings.LOGIN_IP_BURST, settings.LOGIN_IP_PER_MINUTE, settings.LOGIN_THROTTLE_MAX_KEYS
+        )
+        self.by_username = TokenBuckets(
+            settings.LOGIN_USERNAME_BURST, settings.LOGIN_USERNAME_PER_MINUTE, settings.LOGIN_THROTTLE_MAX_KEYS
+        )
+        self.rejected = 0
+
+    def check(self, client_ip: str, username: str) -> None:
+        """
+        Count a login attempt against the client's and the username's buckets.
+
+        The IP is checked first, so a client that is already throttled does
+        not use up the username's tokens and lock its real owner out.
+
+        Args:
+            client_ip: Address of the client
+            username: Username being logged in to
+
+        Raises:
+            HTTPException: 429 with Retry-After if either bucket is empty
+        """
+        if not settings.LOGIN_THROTTLE_ENABLED:
+            return
+
+        wait = self.by_ip.take(client_ip)
+        if not wait:
+            # Usernames are case-insensitive in MySQL, so are their buckets
+            wait = self.by_username.take(username.strip().lower())
+        if not wait:
+            return
+
+        self.rejected += 1
+        retry_after = 3600 if math.isinf(wait) else max(1, math.ceil(wait))
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts. Try again later.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+# Global login throttle instance
+login_throttle = LoginThrottle()
@@ -0,0 +1,184 @@
+"""
+Transactional outbox for WebSocket events.
+Services write group events to the outbox table in the same transaction as
+the change they describe. A background dispatcher broadcasts them after
+commit, so requests do not wait for the fan-out and a committed change is
+broadcast even if the process dies right after the commit.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..database.connection import AsyncSessionLocal
+from ..models.models import OutboxEvent
+from .websocket_manager import manager
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxService:
+    """Service for outbox table operations."""
+
+    @staticmethod
+    def add(db: Session, group_id: int, event_type: str, payload) -> None:
+        """
+        Queue a group event in the caller's transaction.
+
+        The event is committed or rolled back together with the change it
+        describes; nothing is broadcast before the commit.
+
+        Args:
+            db: Database session
+            group_id: Group ID to broadcast to
+            event_type: WebSocket message type, e.g. "reservation_created"
+            payload: JSON-serializable message data
+        """
+        db.add(OutboxEvent(group_id=group_id, event_type=event_type, payload=payload))
+
+    @staticmethod
+    def claim_batch(db: Session, limit: int) -> List[OutboxEvent]:
+        """
+        Claim the oldest unclaimed events and commit.
+
+        Rows locked by another dispatcher's claim are skipped rather than
+        waited for, and the lock is released by the commit, so no lock is
+        held while the events are broadcast. A claim older than
+        OUTBOX_CLAIM_TIMEOUT_SECONDS belongs to a dispatcher that died before
+        removing its events, which are then claimed again.
+
+        Events of a group are only claimed up to the first earlier event of
+        that group held by another dispatcher, so a group's events are
+        broadcast one dispatcher at a time, in order.
+
+        Args:
+            db: Database session
+            limit: Maximum number of events
+
+        Returns:
+            Events, oldest first
+        """
+        now = datetime.utcnow()
+        events = db.query(OutboxEvent).filter(
+            or_(
+                OutboxEvent.claimed_at.is_(None),
+                OutboxEvent.claimed_at < now - timedelta(seconds=settings.OUTBOX_CLAIM_TIMEOUT_SECONDS)
+            )
+        ).order_by(OutboxEvent.id).limit(limit).with_for_update(skip_locked=True).all()
+
+        if events:
+            # Every pending event of these groups up to the last one locked here
+            ours = {event.id for event in events}
+            pending = db.query(OutboxEvent.id, OutboxEvent.group_id).filter(
+                OutboxEvent.group_id.in_({event.group_id for event in events}),
+                OutboxEvent.id <= max(ours)
+            ).order_by(OutboxEvent.id).all()
+            # A group is blocked from its first event held elsewhere onwards
+            claimable = set()
+            blocked = set()
+            for event_id, group_id in pending:
+                if event_id not in ours:
+                    blocked.add(group_id)
+                elif group_id not in blocked:
+                    claimable.add(event_id)
+            events = [event for event in events if event.id in claimable]
+
+        for event in events:
+            event.claimed_at = now
+        db.commit()
+        return events
+
+    @staticmethod
+    def remove(db: Session, event_ids: List[int]) -> None:
+        """
+        Delete broadcast events and commit.
+
+        Args:
+            db: Database session
+            event_ids: IDs of the events to delete
+        """
+        db.query(OutboxEvent).filter(OutboxEvent.id.in_(event_ids)).delete(synchronize_session=False)
+        db.commit()
+
+
+class OutboxDispatcher:
+    """
+    Background task that broadcasts outbox events.
+
+    Woken by notify() after a request commits events, and polls every
+    OUTBOX_POLL_INTERVAL_SECONDS for events committed by other workers or
+    left behind by a crash. Delivery is at least once: events broadcast
+    just before a crash are broadcast again once their claim times out.
+    """
+
+    def __init__(self):
+        self.wakeup: Optional[asyncio.Event] = None
+        self.task: Optional[asyncio.Task] = None
+        self.dispatched = 0
+
+    def notify(self):
+        """Wake the dispatcher; call after committing outbox events."""
+        if self.wakeup is not None:
+            self.wakeup.set()
+
+    async def start(self):
+        """Start dispatching in the background."""
+        # Created here, so it belongs to the running event loop
+        self.wakeup = asyncio.Event()
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the dispatcher. Pending events stay in the outbox for the next start."""
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    async def dispatch_batch(self) -> int:
+        """
+        Claim one batch of pending events, broadcast them and delete them.
+
+        Returns:
+            Number of events broadcast
+        """
+        async with AsyncSessionLocal() as db:
+            events = await db.run_sync(OutboxService.claim_batch, settings.OUTBOX_BATCH_SIZE)
+            if not events:
+                return 0
+
+            for event in events:
+                await manager.broadcast_to_group(
+                    {"type": event.event_type, "data": event.payload}, event.group_id
+                )
+            await db.run_sync(OutboxService.remove, [event.id for event in events])
+
+        self.dispatched += len(events)
+        return len(events)
+
+    async def _run(self):
+        while True:
+            # Cleared first, so events committed during a batch trigger another round
+            self.wakeup.clear()
+            try:
+                while await self.dispatch_batch() == settings.OUTBOX_BATCH_SIZE:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error dispatching outbox events: {e}")
+
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=settings.OUTBOX_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+
+# Global outbox dispatcher instance
+outbox_dispatcher = OutboxDispatcher()
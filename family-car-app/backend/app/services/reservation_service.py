@@ -3,14 +3,79 @@ Reservation service.
 Handles reservation creation, updates, and overlap detection.
 """
 
+import base64
+import heapq
 import logging
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, Query, joinedload, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, func
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
-from datetime import datetime, timezone
-from typing import List, Optional
-from ..models.models import Reservation, ReservationStatus, Rule
-from ..schemas.schemas import ReservationCreate, ReservationUpdate, ReservationResponse
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional, Tuple, Union
+from zoneinfo import ZoneInfo
+from ..core.config import settings
+from ..core.timezones import to_utc_naive
+from ..models.models import Reservation, ReservationHistory, ReservationStatus
+from ..schemas.schemas import ReservationCreate, ReservationUpdate, ReservationResponse, ReservationSeriesCreate
+from .interval_index import reservation_index, ACTIVE_STATUSES
+from .rule_cache import rule_cache, RuleSnapshot
+from .slot_service import SlotService
+from .archive_service import ArchiveService
+from .outbox_service import OutboxService
+
+logger = logging.getLogger(__name__)
+
+AnyReservation = Union[Reservation, ReservationHistory]
+
+
+def _newest_first(reservation: AnyReservation) -> Tuple[datetime, int]:
+    """Sort key matching the (start_time, id) order of reservation listings."""
+    return reservation.start_time, reservation.id
+
+
+def _before_cursor(model, cursor_start: datetime, cursor_id: int):
+    """Keyset condition selecting rows after a cursor in newest-first order."""
+    return or_(
+        model.start_time < cursor_start,
+        and_(
+            model.start_time == cursor_start,
+            model.id < cursor_id
+        )
+    )
+
+
+def encode_cursor(value: datetime, row_id: int) -> str:
+    """
+    Encode a keyset position as an opaque cursor string.
+    
+    Args:
+        value: Timestamp column value of the last row returned
+        row_id: ID of the last row returned
+        
+    Returns:
+        URL-safe cursor string
+    """
+    raw = f"{value.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+    
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, row_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(value), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
 
 
 class ReservationService:
@@ -26,6 +91,48 @@ class ReservationService:
     ) -> bool:
         """
         Check if a reservation overlaps with existing reservations.
+
+        Uses the in-memory interval index of the group. A hit from the index
+        is confirmed against the database, so an entry that went stale in
+        another process cannot reject a valid reservation. With several
+        workers, each applies the reservation events of other workers to
+        its index as they arrive over the event bus; a booking that slips
+        through before then is rejected by its reservation slots.
+        
+        Args:
+            db: Database session
+            group_id: Group ID to check within
+            start_time: Start time of reservation
+            end_time: End time of reservation
+            exclude_reservation_id: Optional reservation ID to exclude from check (for updates)
+            
+        Returns:
+            True if there's an overlap, False otherwise
+        """
+        if settings.RESERVATION_INDEX_ENABLED:
+            try:
+                overlapping_id = reservation_index.find_overlap(
+                    db, group_id, start_time, end_time, exclude_reservation_id
+                )
+                if overlapping_id is None:
+                    return False
+            except Exception as e:
+                logger.error(f"Interval index lookup failed for group {group_id}, using database: {e}")
+
+        return ReservationService.check_overlap_db(
+            db, group_id, start_time, end_time, exclude_reservation_id
+        )
+
+    @staticmethod
+    def check_overlap_db(
+        db: Session,
+        group_id: int,
+        start_time: datetime,
+        end_time: datetime,
+        exclude_reservation_id: Optional[int] = None
+    ) -> bool:
+        """
+        Check for overlapping reservations with a database query.
         
         Args:
             db: Database session
@@ -69,14 +176,21 @@ class ReservationService:
         return overlapping is not None
     
     @staticmethod
-    def validate_reservation_rules(
-        db: Session,
-        group_id: int,
+    def check_reservation_rules(
+        rules: RuleSnapshot,
         start_time: datetime,
         end_time: datetime
-    ) -> None:
+    ) -> Optional[str]:
         """
-        Validate reservation against group rules, using timezone-aware datetimes.
+        Check a reservation time range against a group's rule snapshot.
+        
+        Args:
+            rules: The group's rule snapshot
+            start_time: Start time of reservation
+            end_time: End time of reservation
+            
+        Returns:
+            A description of the violated rule, or None if the range is allowed
         """
         if start_time.tzinfo is None:
             start_time = start_time.replace(tzinfo=timezone.utc)
@@ -85,43 +199,64 @@ class ReservationService:
 
         now_utc = datetime.now(timezone.utc)
 
-        rules = db.query(Rule).filter(
-            Rule.group_id == group_id,
-            Rule.is_active == True
-        ).all()
-
-        rule_dict = {rule.rule_type: rule.rule_value for rule in rules}
-
         # Check max_reservation_hours
-        if 'max_reservation_hours' in rule_dict:
-            max_hours = float(rule_dict['max_reservation_hours'])
+        if rules.max_reservation_hours is not None:
+            max_hours = rules.max_reservation_hours
             duration_hours = (end_time - start_time).total_seconds() / 3600
             logging.info(f"[Rule Check] max_reservation_hours={max_hours}, reservation_duration={duration_hours}")
             if duration_hours > max_hours:
                 logging.warning(f"Reservation violates max_reservation_hours: {duration_hours} > {max_hours}")
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Reservation cannot exceed {max_hours} hours",
-                )
+                return f"Reservation cannot exceed {max_hours} hours"
 
         # Check advance_booking_days
-        if 'advance_booking_days' in rule_dict:
-            max_days = int(rule_dict['advance_booking_days'])
+        if rules.advance_booking_days is not None:
+            max_days = rules.advance_booking_days
             days_in_advance = (start_time - now_utc).days
             logging.info(f"[Rule Check] advance_booking_days={max_days}, days_in_advance={days_in_advance}")
             if days_in_advance > max_days:
                 logging.warning(f"Reservation violates advance_booking_days: {days_in_advance} > {max_days}")
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Cannot book more than {max_days} days in advance",
-                )
+                return f"Cannot book more than {max_days} days in advance"
             if days_in_advance < 0:
                 logging.warning(f"Reservation in the past: days_in_advance={days_in_advance}")
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Reservation cannot be in the past",
-                )
+                return "Reservation cannot be in the past"
+
+        return None
+
+    @staticmethod
+    def validate_reservation_rules(
+        db: Session,
+        group_id: int,
+        start_time: datetime,
+        end_time: datetime
+    ) -> None:
+        """
+        Validate reservation against group rules, using timezone-aware datetimes.
+        """
+        rules = rule_cache.get(db, group_id)
+
+        violation = ReservationService.check_reservation_rules(rules, start_time, end_time)
+        if violation:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=violation,
+            )
                 
+    @staticmethod
+    def get_initial_status(db: Session, group_id: int, is_admin: bool = False) -> ReservationStatus:
+        """
+        Determine the status a new reservation starts in.
+        
+        Args:
+            db: Database session
+            group_id: Group ID
+            is_admin: Whether the user is an admin
+            
+        Returns:
+            PENDING if the group requires admin approval and the user is not an admin, else APPROVED
+        """
+        requires_approval = rule_cache.get(db, group_id).admin_approval_required
+        return ReservationStatus.PENDING if (requires_approval and not is_admin) else ReservationStatus.APPROVED
+
     @staticmethod
     def create_reservation(
         db: Session,
@@ -152,9 +287,10 @@ class ReservationService:
         )
         
         # Check for overlaps
-        if ReservationService.check_overlap(
+        overlapping = ReservationService.check_overlap(
             db, group_id, reservation_data.start_time, reservation_data.end_time
-        ):
+        )
+        if overlapping:
             if not is_admin:
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
@@ -162,16 +298,7 @@ class ReservationService:
                 )
         
         # Determine initial status
-        rules = db.query(Rule).filter(
-            and_(
-                Rule.group_id == group_id,
-                Rule.rule_type == 'admin_approval_required',
-                Rule.is_active == True
-            )
-        ).first()
-        
-        requires_approval = rules and rules.rule_value.lower() == 'true'
-        initial_status = ReservationStatus.PENDING if (requires_approval and not is_admin) else ReservationStatus.APPROVED
+        initial_status = ReservationService.get_initial_status(db, group_id, is_admin)
         
         # Create reservation
         new_reservation = Reservation(
@@ -184,22 +311,255 @@ class ReservationService:
         )
         
         db.add(new_reservation)
-        db.commit()
-        db.refresh(new_reservation)
+        try:
+            db.flush()
+            # Slot rows make a concurrent overlapping insert fail atomically.
+            # An admin override that overlaps on purpose holds no slots.
+            if not overlapping:
+                SlotService.claim(db, [(
+                    new_reservation.id, group_id,
+                    reservation_data.start_time, reservation_data.end_time
+                )])
+            new_reservation = ReservationService.reload_with_user(db, new_reservation.id)
+            OutboxService.add(
+                db, group_id, "reservation_created",
+                ReservationResponse.model_validate(new_reservation).model_dump(mode='json')
+            )
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Reservation overlaps with an existing reservation",
+            )
+        reservation_index.apply(new_reservation)
         
         return new_reservation
     
     @staticmethod
-    def get_reservations(
+    def expand_series(series_data: ReservationSeriesCreate) -> List[Tuple[datetime, datetime]]:
+        """
+        Expand a recurrence into its individual occurrences.
+        
+        The wall-clock times are interpreted in the series' time zone on each
+        day, so an occurrence keeps its local time across a DST change.
+        
+        Args:
+            series_data: Recurrence definition
+            
+        Returns:
+            (start, end) pairs in naive UTC, in chronological order
+            
+        Raises:
+            HTTPException: If the series has more occurrences than allowed
+        """
+        weekdays = set(series_data.weekdays)
+        tz = ZoneInfo(series_data.timezone)
+        occurrences = []
+        day = series_data.start_date
+        
+        while day <= series_data.end_date:
+            if day.weekday() in weekdays:
+                occurrences.append((
+                    to_utc_naive(datetime.combine(day, series_data.start_time, tzinfo=tz)),
+                    to_utc_naive(datetime.combine(day, series_data.end_time, tzinfo=tz))
+                ))
+                if len(occurrences) > settings.MAX_SERIES_OCCURRENCES:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"A series cannot have more than {settings.MAX_SERIES_OCCURRENCES} occurrences",
+                    )
+            day += timedelta(days=1)
+        
+        return occurrences
+
+    @staticmethod
+    def create_reservation_series(
+        db: Session,
+        user_id: int,
+        group_id: int,
+        series_data: ReservationSeriesCreate,
+        is_admin: bool = False
+    ) -> Tuple[List[Reservation], List[Tuple[datetime, datetime, str]]]:
+        """
+        Create every occurrence of a recurring reservation in one transaction.
+        
+        Occurrences are checked against the rules and against the group's
+        existing reservations in a single merge pass over both sorted lists.
+        Conflicting occurrences are skipped; the rest are inserted in one
+        flush.
+        
+        Args:
+            db: Database session
+            user_id: User ID creating the series
+            group_id: Group ID
+            series_data: Recurrence definition
+            is_admin: Whether the user is an admin (admins may overlap, as in create_reservation)
+            
+        Returns:
+            Tuple of (created reservations, conflicts as (start, end, reason))
+        """
+        occurrences = ReservationService.expand_series(series_data)
+        if not occurrences:
+            return [], []
+        
+        rules = rule_cache.get(db, group_id)
+        
+        existing = db.query(Reservation.start_time, Reservation.end_time).filter(
+            Reservation.group_id == group_id,
+            Reservation.status.in_(ACTIVE_STATUSES),
+            Reservation.start_time < occurrences[-1][1],
+            Reservation.end_time > occurrences[0][0]
+        ).order_by(Reservation.start_time).all()
+        
+        accepted = []
+        conflicts = []
+        position = 0
+        for start_time, end_time in occurrences:
+            violation = ReservationService.check_reservation_rules(rules, start_time, end_time)
+            if violation:
+                conflicts.append((start_time, end_time, violation))
+                continue
+            
+            # Existing reservations ending before this occurrence cannot
+            # touch any later occurrence either
+            while position < len(existing) and existing[position][1] <= start_time:
+                position += 1
+            
+            overlapping = False
+            candidate = position
+            while candidate < len(existing) and existing[candidate][0] < end_time:
+                if existing[candidate][1] > start_time:
+                    overlapping = True
+                    break
+                candidate += 1
+            
+            if overlapping and not is_admin:
+                conflicts.append((start_time, end_time, "Overlaps with an existing reservation"))
+                continue
+            
+            accepted.append((start_time, end_time, overlapping))
+        
+        if not accepted:
+            return [], conflicts
+        
+        initial_status = ReservationService.get_initial_status(db, group_id, is_admin)
+        new_reservations = [
+            Reservation(
+                user_id=user_id,
+                group_id=group_id,
+                start_time=start_time,
+                end_time=end_time,
+                status=initial_status,
+                notes=series_data.notes,
+            )
+            for start_time, end_time, _ in accepted
+        ]
+        db.add_all(new_reservations)
+        # Flushed as ORM objects so each row's own ID is known; MySQL has no
+        # INSERT ... RETURNING, and a lookup by start time would also match
+        # earlier reservations of the same user
+        db.flush()
+        
+        unclaimed_ids = {
+            reservation.id
+            for reservation, (_, _, overlapping) in zip(new_reservations, accepted)
+            if overlapping
+        }
+        created = db.query(Reservation).options(selectinload(Reservation.user)).filter(
+            Reservation.id.in_([reservation.id for reservation in new_reservations])
+        ).order_by(Reservation.start_time).all()
+        
+        try:
+            SlotService.claim(db, [
+                (reservation.id, group_id, reservation.start_time, reservation.end_time)
+                for reservation in created
+                if reservation.id not in unclaimed_ids
+            ])
+            OutboxService.add(db, group_id, "reservation_series_created", [
+                ReservationResponse.model_validate(reservation).model_dump(mode='json')
+                for reservation in created
+            ])
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Series overlaps with a reservation made concurrently, please retry",
+            )
+        
+        for reservation in created:
+            reservation_index.apply(reservation)
+        
+        return created, conflicts
+
+    @staticmethod
+    def get_reservation(db: Session, reservation_id: int, group_id: int) -> AnyReservation:
+        """
+        Get a single reservation of a group, with its user.
+        
+        Falls back to the history table for archived reservations.
+        
+        Args:
+            db: Database session
+            reservation_id: Reservation ID
+            group_id: Group ID the reservation must belong to
+            
+        Returns:
+            The reservation
+            
+        Raises:
+            HTTPException: If the reservation is not found in the group
+        """
+        reservation = db.query(Reservation).options(joinedload(Reservation.user)).filter(
+            Reservation.id == reservation_id,
+            Reservation.group_id == group_id
+        ).first()
+        
+        if not reservation:
+            reservation = ArchiveService.get_archived_reservation(db, reservation_id, group_id)
+        
+        if not reservation:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Reservation not found",
+            )
+        
+        return reservation
+    
+    @staticmethod
+    def reload_with_user(db: Session, reservation_id: int) -> Reservation:
+        """
+        Reload a reservation after flush together with its user.
+        
+        One joined SELECT replaces the refresh plus the lazy load of
+        Reservation.user that serializing a ReservationResponse would cause.
+        
+        Args:
+            db: Database session
+            reservation_id: Reservation ID
+            
+        Returns:
+            The refreshed reservation
+        """
+        return db.query(Reservation).options(joinedload(Reservation.user)).populate_existing().filter(
+            Reservation.id == reservation_id
+        ).one()
+    
+    @staticmethod
+    def build_reservations_query(
         db: Session,
         group_id: int,
         status: Optional[ReservationStatus] = None,
         user_id: Optional[int] = None,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None
-    ) -> List[Reservation]:
+    ) -> Query:
         """
-        Get reservations with optional filters.
+        Build the filtered reservation query, newest first.
+        
+        Rows are ordered by (start_time, id) descending so that the order is
+        total and can be resumed with a keyset cursor.
         
         Args:
             db: Database session
@@ -210,9 +570,12 @@ class ReservationService:
             end_date: Optional end date filter
             
         Returns:
-            List of reservations
+            Ordered query
         """
-        query = db.query(Reservation).filter(Reservation.group_id == group_id)
+        # Users are loaded in one extra query per batch instead of one per row
+        query = db.query(Reservation).options(selectinload(Reservation.user)).filter(
+            Reservation.group_id == group_id
+        )
         
         if status:
             query = query.filter(Reservation.status == status)
@@ -226,7 +589,283 @@ class ReservationService:
         if end_date:
             query = query.filter(Reservation.end_time <= end_date)
         
-        return query.order_by(Reservation.start_time.desc()).all()
+        return query.order_by(Reservation.start_time.desc(), Reservation.id.desc())
+    
+    @staticmethod
+    def get_reservations(
+        db: Session,
+        group_id: int,
+        status: Optional[ReservationStatus] = None,
+        user_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[AnyReservation], Optional[str]]:
+        """
+        Get reservations with optional filters, one keyset page at a time.
+        
+        Archived reservations are merged in when the range needs them.
+        
+        Args:
+            db: Database session
+            group_id: Group ID
+            status: Optional status filter
+            user_id: Optional user ID filter
+            start_date: Optional start date filter
+            end_date: Optional end date filter
+            cursor: Optional cursor returned with the previous page
+            limit: Optional page size; all matching rows are returned when omitted
+            
+        Returns:
+            Tuple of (reservations, cursor for the next page or None)
+        """
+        query = ReservationService.build_reservations_query(
+            db, group_id, status, user_id, start_date, end_date
+        )
+        
+        # Archived reservations all start before the horizon, so the history
+        # table is only read when the requested range reaches back that far
+        horizon = ArchiveService.history_horizon(db, group_id)
+        history_query = None
+        if horizon is not None and (start_date is None or start_date < horizon):
+            history_query = ArchiveService.build_history_query(
+                db, group_id, status, user_id, start_date, end_date
+            )
+        
+        if cursor:
+            cursor_start, cursor_id = decode_cursor(cursor)
+            query = query.filter(_before_cursor(Reservation, cursor_start, cursor_id))
+            if history_query is not None:
+                history_query = history_query.filter(
+                    _before_cursor(ReservationHistory, cursor_start, cursor_id)
+                )
+        
+        if limit is None:
+            reservations = query.all()
+            if history_query is not None:
+                reservations = list(heapq.merge(
+                    reservations, history_query.all(), key=_newest_first, reverse=True
+                ))
+            return reservations, None
+        
+        # Fetch one extra row to know whether another page exists
+        reservations = query.limit(limit + 1).all()
+        
+        # Skip the history table when this page and the next row are all
+        # known to start after the horizon
+        if history_query is not None and (
+            len(reservations) <= limit or reservations[limit - 1].start_time < horizon
+        ):
+            reservations = list(heapq.merge(
+                reservations, history_query.limit(limit + 1).all(), key=_newest_first, reverse=True
+            ))
+        
+        if len(reservations) <= limit:
+            return reservations, None
+        
+        reservations = reservations[:limit]
+        last = reservations[-1]
+        return reservations, encode_cursor(last.start_time, last.id)
+    
+    @staticmethod
+    def stream_reservations(
+        db: Session,
+        group_id: int,
+        status: Optional[ReservationStatus] = None,
+        user_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Iterator[AnyReservation]:
+        """
+        Iterate over filtered reservations, reading from the DB in chunks.
+        
+        Args:
+            db: Database session (must stay open while iterating)
+            group_id: Group ID
+            status: Optional status filter
+            user_id: Optional user ID filter
+            start_date: Optional start date filter
+            end_date: Optional end date filter
+            
+        Yields:
+            Reservations, newest first, including archived ones when the
+            range reaches back before the history horizon
+        """
+        chunk_size = settings.RESERVATION_STREAM_CHUNK_SIZE
+        query = ReservationService.build_reservations_query(
+            db, group_id, status, user_id, start_date, end_date
+        )
+        
+        horizon = ArchiveService.history_horizon(db, group_id)
+        if horizon is None or (start_date is not None and start_date >= horizon):
+            yield from query.yield_per(chunk_size)
+            return
+        
+        # Hot rows starting at or after the horizon precede every archived row.
+        # The older hot rows (not archived yet) are few and are read up front,
+        # so that only one server-side cursor is open at a time.
+        yield from query.filter(Reservation.start_time >= horizon).yield_per(chunk_size)
+        older = query.filter(Reservation.start_time < horizon).all()
+        history = ArchiveService.build_history_query(
+            db, group_id, status, user_id, start_date, end_date
+        ).yield_per(chunk_size)
+        yield from heapq.merge(older, history, key=_newest_first, reverse=True)
+    
+    @staticmethod
+    def get_changes(
+        db: Session,
+        group_id: int,
+        since: Optional[str] = None,
+        limit: int = 500
+    ) -> Tuple[List[Reservation], str, bool]:
+        """
+        Get reservations created, updated or cancelled after a cursor.
+        
+        Rows are returned in (updated_at, id) order. Because updated_at has
+        one-second resolution and a transaction may commit after its
+        timestamp was taken, the returned cursor never moves past
+        CHANGES_SAFETY_WINDOW_SECONDS before the database clock; rows in
+        that window may be sent again and should be applied by ID.
+        
+        Args:
+            db: Database session
+            group_id: Group ID
+            since: Cursor returned by the previous call, or None for everything
+            limit: Maximum number of rows to return
+            
+        Returns:
+            Tuple of (changed reservations, next cursor, whether more rows are waiting)
+        """
+        query = db.query(Reservation).options(selectinload(Reservation.user)).filter(
+            Reservation.group_id == group_id
+        )
+        
+        if since:
+            since_time, since_id = decode_cursor(since)
+            query = query.filter(
+                or_(
+                    Reservation.updated_at > since_time,
+                    and_(
+                        Reservation.updated_at == since_time,
+                        Reservation.id > since_id
+                    )
+                )
+            )
+        
+        changes = query.order_by(Reservation.updated_at, Reservation.id).limit(limit + 1).all()
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        
+        if has_more:
+            last = changes[-1]
+            return changes, encode_cursor(last.updated_at, last.id), True
+        
+        # Caught up: hold the cursor back by the safety window
+        safe_position = ReservationService._safe_change_position(db)
+        
+        position = safe_position
+        if changes:
+            position = min((changes[-1].updated_at, changes[-1].id), safe_position)
+        
+        return changes, encode_cursor(*position), False
+    
+    @staticmethod
+    def _safe_change_position(db: Session) -> Tuple[datetime, int]:
+        """Latest (updated_at, id) position that no uncommitted change can still land before."""
+        db_now = db.query(func.current_timestamp()).scalar()
+        if isinstance(db_now, str):
+            db_now = datetime.fromisoformat(db_now)
+        return db_now - timedelta(seconds=settings.CHANGES_SAFETY_WINDOW_SECONDS), 0
+    
+    @staticmethod
+    def get_changes_cursor() -> str:
+        """
+        Get a get_changes cursor for the current moment.
+        
+        A client that holds every change up to now can later call
+        get_changes with this cursor to catch up, instead of reloading.
+        Taken from the application clock, held back by
+        CHANGES_SAFETY_WINDOW_SECONDS, so handing one out on every
+        WebSocket connect needs no database round trip.
+        
+        Returns:
+            Cursor for get_changes
+        """
+        safe_time = datetime.utcnow() - timedelta(seconds=settings.CHANGES_SAFETY_WINDOW_SECONDS)
+        return encode_cursor(safe_time.replace(microsecond=0), 0)
+    
+    @staticmethod
+    def get_availability(
+        db: Session,
+        group_id: int,
+        range_start: datetime,
+        range_end: datetime,
+        min_duration: timedelta = timedelta(0)
+    ) -> Tuple[List[Tuple[datetime, datetime]], Optional[float]]:
+        """
+        Compute the free windows of a group's car within a time range.
+        
+        The range is trimmed to what the group's rules allow to be booked
+        (nothing in the past, nothing beyond advance_booking_days), and the
+        active reservations inside it are merged in a single sweep.
+        
+        Args:
+            db: Database session
+            group_id: Group ID
+            range_start: Start of the searched range
+            range_end: End of the searched range
+            min_duration: Minimum length of a returned window
+            
+        Returns:
+            Tuple of (free windows as (start, end) pairs, max_reservation_hours or None)
+        """
+        # Compare in the same naive UTC form the reservation times are stored in
+        range_start = to_utc_naive(range_start)
+        range_end = to_utc_naive(range_end)
+
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        rules = rule_cache.get(db, group_id)
+
+        max_hours = rules.max_reservation_hours
+        if max_hours is not None:
+            # No booking can be longer than the rule allows
+            if min_duration > timedelta(hours=max_hours):
+                return [], max_hours
+
+        # Same limits as validate_reservation_rules: no past starts, and
+        # (start - now).days must not exceed advance_booking_days
+        if rules.advance_booking_days is not None:
+            range_start = max(range_start, now)
+            range_end = min(range_end, now + timedelta(days=rules.advance_booking_days + 1))
+
+        if range_end <= range_start:
+            return [], max_hours
+
+        if settings.RESERVATION_INDEX_ENABLED:
+            busy = reservation_index.intervals_between(db, group_id, range_start, range_end)
+        else:
+            busy = db.query(Reservation.start_time, Reservation.end_time).filter(
+                Reservation.group_id == group_id,
+                Reservation.status.in_(ACTIVE_STATUSES),
+                Reservation.start_time < range_end,
+                Reservation.end_time > range_start
+            ).order_by(Reservation.start_time).all()
+
+        # Sweep over the busy intervals, emitting the gaps between them
+        windows = []
+        cursor = range_start
+        for busy_start, busy_end in busy:
+            if busy_start > cursor and busy_start - cursor >= min_duration:
+                windows.append((cursor, min(busy_start, range_end)))
+            cursor = max(cursor, busy_end)
+            if cursor >= range_end:
+                break
+
+        if cursor < range_end and range_end - cursor >= min_duration:
+            windows.append((cursor, range_end))
+
+        return windows, max_hours
     
     @staticmethod
     def update_reservation(
@@ -275,11 +914,19 @@ class ReservationService:
         # If times are being updated, check for overlaps
         new_start = update_dict.get('start_time', reservation.start_time)
         new_end = update_dict.get('end_time', reservation.end_time)
+        times_changed = 'start_time' in update_dict or 'end_time' in update_dict
+        previous_times = {
+            "previous_start_time": reservation.start_time.isoformat(),
+            "previous_end_time": reservation.end_time.isoformat(),
+        }
+        was_active = reservation.status in ACTIVE_STATUSES
+        overlapping = False
         
-        if 'start_time' in update_dict or 'end_time' in update_dict:
-            if ReservationService.check_overlap(
+        if times_changed:
+            overlapping = ReservationService.check_overlap(
                 db, group_id, new_start, new_end, exclude_reservation_id=reservation_id
-            ):
+            )
+            if overlapping:
                 if not is_admin:
                     raise HTTPException(
                         status_code=status.HTTP_409_CONFLICT,
@@ -290,8 +937,30 @@ class ReservationService:
         for key, value in update_dict.items():
             setattr(reservation, key, value)
         
-        db.commit()
-        db.refresh(reservation)
+        # Move the slot rows along with the reservation
+        is_active = reservation.status in ACTIVE_STATUSES
+        try:
+            if times_changed or was_active != is_active:
+                SlotService.release(db, reservation_id)
+                if is_active and not overlapping:
+                    SlotService.claim(db, [(
+                        reservation_id, reservation.group_id, new_start, new_end
+                    )])
+            db.flush()
+            reservation = ReservationService.reload_with_user(db, reservation_id)
+            payload = ReservationResponse.model_validate(reservation).model_dump(mode='json')
+            if times_changed:
+                # Lets subscribers to the old time window learn it moved away
+                payload.update(previous_times)
+            OutboxService.add(db, reservation.group_id, "reservation_updated", payload)
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Updated reservation overlaps with an existing reservation",
+            )
+        reservation_index.apply(reservation)
         
         return reservation
     
@@ -301,7 +970,7 @@ class ReservationService:
         reservation_id: int,
         user_id: int,
         is_admin: bool = False
-    ) -> None:
+    ) -> Reservation:
         """
         Delete/cancel a reservation.
         
@@ -311,6 +980,9 @@ class ReservationService:
             user_id: User ID making the request
             is_admin: Whether the user is an admin
             
+        Returns:
+            The cancelled reservation
+            
         Raises:
             HTTPException: If reservation not found or user not authorized
         """
@@ -329,6 +1001,80 @@ class ReservationService:
                 detail="Not authorized to delete this reservation",
             )
         
-        # Mark as cancelled instead of deleting
+        # Mark as cancelled instead of deleting, and free its slots
         reservation.status = ReservationStatus.CANCELLED
+        group_id = reservation.group_id
+        SlotService.release(db, reservation_id)
+        OutboxService.add(db, group_id, "reservation_deleted", {
+            "id": reservation_id,
+            "user_id": reservation.user_id,
+            "start_time": reservation.start_time.isoformat(),
+            "end_time": reservation.end_time.isoformat(),
+        })
         db.commit()
+        reservation_index.discard(group_id, reservation_id)
+        
+        return reservation
+
+
+class AsyncReservationService:
+    """
+    Async entry points for reservation operations.
+    
+    Each method runs the matching ReservationService method on the
+    AsyncSession's underlying Session via run_sync, so every statement goes
+    through the async driver and the event loop is never blocked.
+    """
+    
+    @staticmethod
+    async def create_reservation(
+        db: AsyncSession,
+        user_id: int,
+        group_id: int,
+        reservation_data: ReservationCreate,
+        is_admin: bool = False
+    ) -> Reservation:
+        """Async version of ReservationService.create_reservation."""
+        return await db.run_sync(
+            ReservationService.create_reservation, user_id, group_id, reservation_data, is_admin
+        )
+    
+    @staticmethod
+    async def create_reservation_series(
+        db: AsyncSession,
+        user_id: int,
+        group_id: int,
+        series_data: ReservationSeriesCreate,
+        is_admin: bool = False
+    ) -> Tuple[List[Reservation], List[Tuple[datetime, datetime, str]]]:
+        """Async version of ReservationService.create_reservation_series."""
+        return await db.run_sync(
+            ReservationService.create_reservation_series, user_id, group_id, series_data, is_admin
+        )
+    
+    @staticmethod
+    async def update_reservation(
+        db: AsyncSession,
+        reservation_id: int,
+        user_id: int,
+        group_id: int,
+        update_data: ReservationUpdate,
+        is_admin: bool = False
+    ) -> Reservation:
+        """Async version of ReservationService.update_reservation."""
+        return await db.run_sync(
+            ReservationService.update_reservation, reservation_id, user_id, group_id, update_data, is_admin
+        )
+    
+    @staticmethod
+    async def delete_reservation(
+        db: AsyncSession,
+        reservation_id: int,
+        user_id: int,
+        is_admin: bool = False
+    ) -> Reservation:
+        """Async version of ReservationService.delete_reservation."""
+        return await db.run_sync(
+            ReservationService.delete_reservation, reservation_id, user_id, is_admin
+        )
+
@@ -0,0 +1,129 @@
+"""
+Per-group cache of parsed rule snapshots.
+Keeps the active rules of recently used groups in a bounded LRU so the
+reservation write path does not query and parse them on every request.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..models.models import Rule
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RuleSnapshot:
+    """Typed, pre-parsed view of a group's active rules."""
+    max_reservation_hours: Optional[float] = None
+    advance_booking_days: Optional[int] = None
+    min_fuel_level: Optional[float] = None
+    admin_approval_required: bool = False
+    values: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_rules(cls, rule_dict: Dict[str, str]) -> "RuleSnapshot":
+        """
+        Parse raw rule values into a snapshot.
+
+        Values that cannot be parsed are logged and treated as unset.
+
+        Args:
+            rule_dict: Dictionary mapping rule_type to rule_value
+
+        Returns:
+            Parsed snapshot
+        """
+        def parse(rule_type: str, parser):
+            if rule_type not in rule_dict:
+                return None
+            try:
+                return parser(rule_dict[rule_type])
+            except ValueError:
+                logger.warning(f"Ignoring invalid value for rule {rule_type}: {rule_dict[rule_type]!r}")
+                return None
+
+        return cls(
+            max_reservation_hours=parse('max_reservation_hours', float),
+            advance_booking_days=parse('advance_booking_days', int),
+            min_fuel_level=parse('min_fuel_level', float),
+            admin_approval_required=rule_dict.get('admin_approval_required', '').lower() == 'true',
+            values=dict(rule_dict),
+        )
+
+
+class RuleCache:
+    """
+    Bounded LRU of rule snapshots keyed by group ID.
+
+    The rules API invalidates a group whenever its rules change, and other
+    workers do so when its rules_updated event reaches them. Entries also
+    expire after RULE_CACHE_TTL_SECONDS, which covers changes made outside
+    the API.
+    """
+
+    def __init__(self, max_groups: int, ttl_seconds: int):
+        self.max_groups = max_groups
+        self.ttl_seconds = ttl_seconds
+        self._snapshots: "OrderedDict[int, Tuple[float, RuleSnapshot]]" = OrderedDict()
+        # Bumped by invalidate() so a load racing with it is not stored
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def load(db: Session, group_id: int) -> RuleSnapshot:
+        """Read and parse the active rules of a group from the database."""
+        rules = db.query(Rule).filter(
+            Rule.group_id == group_id,
+            Rule.is_active == True
+        ).all()
+
+        return RuleSnapshot.from_rules({rule.rule_type: rule.rule_value for rule in rules})
+
+    def get(self, db: Session, group_id: int) -> RuleSnapshot:
+        """
+        Get the rule snapshot of a group, loading it on a miss.
+
+        Args:
+            db: Database session used on a cache miss
+            group_id: Group ID
+
+        Returns:
+            The group's rule snapshot
+        """
+        with self._lock:
+            entry = self._snapshots.get(group_id)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl_seconds:
+                self._snapshots.move_to_end(group_id)
+                return entry[1]
+            generation = self._generation
+
+        snapshot = self.load(db, group_id)
+
+        with self._lock:
+            if generation != self._generation:
+                return snapshot
+            self._snapshots[group_id] = (time.monotonic(), snapshot)
+            self._snapshots.move_to_end(group_id)
+            while len(self._snapshots) > self.max_groups:
+                self._snapshots.popitem(last=False)
+
+        return snapshot
+
+    def invalidate(self, group_id: Optional[int] = None) -> None:
+        """Drop the snapshot of one group, or of every group when group_id is None."""
+        with self._lock:
+            self._generation += 1
+            if group_id is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(group_id, None)
+
+
+# Global rule cache instance
+rule_cache = RuleCache(settings.RULE_CACHE_MAX_GROUPS, settings.RULE_CACHE_TTL_SECONDS)
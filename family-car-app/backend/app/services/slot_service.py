@@ -0,0 +1,119 @@
+"""
+Reservation slot service.
+Claims fixed-size time buckets for reservations so that concurrent
+overlapping bookings are rejected by a unique constraint.
+"""
+
+from sqlalchemy.orm import Session
+from sqlalchemy import insert, delete
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timedelta
+from typing import Iterable, List, Tuple
+from ..core.config import settings
+from ..core.timezones import to_utc_naive
+from ..models.models import Reservation, ReservationSlot
+from .interval_index import ACTIVE_STATUSES
+
+# Buckets are aligned to this instant (a Monday at midnight)
+BUCKET_EPOCH = datetime(2000, 1, 3)
+
+
+class SlotService:
+    """Service for reservation slot bucket operations."""
+    
+    @staticmethod
+    def buckets_for(start_time: datetime, end_time: datetime, edges: bool = True) -> List[datetime]:
+        """
+        List the buckets a time range touches.
+        
+        With edges, the start is rounded down and the end up to the bucket
+        size, so any two overlapping reservations share at least one bucket.
+        Without, only the buckets the range covers completely are listed.
+        
+        Args:
+            start_time: Start of the range
+            end_time: End of the range (exclusive)
+            edges: Include the partly covered buckets at either end
+            
+        Returns:
+            Start times of the buckets
+        """
+        size = timedelta(minutes=settings.RESERVATION_SLOT_MINUTES)
+        start_time = to_utc_naive(start_time)
+        end_time = to_utc_naive(end_time)
+        
+        bucket = start_time - (start_time - BUCKET_EPOCH) % size
+        if not edges and bucket < start_time:
+            bucket += size
+        
+        buckets = []
+        while bucket < end_time and (edges or bucket + size <= end_time):
+            buckets.append(bucket)
+            bucket += size
+        return buckets
+    
+    @staticmethod
+    def overlaps_existing(db: Session, reservation_id: int, group_id: int, start_time: datetime, end_time: datetime) -> bool:
+        """
+        Check whether another active reservation overlaps a range.
+        
+        A locking read, so reservations committed since this transaction
+        started are seen; a failed slot insert has waited for them.
+        """
+        return db.query(Reservation.id).filter(
+            Reservation.group_id == group_id,
+            Reservation.id != reservation_id,
+            Reservation.status.in_(ACTIVE_STATUSES),
+            Reservation.start_time < end_time,
+            Reservation.end_time > start_time
+        ).with_for_update(read=True).first() is not None
+    
+    @staticmethod
+    def claim(db: Session, reservations: Iterable[Tuple[int, int, datetime, datetime]]) -> None:
+        """
+        Insert the slot rows of one or more reservations.
+        
+        Must run in the same transaction as the reservation write. Every
+        touched bucket is claimed first. A conflict there may only mean a
+        back-to-back neighbour shares a partly covered bucket, so it is
+        confirmed against the reservations; if none overlaps, only the
+        fully covered buckets are claimed. A real overlap, or a conflict on
+        a fully covered bucket, raises IntegrityError from the UNIQUE key on
+        (group_id, time_bucket).
+        
+        Args:
+            db: Database session
+            reservations: (reservation_id, group_id, start_time, end_time) tuples
+        """
+        reservations = list(reservations)
+        
+        def rows(edges: bool) -> List[dict]:
+            return [
+                {"group_id": group_id, "time_bucket": bucket, "reservation_id": reservation_id}
+                for reservation_id, group_id, start_time, end_time in reservations
+                for bucket in SlotService.buckets_for(start_time, end_time, edges)
+            ]
+        
+        touched = rows(edges=True)
+        if not touched:
+            return
+        try:
+            with db.begin_nested():
+                db.execute(insert(ReservationSlot), touched)
+        except IntegrityError:
+            if any(SlotService.overlaps_existing(db, *reservation) for reservation in reservations):
+                raise
+            covered = rows(edges=False)
+            if covered:
+                db.execute(insert(ReservationSlot), covered)
+    
+    @staticmethod
+    def release(db: Session, reservation_id: int) -> None:
+        """
+        Delete the slot rows held by a reservation.
+        
+        Args:
+            db: Database session
+            reservation_id: Reservation ID
+        """
+        db.execute(delete(ReservationSlot).where(ReservationSlot.reservation_id == reservation_id))
@@ -0,0 +1,251 @@
+"""
+Refresh tokens and access token revocation.
+Access tokens are short-lived JWTs; a client renews them by exchanging its
+refresh token, which is rotated on every use. Revoked access tokens are
+recorded in the revoked_tokens table, which every worker periodically loads
+into its in-memory revocation filter.
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import logging
+import secrets
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from ..core.config import settings
+from ..core.security import Principal, revoked_tokens
+from ..database.connection import AsyncSessionLocal
+from ..models.models import RefreshToken, RevokedToken, User
+
+logger = logging.getLogger(__name__)
+
+
+def _hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _successor(token: str) -> str:
+    """Derive the refresh token that replaces `token`, so it can be handed out again without being stored."""
+    digest = hmac.new(settings.SECRET_KEY.encode(), token.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+class TokenService:
+    """Service for refresh token and revocation operations."""
+
+    @staticmethod
+    def create_refresh_token(db: Session, user_id: int) -> str:
+        """
+        Start a login session.
+
+        Args:
+            db: Database session
+            user_id: User ID
+
+        Returns:
+            Refresh token; only its hash is stored
+        """
+        token = secrets.token_urlsafe(32)
+        db.add(RefreshToken(
+            user_id=user_id,
+            token_hash=_hash_token(token),
+            expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        ))
+        db.commit()
+        return token
+
+    @staticmethod
+    def rotate_refresh_token(db: Session, refresh_token: str) -> Tuple[User, str]:
+        """
+        Exchange a refresh token for a new one.
+
+        Each refresh token can be used once. Presenting one that was already
+        used means it was copied, so every session of its user is revoked.
+        The exception is a token rotated less than REFRESH_REUSE_GRACE_SECONDS
+        ago whose successor is unused: two tabs refreshing at once both get
+        that successor.
+
+        Args:
+            db: Database session
+            refresh_token: Refresh token from login or the previous refresh
+
+        Returns:
+            Tuple of the token's user and the new refresh token
+
+        Raises:
+            HTTPException: If the token is unknown, expired or already used
+        """
+        now = datetime.utcnow()
+        row = db.query(RefreshToken).filter(
+            RefreshToken.token_hash == _hash_token(refresh_token)
+        ).with_for_update().first()
+
+        if row is None or row.expires_at <= now:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid refresh token",
+            )
+
+        if row.revoked_at is not None:
+            if now - row.revoked_at <= timedelta(seconds=settings.REFRESH_REUSE_GRACE_SECONDS):
+                token = _successor(refresh_token)
+                successor = db.query(RefreshToken).filter(
+                    RefreshToken.token_hash == _hash_token(token),
+                    RefreshToken.revoked_at.is_(None)
+                ).first()
+                if successor is not None:
+                    user = db.query(User).filter(User.id == row.user_id).first()
+                    db.commit()
+                    return user, token
+
+            logger.warning(f"Refresh token reused for user {row.user_id}; revoking all sessions")
+            TokenService.revoke_user_sessions(db, row.user_id)
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid refresh token",
+            )
+
+        row.revoked_at = now
+        user = db.query(User).filter(User.id == row.user_id).first()
+        token = _successor(refresh_token)
+        db.add(RefreshToken(
+            user_id=row.user_id,
+            token_hash=_hash_token(token),
+            expires_at=now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        ))
+        db.commit()
+        return user, token
+
+    @staticmethod
+    def revoke_user_sessions(db: Session, user_id: int) -> None:
+        """
+        Revoke every refresh token of a user and commit.
+
+        Access tokens already issued stay valid until they expire, at most
+        ACCESS_TOKEN_EXPIRE_MINUTES.
+
+        Args:
+            db: Database session
+            user_id: User ID
+        """
+        db.query(RefreshToken).filter(
+            RefreshToken.user_id == user_id,
+            RefreshToken.revoked_at.is_(None)
+        ).update({RefreshToken.revoked_at: datetime.utcnow()}, synchronize_session=False)
+        db.commit()
+
+    @staticmethod
+    def logout(db: Session, principal: Principal, refresh_token: Optional[str] = None) -> None:
+        """
+        End a session: delete its refresh token and revoke the current access token.
+
+        Args:
+            db: Database session
+            principal: Principal of the access token used for the request
+            refresh_token: The session's refresh token, if the client has it
+        """
+        if refresh_token:
+            # Deleted rather than marked revoked, so using it later is not taken for reuse
+            db.query(RefreshToken).filter(
+                RefreshToken.token_hash == _hash_token(refresh_token),
+                RefreshToken.user_id == principal.user_id
+            ).delete(synchronize_session=False)
+
+        if principal.jti is not None and db.get(RevokedToken, principal.jti) is None:
+            db.add(RevokedToken(jti=principal.jti, expires_at=datetime.utcfromtimestamp(principal.expires_at)))
+        db.commit()
+
+        if principal.jti is not None:
+            revoked_tokens.add(principal.jti)
+
+    @staticmethod
+    def purge_expired(db: Session) -> None:
+        """
+        Delete expired refresh tokens and revocations of expired access tokens.
+
+        Expired tokens are rejected anyway, so their rows are no longer needed.
+
+        Args:
+            db: Database session
+        """
+        now = datetime.utcnow()
+        db.query(RevokedToken).filter(RevokedToken.expires_at <= now).delete(synchronize_session=False)
+        db.query(RefreshToken).filter(RefreshToken.expires_at <= now).delete(synchronize_session=False)
+        db.commit()
+
+    @staticmethod
+    def revoked_jtis(db: Session) -> List[str]:
+        """
+        Get the IDs of revoked access tokens that have not expired yet.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Token IDs
+        """
+        return [
+            jti for (jti,) in db.query(RevokedToken.jti).filter(RevokedToken.expires_at > datetime.utcnow()).all()
+        ]
+
+
+class RevocationRefresher:
+    """
+    Background task that rebuilds the revocation filter.
+
+    Tokens revoked by this worker are in its filter at once; those revoked
+    by other workers are picked up within REVOCATION_REFRESH_SECONDS.
+    """
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+
+    async def refresh(self) -> int:
+        """
+        Reload the revocation filter from the database.
+
+        Returns:
+            Number of revoked tokens loaded
+        """
+        async with AsyncSessionLocal() as db:
+            await db.run_sync(TokenService.purge_expired)
+            jtis = await db.run_sync(TokenService.revoked_jtis)
+        revoked_tokens.replace(jtis)
+        return len(jtis)
+
+    async def start(self):
+        """Load the filter, then keep it fresh in the background."""
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error(f"Error loading revoked tokens: {e}")
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop refreshing."""
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.REVOCATION_REFRESH_SECONDS)
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error refreshing revoked tokens: {e}")
+
+
+# Global revocation refresher instance
+revocation_refresher = RevocationRefresher()
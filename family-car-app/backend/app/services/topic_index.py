@@ -0,0 +1,311 @@
+"""
+Topic subscriptions for WebSocket connections.
+Indexes a group's connections by the event types, user and time window they
+subscribed to, so the recipients of an event are found without checking
+every socket in the group.
+"""
+
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import count
+from typing import Dict, FrozenSet, Hashable, List, Optional, Set, Tuple
+
+from ..core.timezones import to_utc_naive
+
+
+@dataclass(frozen=True)
+class Subscription:
+    """
+    What a connection wants to receive. None means "no restriction".
+
+    Attributes:
+        events: Event types, e.g. {"reservation_created", "reservation_deleted"}
+        user_id: Only events about this user's reservations and fuel logs
+        window_start: Only reservations overlapping [window_start, window_end)
+        window_end: End of the time window
+    """
+    events: Optional[FrozenSet[str]] = None
+    user_id: Optional[int] = None
+    window_start: Optional[datetime] = None
+    window_end: Optional[datetime] = None
+
+    @property
+    def has_window(self) -> bool:
+        return self.window_start is not None and self.window_end is not None
+
+    def describe(self) -> dict:
+        """JSON-friendly form, echoed back to the client."""
+        return {
+            "events": sorted(self.events) if self.events is not None else None,
+            "user_id": self.user_id,
+            "from": self.window_start.isoformat() if self.window_start else None,
+            "to": self.window_end.isoformat() if self.window_end else None,
+        }
+
+
+# Everything, as connections get before subscribing
+ALL_TOPICS = Subscription()
+
+# Group events a subscription can select
+EVENT_TYPES = frozenset({
+    "reservation_created",
+    "reservation_series_created",
+    "reservation_updated",
+    "reservation_deleted",
+    "fuel_log_created",
+    "rules_updated",
+})
+
+
+@dataclass(frozen=True)
+class EventTopic:
+    """The topics a single event is about."""
+    type: str
+    user_id: Optional[int] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+
+    def matches(self, subscription: Subscription) -> bool:
+        """Check the event against a subscription without using an index."""
+        if subscription.events is not None and self.type not in subscription.events:
+            return False
+        if subscription.user_id is not None and self.user_id is not None and self.user_id != subscription.user_id:
+            return False
+        if subscription.has_window and self.start_time is not None and self.end_time is not None:
+            if not (self.start_time < subscription.window_end and self.end_time > subscription.window_start):
+                return False
+        return True
+
+
+def _parse_time(value) -> Optional[datetime]:
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return to_utc_naive(parsed)
+
+
+def _parse_user(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def event_topics(message: dict) -> List[EventTopic]:
+    """
+    Extract the topics of a message.
+
+    Messages whose data is a list (a reservation series) have one topic per
+    item. A reservation that was moved has a second topic with its previous
+    times, so subscribers to the window it left are told too. Topics an
+    event does not carry (e.g. the time of a fuel log) do not restrict its
+    recipients.
+    """
+    event_type = message.get("type", "")
+    data = message.get("data")
+    items = data if isinstance(data, list) else [data]
+
+    topics = []
+    for item in items:
+        if not isinstance(item, dict):
+            topics.append(EventTopic(event_type))
+            continue
+        user_id = _parse_user(item.get("user_id"))
+        topics.append(EventTopic(
+            event_type,
+            user_id,
+            _parse_time(item.get("start_time")),
+            _parse_time(item.get("end_time")),
+        ))
+        previous_start = _parse_time(item.get("previous_start_time"))
+        previous_end = _parse_time(item.get("previous_end_time"))
+        if previous_start is not None and previous_end is not None:
+            topics.append(EventTopic(event_type, user_id, previous_start, previous_end))
+    return topics or [EventTopic(event_type)]
+
+
+def message_parts(message: dict) -> List[List[EventTopic]]:
+    """
+    Split a message into the parts subscriptions select from.
+
+    The events of a batch and the reservations of a series are selected
+    one by one; any other message is a single part.
+
+    Returns:
+        The topics of each part, in order
+    """
+    data = message.get("data")
+    if message.get("type") == "batch" and isinstance(data, list):
+        return [event_topics(event) for event in data]
+    if isinstance(data, list) and data:
+        return [event_topics({"type": message["type"], "data": item}) for item in data]
+    return [event_topics(message)]
+
+
+def restrict(message: dict, parts: Tuple[int, ...]) -> dict:
+    """Keep only the given parts of a message split by message_parts."""
+    data = message.get("data")
+    if not isinstance(data, list) or len(parts) == len(data):
+        return message
+    return {**message, "data": [data[position] for position in parts]}
+
+
+def select(message: dict, subscription: Subscription) -> Optional[dict]:
+    """
+    Restrict a message to what a subscription wants, without an index.
+
+    Returns:
+        The message or the matching part of it, or None if nothing matches
+    """
+    parts = tuple(
+        position for position, topics in enumerate(message_parts(message))
+        if any(topic.matches(subscription) for topic in topics)
+    )
+    return restrict(message, parts) if parts else None
+
+
+class GroupTopicIndex:
+    """
+    Subscriptions of one group's connections, indexed per dimension.
+
+    Each dimension maps a topic value to the connections interested in it,
+    plus a set of connections with no restriction in that dimension. Time
+    windows are kept sorted by start, like the reservation interval index,
+    so the windows overlapping an event are found with a binary search.
+    """
+
+    def __init__(self):
+        self.subscriptions: Dict[Hashable, Subscription] = {}
+        self.by_event: Dict[str, Set[Hashable]] = {}
+        self.any_event: Set[Hashable] = set()
+        self.by_user: Dict[int, Set[Hashable]] = {}
+        self.any_user: Set[Hashable] = set()
+        self.windows: List[Tuple[datetime, datetime, int]] = []
+        self.window_owner: Dict[int, Hashable] = {}
+        self.window_keys: Dict[Hashable, Tuple[datetime, datetime, int]] = {}
+        self.any_window: Set[Hashable] = set()
+        # Upper bound on the length of any indexed window
+        self.max_window = timedelta(0)
+        self._ids = count()
+
+    def add(self, connection: Hashable, subscription: Subscription) -> None:
+        """Index a connection's subscription, replacing any previous one."""
+        self.remove(connection)
+        self.subscriptions[connection] = subscription
+
+        if subscription.events is None:
+            self.any_event.add(connection)
+        else:
+            for event_type in subscription.events:
+                self.by_event.setdefault(event_type, set()).add(connection)
+
+        if subscription.user_id is None:
+            self.any_user.add(connection)
+        else:
+            self.by_user.setdefault(subscription.user_id, set()).add(connection)
+
+        if not subscription.has_window:
+            self.any_window.add(connection)
+        else:
+            key = (subscription.window_start, subscription.window_end, next(self._ids))
+            insort(self.windows, key)
+            self.window_owner[key[2]] = connection
+            self.window_keys[connection] = key
+            self.max_window = max(self.max_window, subscription.window_end - subscription.window_start)
+
+    def remove(self, connection: Hashable) -> None:
+        """Drop a connection from the index, if present."""
+        subscription = self.subscriptions.pop(connection, None)
+        if subscription is None:
+            return
+
+        self.any_event.discard(connection)
+        for event_type in subscription.events or ():
+            members = self.by_event.get(event_type)
+            if members is not None:
+                members.discard(connection)
+                if not members:
+                    del self.by_event[event_type]
+
+        self.any_user.discard(connection)
+        if subscription.user_id is not None:
+            members = self.by_user.get(subscription.user_id)
+            if members is not None:
+                members.discard(connection)
+                if not members:
+                    del self.by_user[subscription.user_id]
+
+        self.any_window.discard(connection)
+        key = self.window_keys.pop(connection, None)
+        if key is not None:
+            del self.window_owner[key[2]]
+            position = bisect_left(self.windows, key)
+            if position < len(self.windows) and self.windows[position] == key:
+                del self.windows[position]
+
+    def _window_matches(self, start_time: datetime, end_time: datetime) -> Set[Hashable]:
+        low = bisect_left(self.windows, (start_time - self.max_window,))
+        high = bisect_left(self.windows, (end_time,))
+        return {
+            self.window_owner[window_id]
+            for _, window_end, window_id in self.windows[low:high]
+            if window_end > start_time
+        }
+
+    def recipients(self, topic: EventTopic) -> Set[Hashable]:
+        """
+        Find the connections subscribed to an event.
+
+        Returns:
+            Connections whose subscription matches in every dimension
+        """
+        events = self.any_event | self.by_event.get(topic.type, set())
+        if not events:
+            return set()
+
+        if topic.user_id is None:
+            users = None
+        else:
+            users = self.any_user | self.by_user.get(topic.user_id, set())
+
+        if topic.start_time is None or topic.end_time is None or not self.windows:
+            windows = None
+        else:
+            windows = self.any_window | self._window_matches(topic.start_time, topic.end_time)
+
+        result = events
+        for dimension in sorted((d for d in (users, windows) if d is not None), key=len):
+            result = result & dimension
+            if not result:
+                break
+        return result
+
+    def route(self, message: dict) -> Dict[Hashable, Tuple[int, ...]]:
+        """
+        Find the recipients of a message and the parts each one wants.
+
+        Returns:
+            Mapping of connection to the positions of its parts, see message_parts
+        """
+        parts = message_parts(message)
+        if len(parts) == 1:
+            recipients = set()
+            for topic in parts[0]:
+                recipients |= self.recipients(topic)
+            return dict.fromkeys(recipients, (0,))
+
+        wanted: Dict[Hashable, List[int]] = {}
+        for position, topics in enumerate(parts):
+            recipients = set()
+            for topic in topics:
+                recipients |= self.recipients(topic)
+            for connection in recipients:
+                wanted.setdefault(connection, []).append(position)
+        return {connection: tuple(positions) for connection, positions in wanted.items()}
+
+    def __len__(self) -> int:
+        return len(self.subscriptions)
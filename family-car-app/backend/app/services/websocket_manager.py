@@ -1,97 +1,580 @@
 """
 WebSocket connection manager for real-time updates.
 Manages WebSocket connections and broadcasts messages to connected clients.
+
+Every connection has a bounded outbound queue drained by its own writer
+task, so a broadcast only enqueues and a slow client never holds up the
+sender or the rest of its group.
+
+Group events carry a per-group sequence number and are kept in a bounded
+replay buffer, so a reconnecting client can ask for what it missed.
+
+Connections may subscribe to topics (event types, their own user, a time
+window); a per-group topic index finds the recipients of each event.
 """
 
-from typing import Dict, Set
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Hashable, List, Optional, Set, Tuple
 from fastapi import WebSocket, WebSocketDisconnect
-import json
+import asyncio
 import logging
+import secrets
+import time
+from ..core.config import settings
+from .event_bus import EventBus
+from .interval_index import reservation_index
+from .rule_cache import rule_cache
+from .topic_index import ALL_TOPICS, GroupTopicIndex, Subscription, restrict, select
+from .ws_codecs import Frame, JSON, encode
 
 logger = logging.getLogger(__name__)
 
+# What to do when a connection's send queue is full
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_COALESCE = "coalesce"
+OVERFLOW_DISCONNECT = "disconnect"
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_COALESCE, OVERFLOW_DISCONNECT)
+
+# Queue key of the snapshot_required frame sent after dropping events
+RESYNC = "resync"
+
+
+def coalesce_key(message: dict) -> Optional[Hashable]:
+    """
+    Identify the entity a message is about, for the coalesce overflow policy.
+    
+    Two queued messages with the same key describe the same entity, so only
+    the newest one needs to be delivered.
+    """
+    data = message.get("data")
+    if not isinstance(data, dict) or "id" not in data:
+        return None
+    entity = message.get("type", "").rsplit("_", 1)[0]
+    return entity, data["id"]
+
+
+def merge_events(earlier: dict, later: dict) -> dict:
+    """
+    Merge two events about the same entity into one.
+    
+    The later event's data wins. A creation followed by updates stays a
+    creation, so clients that never saw the entity still add it. Merged
+    moves keep the times from before the first one.
+    """
+    if earlier.get("type", "").endswith("_created") and later.get("type", "").endswith("_updated"):
+        data = later.get("data")
+        if isinstance(data, dict):
+            data = {key: value for key, value in data.items() if not key.startswith("previous_")}
+        return {**later, "type": earlier["type"], "data": data}
+    earlier_data, later_data = earlier.get("data"), later.get("data")
+    if isinstance(earlier_data, dict) and isinstance(later_data, dict) and "previous_start_time" in earlier_data:
+        return {**later, "data": {
+            **later_data,
+            "previous_start_time": earlier_data["previous_start_time"],
+            "previous_end_time": earlier_data["previous_end_time"],
+        }}
+    return later
+
+
+class ClientConnection:
+    """A registered WebSocket with its bounded outbound queue."""
+    
+    def __init__(
+        self,
+        websocket: WebSocket,
+        group_id: int,
+        max_queue: int,
+        encoding: str = JSON,
+        subscription: Subscription = ALL_TOPICS
+    ):
+        self.websocket = websocket
+        self.group_id = group_id
+        self.max_queue = max_queue
+        self.encoding = encoding
+        self.subscription = subscription
+        self.queue: Deque[Tuple[Optional[Hashable], Frame]] = deque()
+        self.ready = asyncio.Event()
+        self.writer: Optional[asyncio.Task] = None
+        # Monotonic time of the last message received from the client
+        self.last_seen = time.monotonic()
+        self.dropped = 0
+        self.coalesced = 0
+        # Set when an event was dropped and the client has not been told yet
+        self.stale = False
+    
+    def enqueue(self, frame: Frame, key: Optional[Hashable], policy: str) -> bool:
+        """
+        Queue a frame for sending, applying the overflow policy if full.
+        
+        Args:
+            frame: Encoded message
+            key: Coalesce key of the message, or None
+            policy: Overflow policy
+            
+        Returns:
+            False if the connection must be disconnected instead
+        """
+        if len(self.queue) >= self.max_queue:
+            if policy == OVERFLOW_DISCONNECT:
+                return False
+            if policy == OVERFLOW_COALESCE and key is not None:
+                for position, (queued_key, _) in enumerate(self.queue):
+                    if queued_key == key:
+                        del self.queue[position]
+                        self.coalesced += 1
+                        break
+            if len(self.queue) >= self.max_queue:
+                self.queue.popleft()
+                self.dropped += 1
+                self.stale = True
+        
+        self.queue.append((key, frame))
+        self.ready.set()
+        return True
+
 
 class ConnectionManager:
     """Manages WebSocket connections grouped by group_id."""
     
-    def __init__(self):
+    def __init__(
+        self,
+        max_queue: Optional[int] = None,
+        overflow_policy: Optional[str] = None,
+        send_timeout: Optional[float] = None,
+        coalesce_window_ms: Optional[int] = None
+    ):
         # Dictionary mapping group_id to set of WebSocket connections
         self.active_connections: Dict[int, Set[WebSocket]] = {}
+        self.clients: Dict[WebSocket, ClientConnection] = {}
+        # Subscriptions of each group's connections, indexed by topic
+        self.topics: Dict[int, GroupTopicIndex] = {}
+        # Deliveries saved by subscriptions, exposed through get_metrics()
+        self.deliveries_filtered = 0
+        self.max_queue = max_queue or settings.WS_SEND_QUEUE_SIZE
+        self.overflow_policy = overflow_policy or settings.WS_OVERFLOW_POLICY
+        self.send_timeout = send_timeout or settings.WS_SEND_TIMEOUT_SECONDS
+        if self.overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown WebSocket overflow policy: {self.overflow_policy}")
+        # Eviction counters, exposed through get_metrics()
+        self.evicted_overflow = 0
+        self.evicted_timeout = 0
+        self.evicted_idle = 0
+        self._heartbeat: Optional[asyncio.Task] = None
+        # Keeps close tasks referenced until they finish
+        self._closing: Set[asyncio.Task] = set()
+        # Per-group coalescing of bursty events; disabled when the window is 0
+        if coalesce_window_ms is None:
+            coalesce_window_ms = settings.WS_COALESCE_WINDOW_MS
+        self.coalesce_window = coalesce_window_ms / 1000
+        self._pending: Dict[int, "OrderedDict[Hashable, dict]"] = {}
+        self.window_merged = 0
+        # Cross-worker backplane; broadcasts stay local until start() is called
+        self.bus: Optional[EventBus] = None
+        # Identifies this process's sequence numbering; a client resuming
+        # against a different epoch (another worker, or a restart) needs a snapshot
+        self.epoch = secrets.token_hex(4)
+        # Last sequence number per group. Never evicted, so numbers are not reused.
+        self.sequences: Dict[int, int] = {}
+        # Recent (seq, message) pairs per group, least recently used group first
+        self.replay: "OrderedDict[int, Deque[Tuple[int, dict]]]" = OrderedDict()
+    
+    async def start(self, bus: EventBus):
+        """
+        Route broadcasts through an event bus, so every worker delivers them.
         
-    async def connect(self, websocket: WebSocket, group_id: int):
+        Args:
+            bus: Event bus to publish to and receive from
+        """
+        await bus.start(self.receive)
+        self.bus = bus
+        if settings.WS_HEARTBEAT_INTERVAL_SECONDS > 0:
+            self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+    
+    async def stop(self):
+        """Stop the heartbeat, flush held-back events and stop the event bus, if any."""
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        for group_id in list(self._pending):
+            self._flush(group_id)
+        if self.bus is not None:
+            await self.bus.stop()
+            self.bus = None
+        
+    async def connect(
+        self,
+        websocket: WebSocket,
+        group_id: int,
+        greeting: Optional[dict] = None,
+        resume_from: Optional[int] = None,
+        epoch: Optional[str] = None,
+        encoding: str = JSON,
+        subprotocol: Optional[str] = None,
+        subscription: Subscription = ALL_TOPICS
+    ):
         """
         Accept and register a new WebSocket connection.
         
+        Registration, the greeting and any replay are queued without
+        yielding to the event loop, so no group event can be lost or
+        duplicated between the replay and live delivery.
+        
         Args:
             websocket: WebSocket connection
             group_id: Group ID the connection belongs to
+            greeting: Optional first message; the current epoch and sequence
+                number are added to its data
+            resume_from: Last sequence number the client has seen, to replay the gap
+            epoch: Epoch the client's sequence number belongs to
+            encoding: Wire encoding negotiated for this connection
+            subprotocol: Subprotocol to accept, if the client negotiated one
+            subscription: Topics the connection receives; replayed events are filtered too
         """
-        await websocket.accept()
+        await websocket.accept(subprotocol=subprotocol)
         
         if group_id not in self.active_connections:
             self.active_connections[group_id] = set()
+            self.topics[group_id] = GroupTopicIndex()
         
+        client = ClientConnection(websocket, group_id, self.max_queue, encoding, subscription)
+        client.writer = asyncio.create_task(self._writer(client))
+        self.clients[websocket] = client
         self.active_connections[group_id].add(websocket)
+        self.topics[group_id].add(websocket, subscription)
+        
+        last_seq = self.sequences.get(group_id, 0)
+        if greeting is not None:
+            greeting = {**greeting, "data": {
+                **greeting.get("data", {}), "epoch": self.epoch, "seq": last_seq, "encoding": encoding
+            }}
+            self._enqueue(client, encode(greeting, encoding), None)
+        
+        if resume_from is not None:
+            missed = None
+            if epoch is None or epoch == self.epoch:
+                missed = self._replay(group_id, resume_from)
+            if missed is None:
+                self._enqueue(client, encode({
+                    "type": "snapshot_required",
+                    "data": {"epoch": self.epoch, "seq": last_seq}
+                }, encoding), None)
+            else:
+                for message in missed:
+                    message = select(message, subscription)
+                    if message is not None:
+                        self._enqueue(client, encode(message, encoding), None)
+        
         logger.info(f"WebSocket connected for group {group_id}. Total connections: {len(self.active_connections[group_id])}")
     
     def disconnect(self, websocket: WebSocket, group_id: int):
         """
-        Remove a WebSocket connection.
+        Remove a WebSocket connection and stop its writer task.
         
         Args:
             websocket: WebSocket connection
             group_id: Group ID the connection belongs to
         """
+        client = self.clients.pop(websocket, None)
+        if client is not None and client.writer is not None and client.writer is not asyncio.current_task():
+            client.writer.cancel()
+        
         if group_id in self.active_connections:
             self.active_connections[group_id].discard(websocket)
+            self.topics[group_id].remove(websocket)
             
             # Clean up empty group
             if len(self.active_connections[group_id]) == 0:
                 del self.active_connections[group_id]
+                del self.topics[group_id]
             
             logger.info(f"WebSocket disconnected for group {group_id}")
     
+    def subscribe(self, websocket: WebSocket, subscription: Subscription) -> bool:
+        """
+        Replace the topics a connection receives.
+        
+        Args:
+            websocket: WebSocket connection
+            subscription: New subscription; ALL_TOPICS receives every group event
+            
+        Returns:
+            False if the connection is not registered
+        """
+        client = self.clients.get(websocket)
+        if client is None:
+            return False
+        client.subscription = subscription
+        self.topics[client.group_id].add(websocket, subscription)
+        return True
+    
+    def touch(self, websocket: WebSocket):
+        """Record that a message was received from a connection."""
+        client = self.clients.get(websocket)
+        if client is not None:
+            client.last_seen = time.monotonic()
+    
+    def reap_idle(self) -> int:
+        """
+        Evict connections that have sent nothing within WS_IDLE_TIMEOUT_SECONDS.
+        
+        Returns:
+            Number of connections evicted
+        """
+        deadline = time.monotonic() - settings.WS_IDLE_TIMEOUT_SECONDS
+        idle = [client for client in self.clients.values() if client.last_seen < deadline]
+        for client in idle:
+            logger.info(f"Evicting idle WebSocket in group {client.group_id}")
+            self.evicted_idle += 1
+            self._evict(client, 1001, "Idle timeout")
+        return len(idle)
+    
+    async def _heartbeat_loop(self):
+        """Ping every connection periodically and reap the ones that stopped answering."""
+        while True:
+            await asyncio.sleep(settings.WS_HEARTBEAT_INTERVAL_SECONDS)
+            try:
+                self.reap_idle()
+                ping = {"type": "ping", "data": {"ts": time.time()}}
+                frames: Dict[str, Frame] = {}
+                for client in list(self.clients.values()):
+                    if client.encoding not in frames:
+                        frames[client.encoding] = encode(ping, client.encoding)
+                    self._enqueue(client, frames[client.encoding], None)
+            except Exception as e:
+                logger.error(f"Error in WebSocket heartbeat: {e}")
+    
+    def _evict(self, client: ClientConnection, code: int, reason: str):
+        """Disconnect a client and close its socket in the background."""
+        self.disconnect(client.websocket, client.group_id)
+        
+        async def close():
+            try:
+                await asyncio.wait_for(client.websocket.close(code=code, reason=reason), timeout=self.send_timeout)
+            except Exception:
+                pass
+        
+        task = asyncio.create_task(close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+    
+    async def _writer(self, client: ClientConnection):
+        """Send queued frames to one connection until it fails or is removed."""
+        websocket = client.websocket
+        try:
+            while True:
+                await client.ready.wait()
+                while client.queue:
+                    _, frame = client.queue.popleft()
+                    if isinstance(frame, str):
+                        send = websocket.send_text(frame)
+                    else:
+                        send = websocket.send_bytes(frame)
+                    await asyncio.wait_for(send, timeout=self.send_timeout)
+                client.ready.clear()
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            logger.warning(f"Evicting WebSocket in group {client.group_id}: send timed out")
+            self.evicted_timeout += 1
+            self._evict(client, settings.WS_SLOW_CONSUMER_CLOSE_CODE, "Too slow")
+        except WebSocketDisconnect:
+            self.disconnect(websocket, client.group_id)
+        except Exception as e:
+            logger.error(f"Error sending to WebSocket connection: {e}")
+            self.disconnect(websocket, client.group_id)
+    
+    def _record(self, message: dict, group_id: int) -> dict:
+        """
+        Stamp a group event with the next sequence number and buffer it.
+        
+        Returns:
+            The stamped message
+        """
+        seq = self.sequences.get(group_id, 0) + 1
+        self.sequences[group_id] = seq
+        message = {**message, "seq": seq}
+        
+        buffer = self.replay.get(group_id)
+        if buffer is None:
+            buffer = self.replay[group_id] = deque(maxlen=settings.WS_REPLAY_BUFFER_SIZE)
+            while len(self.replay) > settings.WS_REPLAY_MAX_GROUPS:
+                self.replay.popitem(last=False)
+        else:
+            self.replay.move_to_end(group_id)
+        buffer.append((seq, message))
+        
+        return message
+    
+    def _replay(self, group_id: int, resume_from: int) -> Optional[List[dict]]:
+        """
+        Get the buffered messages after a sequence number.
+        
+        Returns:
+            Messages to resend, or None if the gap is no longer buffered
+        """
+        last_seq = self.sequences.get(group_id, 0)
+        if resume_from > last_seq:
+            return None
+        if resume_from == last_seq:
+            return []
+        
+        buffer = self.replay.get(group_id)
+        if not buffer or buffer[0][0] > resume_from + 1:
+            return None
+        return [message for seq, message in buffer if seq > resume_from]
+    
+    def _enqueue(self, client: ClientConnection, frame: Frame, key: Optional[Hashable]):
+        if not client.enqueue(frame, key, self.overflow_policy):
+            logger.warning(f"Evicting WebSocket in group {client.group_id}: send queue full")
+            self.evicted_overflow += 1
+            self._evict(client, settings.WS_SLOW_CONSUMER_CLOSE_CODE, "Too slow")
+            return
+        
+        if client.stale:
+            # Events were lost: tell the client to catch up, as after a failed
+            # resume. Appended past the limit so it is not dropped at once; an
+            # earlier one still queued is superseded.
+            client.stale = False
+            for position, (queued_key, _) in enumerate(client.queue):
+                if queued_key == RESYNC:
+                    del client.queue[position]
+                    break
+            client.queue.append((RESYNC, encode({
+                "type": "snapshot_required",
+                "data": {"epoch": self.epoch, "seq": self.sequences.get(client.group_id, 0)}
+            }, client.encoding)))
+    
     async def send_personal_message(self, message: dict, websocket: WebSocket):
         """
         Send a message to a specific WebSocket connection.
         
+        Registered connections get the message through their queue, after
+        anything already queued for them.
+        
         Args:
             message: Message dictionary to send
             websocket: WebSocket connection
         """
+        client = self.clients.get(websocket)
+        if client is not None:
+            self._enqueue(client, encode(message, client.encoding), None)
+            return
+        
         try:
-            await websocket.send_text(json.dumps(message))
+            await websocket.send_text(encode(message, JSON))
         except Exception as e:
             logger.error(f"Error sending personal message: {e}")
     
     async def broadcast_to_group(self, message: dict, group_id: int):
         """
-        Broadcast a message to all connections in a group.
+        Broadcast a message to all connections in a group, on every worker.
         
         Args:
             message: Message dictionary to broadcast
             group_id: Group ID to broadcast to
         """
+        if self.bus is not None:
+            await self.bus.publish(message, group_id)
+        else:
+            await self.deliver_to_group(message, group_id)
+    
+    async def receive(self, message: dict, group_id: int):
+        """
+        Handle an event from the bus: update local caches, then deliver it.
+        
+        Every worker gets every event, so one received here may describe
+        a change made by another worker, which this worker's interval
+        index and rule cache have not seen. Reservation events are applied
+        to the index; changes this worker made itself are already there.
+        
+        Args:
+            message: Message dictionary from the bus
+            group_id: Group ID the event belongs to
+        """
+        event_type = message.get("type", "")
+        if event_type.startswith("reservation_") and settings.WS_EVENT_BUS != "memory":
+            # With the in-process bus, every write was made by this worker
+            try:
+                reservation_index.apply_event(group_id, event_type, message.get("data"))
+            except (KeyError, TypeError, ValueError) as e:
+                logger.error(f"Could not apply {event_type} to the interval index, reloading group {group_id}: {e}")
+                reservation_index.invalidate(group_id)
+        elif event_type == "rules_updated":
+            rule_cache.invalidate(group_id)
+        await self.deliver_to_group(message, group_id)
+    
+    async def deliver_to_group(self, message: dict, group_id: int):
+        """
+        Send a message to the group's connections held by this worker.
+        
+        With a coalescing window configured, events arriving within the
+        window are held back, repeated events about the same entity are
+        merged, and the result is sent as one "batch" message.
+        
+        Args:
+            message: Message dictionary to deliver
+            group_id: Group ID to deliver to
+        """
+        if self.coalesce_window <= 0:
+            self._fan_out(message, group_id)
+            return
+        
+        pending = self._pending.get(group_id)
+        if pending is None:
+            pending = self._pending[group_id] = OrderedDict()
+            asyncio.get_running_loop().call_later(self.coalesce_window, self._flush, group_id)
+        
+        # Events that are not about a single entity are never merged
+        key = coalesce_key(message) or object()
+        earlier = pending.get(key)
+        if earlier is not None:
+            message = merge_events(earlier, message)
+            self.window_merged += 1
+        pending[key] = message
+        
+        if len(pending) >= settings.WS_COALESCE_MAX_EVENTS:
+            self._flush(group_id)
+    
+    def _flush(self, group_id: int):
+        """Send the events held back for a group, as one message."""
+        pending = self._pending.pop(group_id, None)
+        if not pending:
+            return
+        
+        messages = list(pending.values())
+        if len(messages) == 1:
+            self._fan_out(messages[0], group_id)
+        else:
+            self._fan_out({"type": "batch", "data": messages}, group_id)
+    
+    def _fan_out(self, message: dict, group_id: int):
+        """
+        Stamp, encode and queue a message on the subscribed local connections of a group.
+        
+        The message is stamped with the group's next sequence number. The
+        topic index finds the connections subscribed to it and, for batches
+        and series, the part each one wants; every distinct part is encoded
+        once per encoding in use. The per-connection writer tasks do the sending.
+        """
+        # Buffered even with nobody connected, for clients that resume later
+        message = self._record(message, group_id)
+        
         if group_id not in self.active_connections:
             logger.debug(f"No active connections for group {group_id}")
             return
         
-        # Create a copy to avoid modification during iteration
-        connections = self.active_connections[group_id].copy()
-        
-        disconnected = []
-        for connection in connections:
-            try:
-                await connection.send_text(json.dumps(message))
-            except WebSocketDisconnect:
-                disconnected.append(connection)
-            except Exception as e:
-                logger.error(f"Error broadcasting to connection: {e}")
-                disconnected.append(connection)
+        recipients = self.topics[group_id].route(message)
+        self.deliveries_filtered += len(self.active_connections[group_id]) - len(recipients)
+        key = coalesce_key(message)
+        frames: Dict[Tuple[Tuple[int, ...], str], Frame] = {}
         
-        # Remove disconnected connections
-        for connection in disconnected:
-            self.disconnect(connection, group_id)
+        for websocket, parts in recipients.items():
+            client = self.clients.get(websocket)
+            if client is None:
+                continue
+            if (parts, client.encoding) not in frames:
+                frames[parts, client.encoding] = encode(restrict(message, parts), client.encoding)
+            self._enqueue(client, frames[parts, client.encoding], key)
     
     async def broadcast_reservation_created(self, reservation_data: dict, group_id: int):
         """
@@ -107,6 +590,20 @@ class ConnectionManager:
         }
         await self.broadcast_to_group(message, group_id)
     
+    async def broadcast_reservation_series_created(self, reservations_data: list, group_id: int):
+        """
+        Broadcast a reservation_series_created event.
+        
+        Args:
+            reservations_data: List of reservation data dictionaries
+            group_id: Group ID
+        """
+        message = {
+            "type": "reservation_series_created",
+            "data": reservations_data
+        }
+        await self.broadcast_to_group(message, group_id)
+    
     async def broadcast_reservation_updated(self, reservation_data: dict, group_id: int):
         """
         Broadcast a reservation_updated event.
@@ -121,17 +618,33 @@ class ConnectionManager:
         }
         await self.broadcast_to_group(message, group_id)
     
-    async def broadcast_reservation_deleted(self, reservation_id: int, group_id: int):
+    async def broadcast_reservation_deleted(
+        self,
+        reservation_id: int,
+        group_id: int,
+        user_id: Optional[int] = None,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None
+    ):
         """
         Broadcast a reservation_deleted event.
         
         Args:
             reservation_id: Reservation ID
             group_id: Group ID
+            user_id: Owner of the reservation, for subscriptions to own events
+            start_time: Start of the reservation (ISO 8601), for time-window subscriptions
+            end_time: End of the reservation (ISO 8601)
         """
+        data = {"id": reservation_id}
+        if user_id is not None:
+            data["user_id"] = user_id
+        if start_time is not None and end_time is not None:
+            data["start_time"] = start_time
+            data["end_time"] = end_time
         message = {
             "type": "reservation_deleted",
-            "data": {"id": reservation_id}
+            "data": data
         }
         await self.broadcast_to_group(message, group_id)
     
@@ -162,6 +675,48 @@ class ConnectionManager:
         if group_id not in self.active_connections:
             return 0
         return len(self.active_connections[group_id])
+    
+    def get_metrics(self, group_id: Optional[int] = None) -> dict:
+        """
+        Get queue and eviction metrics.
+        
+        Args:
+            group_id: Optional group ID to restrict connection and queue figures to
+            
+        Returns:
+            Dictionary of metrics
+        """
+        if group_id is None:
+            clients = list(self.clients.values())
+        else:
+            clients = [
+                self.clients[websocket]
+                for websocket in self.active_connections.get(group_id, ())
+                if websocket in self.clients
+            ]
+        depths = [len(client.queue) for client in clients]
+        encodings: Dict[str, int] = {}
+        for client in clients:
+            encodings[client.encoding] = encodings.get(client.encoding, 0) + 1
+        subscribed = sum(1 for client in clients if client.subscription != ALL_TOPICS)
+        
+        return {
+            "connections": len(clients),
+            "groups": len(self.active_connections) if group_id is None else int(bool(clients)),
+            "encodings": encodings,
+            "subscribed_connections": subscribed,
+            "queue_capacity": self.max_queue,
+            "overflow_policy": self.overflow_policy,
+            "queue_depth_total": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            "messages_dropped": sum(client.dropped for client in clients),
+            "messages_coalesced": sum(client.coalesced for client in clients),
+            "evictions_overflow": self.evicted_overflow,
+            "evictions_timeout": self.evicted_timeout,
+            "evictions_idle": self.evicted_idle,
+            "events_merged_in_window": self.window_merged,
+            "deliveries_filtered": self.deliveries_filtered,
+        }
 
 
 # Global connection manager instance
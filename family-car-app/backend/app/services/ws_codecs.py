@@ -0,0 +1,103 @@
+"""
+Wire encodings for WebSocket messages.
+JSON text frames are the default; clients may negotiate MessagePack or CBOR
+binary frames when the matching library is installed.
+"""
+
+import json
+from typing import List, Optional, Tuple, Union
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # optional dependency
+    cbor2 = None
+
+JSON = "json"
+MSGPACK = "msgpack"
+CBOR = "cbor"
+
+# Subprotocol names clients can offer in Sec-WebSocket-Protocol
+SUBPROTOCOL_PREFIX = "familycar."
+
+Frame = Union[str, bytes]
+
+
+def available_encodings() -> List[str]:
+    """List the encodings this process can produce, preferred first."""
+    encodings = []
+    if msgpack is not None:
+        encodings.append(MSGPACK)
+    if cbor2 is not None:
+        encodings.append(CBOR)
+    encodings.append(JSON)
+    return encodings
+
+
+def encode(message: dict, encoding: str) -> Frame:
+    """
+    Encode a message for the wire.
+
+    Returns:
+        A str for JSON (sent as a text frame), bytes otherwise (binary frame)
+    """
+    if encoding == MSGPACK:
+        return msgpack.packb(message, use_bin_type=True)
+    if encoding == CBOR:
+        return cbor2.dumps(message)
+    return json.dumps(message)
+
+
+def decode(data: Frame, encoding: str) -> object:
+    """
+    Decode a frame received from a client.
+
+    Text frames are always JSON; binary frames use the connection's encoding.
+
+    Raises:
+        ValueError: If the frame cannot be decoded
+    """
+    if isinstance(data, str):
+        return json.loads(data)
+    try:
+        if encoding == MSGPACK:
+            return msgpack.unpackb(data, raw=False)
+        if encoding == CBOR:
+            return cbor2.loads(data)
+        return json.loads(data)
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Undecodable {encoding} frame: {e}")
+
+
+def negotiate(requested: Optional[str], offered_subprotocols: List[str]) -> Tuple[str, Optional[str]]:
+    """
+    Pick the encoding for a new connection.
+
+    A supported subprotocol offered by the client ("familycar.msgpack",
+    "familycar.cbor", "familycar.json") wins over the ?encoding= query
+    parameter. Anything unsupported falls back to JSON.
+
+    Args:
+        requested: Value of the encoding query parameter, if any
+        offered_subprotocols: Subprotocols offered by the client, in its order of preference
+
+    Returns:
+        Tuple of (encoding, subprotocol to accept or None)
+    """
+    available = available_encodings()
+
+    for subprotocol in offered_subprotocols:
+        if subprotocol.startswith(SUBPROTOCOL_PREFIX):
+            encoding = subprotocol[len(SUBPROTOCOL_PREFIX):]
+            if encoding in available:
+                return encoding, subprotocol
+
+    if requested in available:
+        return requested, None
+    return JSON, None
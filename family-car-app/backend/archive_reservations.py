@@ -0,0 +1,45 @@
+"""
+Script to archive old reservations.
+Moves completed and cancelled reservations that ended more than
+ARCHIVE_AFTER_DAYS ago into reservations_history. Safe to run from cron;
+each batch is a short transaction of its own.
+"""
+
+import argparse
+import logging
+from app.core.config import settings
+from app.database.connection import SessionLocal
+from app.services.archive_service import ArchiveService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive completed and cancelled reservations")
+    parser.add_argument("--days", type=int, default=settings.ARCHIVE_AFTER_DAYS,
+                        help="Archive reservations that ended more than this many days ago")
+    parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE,
+                        help="Reservations moved per transaction")
+    parser.add_argument("--pause", type=float, default=settings.ARCHIVE_BATCH_PAUSE_SECONDS,
+                        help="Seconds to sleep between batches")
+    parser.add_argument("--max-batches", type=int, default=None,
+                        help="Stop after this many batches")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    db = SessionLocal()
+    try:
+        moved = ArchiveService.archive(
+            db,
+            cutoff=ArchiveService.archive_cutoff(args.days),
+            batch_size=args.batch_size,
+            pause_seconds=args.pause,
+            max_batches=args.max_batches,
+        )
+    finally:
+        db.close()
+
+    print(f"Archived {moved} reservations")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Benchmark for WebSocket group fan-out.
+Measures ConnectionManager.broadcast_to_group for groups of different sizes
+against the previous encode-per-socket, one-at-a-time loop: how long the
+caller is held up, and how long until every fast socket has the frame.
+
+Sockets are simulated in-process, so the numbers isolate the manager's own
+cost plus the configured per-send latency.
+
+Usage:
+    python benchmarks/websocket_fanout.py
+    python benchmarks/websocket_fanout.py --sizes 10 1000 10000 --latency-ms 1 --slow 1
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.websocket_manager import ConnectionManager  # noqa: E402
+
+GROUP_ID = 1
+
+# Roughly the size of a serialized ReservationResponse with its user
+SAMPLE_EVENT = {
+    "type": "reservation_updated",
+    "data": {
+        "id": 12345,
+        "user_id": 7,
+        "group_id": GROUP_ID,
+        "start_time": "2026-10-16T08:00:00",
+        "end_time": "2026-10-16T12:00:00",
+        "status": "approved",
+        "notes": "Drop the kids at school, then groceries",
+        "created_at": "2026-10-01T19:22:03",
+        "updated_at": "2026-10-15T07:45:10",
+        "user": {
+            "id": 7,
+            "username": "john",
+            "full_name": "John Smith",
+            "is_admin": False,
+            "group_id": GROUP_ID,
+            "fuel_balance": 12.5,
+            "created_at": "2026-01-02T10:00:00",
+        },
+    },
+}
+
+
+class FakeWebSocket:
+    """Stands in for a WebSocket; each send takes a fixed amount of time."""
+
+    def __init__(self, latency: float, tracker: "DeliveryTracker" = None):
+        self.latency = latency
+        self.tracker = tracker
+
+    async def accept(self, subprotocol: str = None):
+        pass
+
+    async def send_text(self, data: str):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        else:
+            await asyncio.sleep(0)
+        if self.tracker is not None:
+            self.tracker.delivered()
+
+    async def close(self, code: int = 1000, reason: str = None):
+        pass
+
+
+class DeliveryTracker:
+    """Signals once a given number of sockets have received a frame."""
+
+    def __init__(self):
+        self.remaining = 0
+        self.done = asyncio.Event()
+
+    def expect(self, count: int):
+        self.remaining = count
+        self.done.clear()
+
+    def delivered(self):
+        self.remaining -= 1
+        if self.remaining == 0:
+            self.done.set()
+
+
+async def sequential_broadcast(manager: ConnectionManager, message: dict, group_id: int):
+    """The previous implementation: encode per socket and await each send in turn."""
+    for connection in manager.active_connections[group_id].copy():
+        await connection.send_text(json.dumps(message))
+
+
+async def measure(broadcast, manager: ConnectionManager, tracker: DeliveryTracker, fast: int, runs: int):
+    """
+    Returns:
+        Tuple of (times the caller waited, times until every fast socket had the frame), in ms
+    """
+    returned, delivered = [], []
+    for _ in range(runs):
+        tracker.expect(fast)
+        started = time.perf_counter()
+        await broadcast(manager, SAMPLE_EVENT, GROUP_ID)
+        returned.append((time.perf_counter() - started) * 1000)
+        await tracker.done.wait()
+        delivered.append((time.perf_counter() - started) * 1000)
+        # Let slow sockets drain before the next run
+        await asyncio.sleep(0.25)
+    return returned, delivered
+
+
+async def run(sizes, latency_ms: float, slow: int, slow_ms: float, runs: int):
+    print(f"per-send latency {latency_ms} ms, {slow} slow socket(s) at {slow_ms} ms, {runs} runs, medians\n")
+    print(f"{'sockets':>8} | {'sequential':>12} | {'queued: caller':>15} | {'queued: delivered':>18}")
+    print("-" * 64)
+
+    async def queued_broadcast(manager, message, group_id):
+        await manager.broadcast_to_group(message, group_id)
+
+    for size in sizes:
+        slow_count = min(slow, size)
+        fast = size - slow_count
+
+        tracker = DeliveryTracker()
+        manager = ConnectionManager(max_queue=runs + 1, send_timeout=60)
+        sockets = [FakeWebSocket(slow_ms / 1000) for _ in range(slow_count)]
+        sockets += [FakeWebSocket(latency_ms / 1000, tracker) for _ in range(fast)]
+        for websocket in sockets:
+            await manager.connect(websocket, GROUP_ID)
+
+        # The sequential loop grows linearly with latency; skip it when it would take minutes
+        if size * latency_ms / 1000 * runs < 60:
+            _, sequential = await measure(sequential_broadcast, manager, tracker, fast, runs)
+            sequential_text = f"{statistics.median(sequential):9.1f} ms"
+        else:
+            sequential_text = f"{'(skipped)':>12}"
+
+        returned, delivered = await measure(queued_broadcast, manager, tracker, fast, runs)
+        print(
+            f"{size:>8} | {sequential_text} | {statistics.median(returned):12.2f} ms"
+            f" | {statistics.median(delivered):15.1f} ms"
+        )
+
+        for websocket in sockets:
+            manager.disconnect(websocket, GROUP_ID)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark WebSocket group fan-out")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000],
+                        help="Group sizes to measure")
+    parser.add_argument("--latency-ms", type=float, default=1.0,
+                        help="Simulated time for one send")
+    parser.add_argument("--slow", type=int, default=1,
+                        help="Number of slow sockets per group")
+    parser.add_argument("--slow-ms", type=float, default=200.0,
+                        help="Simulated time for one send to a slow socket")
+    parser.add_argument("--runs", type=int, default=5,
+                        help="Broadcasts per group size")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.sizes, args.latency_ms, args.slow, args.slow_ms, args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,434 @@
+"""
+Load test for the WebSocket layer of a running server.
+Opens N authenticated /ws connections spread over M groups, creates
+reservations over HTTP at a fixed rate, and reports:
+
+- delivery latency percentiles, from the POST being sent to each client
+  receiving the reservation_created event
+- server memory per connection (RSS growth while connecting / N)
+- server CPU time per event and per delivery
+
+The tool seeds its own groups ("loadtest-<i>") and users in the database
+the server uses, and mints tokens with the server's SECRET_KEY, so run it
+from backend/ with the same .env as the server. Memory and CPU are read
+from /proc for the processes given with --server-pid (Linux only).
+
+Usage:
+    # Server on a throwaway SQLite database
+    export DATABASE_URL=sqlite:///./load.db ASYNC_DATABASE_URL=sqlite+aiosqlite:///./load.db
+    python benchmarks/websocket_load.py --create-tables --setup-only
+    python run.py &
+
+    python benchmarks/websocket_load.py --connections 2000 --groups 20 --events 200 --rate 20 \\
+        --server-pid $(pgrep -f "python run.py") --json results/2000x20.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+import websockets  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.security import create_access_token, get_password_hash  # noqa: E402
+from app.database.connection import SessionLocal, init_db  # noqa: E402
+from app.models.models import Group, User  # noqa: E402
+from app.services.ws_codecs import JSON, decode  # noqa: E402
+
+GROUP_PREFIX = "loadtest-"
+USERS_PER_GROUP = 5
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def seed(groups: int) -> List[List[dict]]:
+    """
+    Create the load test groups and users if they do not exist.
+
+    The first user of each group is its admin and creates the reservations;
+    admins may overlap, so repeated runs never conflict.
+
+    Returns:
+        Per group, the token claims of its users
+    """
+    db = SessionLocal()
+    try:
+        password_hash = None
+        claims = []
+        for index in range(groups):
+            name = f"{GROUP_PREFIX}{index}"
+            group = db.query(Group).filter(Group.name == name).first()
+            if group is None:
+                group = Group(name=name, car_model="load test")
+                db.add(group)
+                db.flush()
+
+            users = db.query(User).filter(User.group_id == group.id).order_by(User.id).all()
+            for position in range(len(users), USERS_PER_GROUP):
+                if password_hash is None:
+                    password_hash = get_password_hash("loadtest")
+                user = User(
+                    group_id=group.id,
+                    username=f"{name}-{position}",
+                    password_hash=password_hash,
+                    full_name=f"Load Test {index}/{position}",
+                    is_admin=position == 0,
+                )
+                db.add(user)
+                users.append(user)
+            db.flush()
+
+            claims.append([
+                {"sub": user.id, "username": user.username, "group_id": group.id, "is_admin": user.is_admin}
+                for user in users[:USERS_PER_GROUP]
+            ])
+        db.commit()
+        return claims
+    finally:
+        db.close()
+
+
+def read_proc(pids: List[int]) -> Optional[dict]:
+    """
+    Read resident memory and CPU time of the server processes.
+
+    Returns:
+        {"rss_bytes", "cpu_seconds"} summed over the processes, or None without pids
+    """
+    if not pids:
+        return None
+    rss = 0
+    cpu_ticks = 0
+    for pid in pids:
+        with open(f"/proc/{pid}/status") as status_file:
+            for line in status_file:
+                if line.startswith("VmRSS:"):
+                    rss += int(line.split()[1]) * 1024
+        with open(f"/proc/{pid}/stat") as stat_file:
+            # Fields after the parenthesised command name; utime and stime are 14 and 15
+            fields = stat_file.read().rsplit(")", 1)[1].split()
+            cpu_ticks += int(fields[11]) + int(fields[12])
+    return {"rss_bytes": rss, "cpu_seconds": cpu_ticks / CLOCK_TICKS}
+
+
+def percentiles(values: List[float]) -> dict:
+    """p50/p90/p99/p99.9/max of a list, or an empty dict."""
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def at(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    return {
+        "p50": at(0.50), "p90": at(0.90), "p99": at(0.99), "p99.9": at(0.999),
+        "max": ordered[-1], "mean": statistics.fmean(ordered),
+    }
+
+
+class LoadTest:
+    """Simulated clients and the writer that triggers events."""
+
+    def __init__(self, args, claims: List[List[dict]]):
+        self.args = args
+        self.claims = claims
+        self.ws_url = args.url.replace("http", "ws", 1).rstrip("/") + "/ws"
+        # Reservation notes -> perf_counter() when its POST was sent
+        self.sent_at: Dict[str, float] = {}
+        self.latencies: List[float] = []
+        self.write_latencies: List[float] = []
+        self.write_errors = 0
+        self.connect_times: List[float] = []
+        self.connect_errors = 0
+        self.disconnects = 0
+        self.received = 0
+        self.expected = 0
+        self.group_sizes: Dict[int, int] = {}
+        self.all_delivered = asyncio.Event()
+        self.stopping = asyncio.Event()
+
+    def count_delivery(self, notes: Optional[str], now: float):
+        started = self.sent_at.get(notes)
+        if started is None:
+            return
+        self.latencies.append((now - started) * 1000)
+        self.received += 1
+        if self.expected and self.received >= self.expected:
+            self.all_delivered.set()
+
+    def handle(self, message: dict, now: float, websocket):
+        message_type = message.get("type")
+        if message_type == "ping":
+            return websocket.send(json.dumps({"type": "pong"}))
+        events = message.get("data") if message_type == "batch" else [message]
+        for event in events or ():
+            if event.get("type") == "reservation_created":
+                self.count_delivery(event["data"].get("notes"), now)
+        return None
+
+    async def client(self, claims: dict, connected: asyncio.Semaphore, ready: List):
+        """One simulated client: connect, then count events until stopped."""
+        url = f"{self.ws_url}?token={create_access_token(claims)}"
+        if self.args.encoding != JSON:
+            url += f"&encoding={self.args.encoding}"
+
+        started = time.perf_counter()
+        try:
+            async with connected:
+                websocket = await websockets.connect(
+                    url,
+                    compression="deflate" if self.args.deflate else None,
+                    ping_interval=None,
+                    max_size=None,
+                    open_timeout=self.args.connect_timeout,
+                )
+        except Exception:
+            self.connect_errors += 1
+            ready.append(None)
+            return
+        self.connect_times.append((time.perf_counter() - started) * 1000)
+        ready.append(claims["group_id"])
+
+        try:
+            async for frame in websocket:
+                now = time.perf_counter()
+                try:
+                    message = decode(frame, self.args.encoding)
+                except ValueError:
+                    continue
+                reply = self.handle(message, now, websocket)
+                if reply is not None:
+                    await reply
+        except websockets.ConnectionClosed:
+            if not self.stopping.is_set():
+                self.disconnects += 1
+        finally:
+            await websocket.close()
+
+    async def write(self, http: httpx.AsyncClient, index: int, base: datetime, token: str):
+        """Create one reservation in a group; its event is what the clients time."""
+        notes = f"load-{os.getpid()}-{index}"
+        start = base + timedelta(hours=index // self.args.groups % (24 * 20))
+        body = {
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(minutes=30)).isoformat(),
+            "notes": notes,
+        }
+        self.sent_at[notes] = started = time.perf_counter()
+        try:
+            response = await http.post("/reservations", json=body, headers={"Authorization": f"Bearer {token}"})
+            response.raise_for_status()
+        except Exception:
+            self.write_errors += 1
+            del self.sent_at[notes]
+            return
+        self.write_latencies.append((time.perf_counter() - started) * 1000)
+
+    async def run(self) -> dict:
+        args = self.args
+        before_connect = read_proc(args.server_pid)
+
+        # Connections round-robin over groups, and over users within a group
+        connected = asyncio.Semaphore(args.connect_concurrency)
+        ready: List = []
+        clients = []
+        connect_started = time.perf_counter()
+        for number in range(args.connections):
+            group_claims = self.claims[number % args.groups]
+            claims = group_claims[number // args.groups % len(group_claims)]
+            clients.append(asyncio.create_task(self.client(claims, connected, ready)))
+        while len(ready) < args.connections:
+            await asyncio.sleep(0.05)
+        connect_seconds = time.perf_counter() - connect_started
+        for group_id in ready:
+            if group_id is not None:
+                self.group_sizes[group_id] = self.group_sizes.get(group_id, 0) + 1
+
+        # Let the server settle before measuring memory
+        await asyncio.sleep(args.settle)
+        after_connect = read_proc(args.server_pid)
+
+        admin_tokens = [create_access_token(group_claims[0]) for group_claims in self.claims]
+        group_ids = [group_claims[0]["group_id"] for group_claims in self.claims]
+        base = (datetime.utcnow() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+
+        writes = []
+        write_started = time.perf_counter()
+        limits = httpx.Limits(max_connections=args.write_concurrency)
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30) as http:
+            for index in range(args.events):
+                delay = write_started + index / args.rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                group = index % args.groups
+                writes.append(asyncio.create_task(self.write(http, index, base, admin_tokens[group])))
+            await asyncio.gather(*writes)
+        write_seconds = time.perf_counter() - write_started
+
+        for index in range(args.events):
+            if f"load-{os.getpid()}-{index}" in self.sent_at:
+                self.expected += self.group_sizes.get(group_ids[index % args.groups], 0)
+        if self.received >= self.expected:
+            self.all_delivered.set()
+        try:
+            await asyncio.wait_for(self.all_delivered.wait(), timeout=args.drain)
+        except asyncio.TimeoutError:
+            pass
+        after_writes = read_proc(args.server_pid)
+
+        self.stopping.set()
+        for task in clients:
+            task.cancel()
+        await asyncio.gather(*clients, return_exceptions=True)
+
+        return self.report(connect_seconds, write_seconds, before_connect, after_connect, after_writes)
+
+    def report(self, connect_seconds, write_seconds, before_connect, after_connect, after_writes) -> dict:
+        args = self.args
+        open_connections = len(self.connect_times)
+        events = len(self.write_latencies)
+        result = {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+            "parameters": {
+                "url": args.url, "connections": args.connections, "groups": args.groups,
+                "events": args.events, "rate": args.rate, "encoding": args.encoding,
+                "deflate": args.deflate, "server_settings": {
+                    "WORKERS": settings.WORKERS,
+                    "WS_EVENT_BUS": settings.WS_EVENT_BUS,
+                    "WS_COALESCE_WINDOW_MS": settings.WS_COALESCE_WINDOW_MS,
+                    "WS_SEND_QUEUE_SIZE": settings.WS_SEND_QUEUE_SIZE,
+                    "database": settings.database_url.split(":", 1)[0],
+                },
+            },
+            "connect": {
+                "open": open_connections, "failed": self.connect_errors,
+                "seconds": round(connect_seconds, 2), "latency_ms": percentiles(self.connect_times),
+            },
+            "writes": {
+                "ok": events, "failed": self.write_errors, "seconds": round(write_seconds, 2),
+                "latency_ms": percentiles(self.write_latencies),
+            },
+            "delivery": {
+                "received": self.received, "expected": self.expected,
+                "unexpected_disconnects": self.disconnects,
+                "latency_ms": percentiles(self.latencies),
+            },
+        }
+
+        if before_connect and after_connect and after_writes:
+            rss_growth = after_connect["rss_bytes"] - before_connect["rss_bytes"]
+            cpu = after_writes["cpu_seconds"] - after_connect["cpu_seconds"]
+            result["server"] = {
+                "rss_before_mb": round(before_connect["rss_bytes"] / 2**20, 1),
+                "rss_after_connect_mb": round(after_connect["rss_bytes"] / 2**20, 1),
+                "rss_per_connection_kb": round(rss_growth / max(open_connections, 1) / 1024, 1),
+                "cpu_seconds_during_writes": round(cpu, 3),
+                "cpu_ms_per_event": round(cpu * 1000 / max(events, 1), 3),
+                "cpu_us_per_delivery": round(cpu * 1e6 / max(self.received, 1), 1),
+            }
+        return result
+
+
+def print_report(result: dict):
+    params = result["parameters"]
+    print(
+        f"\n{params['connections']} connections, {params['groups']} groups, {params['events']} events"
+        f" at {params['rate']}/s, {params['encoding']}{' + deflate' if params['deflate'] else ''}"
+    )
+
+    def row(label: str, latency: dict):
+        if not latency:
+            print(f"  {label:<22} (no samples)")
+            return
+        print(
+            f"  {label:<22} p50 {latency['p50']:8.1f}  p90 {latency['p90']:8.1f}  p99 {latency['p99']:8.1f}"
+            f"  p99.9 {latency['p99.9']:8.1f}  max {latency['max']:8.1f} ms"
+        )
+
+    connect, writes, delivery = result["connect"], result["writes"], result["delivery"]
+    print(f"  connected {connect['open']}, failed {connect['failed']}, in {connect['seconds']} s")
+    print(f"  writes ok {writes['ok']}, failed {writes['failed']}, in {writes['seconds']} s")
+    print(
+        f"  delivered {delivery['received']} of {delivery['expected']},"
+        f" unexpected disconnects {delivery['unexpected_disconnects']}"
+    )
+    row("connect", connect["latency_ms"])
+    row("HTTP write", writes["latency_ms"])
+    row("delivery", delivery["latency_ms"])
+
+    server = result.get("server")
+    if server:
+        print(
+            f"  server RSS {server['rss_before_mb']} -> {server['rss_after_connect_mb']} MB,"
+            f" {server['rss_per_connection_kb']} KB per connection"
+        )
+        print(
+            f"  server CPU {server['cpu_seconds_during_writes']} s: {server['cpu_ms_per_event']} ms per event,"
+            f" {server['cpu_us_per_delivery']} us per delivery"
+        )
+    else:
+        print("  (pass --server-pid to measure server memory and CPU)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test WebSocket delivery against a running server")
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of the server")
+    parser.add_argument("--connections", type=int, default=1000, help="WebSocket connections to open")
+    parser.add_argument("--groups", type=int, default=10, help="Groups to spread connections over")
+    parser.add_argument("--events", type=int, default=100, help="Reservations to create")
+    parser.add_argument("--rate", type=float, default=10.0, help="Reservations created per second")
+    parser.add_argument("--encoding", default=JSON, choices=["json", "msgpack", "cbor"],
+                        help="Wire encoding the clients negotiate")
+    parser.add_argument("--deflate", action=argparse.BooleanOptionalAction, default=True,
+                        help="Offer permessage-deflate, as browsers do")
+    parser.add_argument("--server-pid", type=int, action="append", default=[],
+                        help="Server process to measure; repeat for each worker")
+    parser.add_argument("--connect-concurrency", type=int, default=200,
+                        help="Handshakes in flight at once")
+    parser.add_argument("--connect-timeout", type=float, default=30.0)
+    parser.add_argument("--write-concurrency", type=int, default=20, help="HTTP requests in flight at once")
+    parser.add_argument("--settle", type=float, default=2.0,
+                        help="Seconds to wait after connecting before measuring memory")
+    parser.add_argument("--drain", type=float, default=10.0,
+                        help="Seconds to wait for outstanding deliveries after the last write")
+    parser.add_argument("--create-tables", action="store_true",
+                        help="Create missing tables first (for a fresh SQLite database)")
+    parser.add_argument("--setup-only", action="store_true", help="Seed groups and users, then exit")
+    parser.add_argument("--json", metavar="PATH", help="Also write the report as JSON, for comparing runs")
+    args = parser.parse_args()
+
+    if args.create_tables:
+        init_db()
+    claims = seed(args.groups)
+    if args.setup_only:
+        print(f"Seeded {args.groups} groups of {USERS_PER_GROUP} users")
+        return
+
+    # Every connection is a file descriptor on this side too
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = args.connections + args.write_concurrency + 100
+    if soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(wanted, hard), hard))
+
+    result = asyncio.run(LoadTest(args, claims).run())
+    print_report(result)
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w") as report_file:
+            json.dump(result, report_file, indent=2)
+        print(f"\nReport written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+Script to pick a bcrypt cost for this host.
+Measures password hashing at increasing costs and prints the highest cost
+that fits the latency budget, as a BCRYPT_ROUNDS line for .env. Run it on
+each node class; existing hashes are upgraded on the users' next login.
+"""
+
+import argparse
+from app.core.config import settings
+from app.core.security import BCRYPT_MIN_ROUNDS, calibrate_bcrypt_rounds, time_bcrypt
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pick a bcrypt cost that fits a latency budget")
+    parser.add_argument("--target-ms", type=float, default=settings.BCRYPT_TARGET_MS or 250,
+                        help="Latency budget for one hash, in milliseconds")
+    args = parser.parse_args()
+
+    rounds = calibrate_bcrypt_rounds(args.target_ms)
+
+    print(f"bcrypt hash times on this host (budget {args.target_ms:.0f} ms):")
+    for cost in range(BCRYPT_MIN_ROUNDS, rounds + 2):
+        marker = "  <- selected" if cost == rounds else ""
+        print(f"  cost {cost:2d}: {time_bcrypt(cost):8.1f} ms{marker}")
+    print(f"\nBCRYPT_ROUNDS={rounds}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Shared pytest fixtures.
+Tests run against an in-memory SQLite database built from the ORM models.
+"""
+
+import sys
+sys.path.insert(0, '.')
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.connection import Base
+from app.models.models import Group, User
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def group(db):
+    group = Group(name="Family")
+    db.add(group)
+    db.flush()
+    return group
+
+
+@pytest.fixture
+def user(db, group):
+    user = User(group_id=group.id, username="john", password_hash="x", full_name="John")
+    db.add(user)
+    db.flush()
+    return user
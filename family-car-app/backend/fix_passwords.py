@@ -3,16 +3,17 @@ Script to fix password hashes in the database.
 Run this after installing the updated requirements.
 """
 
-from passlib.context import CryptContext
+import asyncio
 import mysql.connector
 from getpass import getpass
+from app.core.security import password_hasher
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def get_password_hash(password: str) -> str:
-    """Generate a password hash."""
-    return pwd_context.hash(password)
+async def hash_passwords(*passwords: str):
+    """Hash several passwords in parallel in the password hasher's worker processes."""
+    try:
+        return await asyncio.gather(*(password_hasher.hash(password) for password in passwords))
+    finally:
+        password_hasher.shutdown()
 
 def main():
     print("🔧 Family Car Manager - Password Hash Fixer\n")
@@ -35,10 +36,8 @@ def main():
         cursor = conn.cursor()
         
         # Generate new password hashes
-        admin_hash = get_password_hash("admin123")
-        user_hash = get_password_hash("user123")
-        
         print("🔐 Generating new password hashes...")
+        admin_hash, user_hash = asyncio.run(hash_passwords("admin123", "user123"))
         
         # Update admin password
         cursor.execute(
@@ -11,6 +11,12 @@ if __name__ == "__main__":
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=settings.DEBUG,
+        # uvicorn ignores workers when reloading
+        reload=settings.DEBUG and settings.WORKERS == 1,
+        workers=settings.WORKERS,
+        # Client IPs (e.g. for login throttling) come from X-Forwarded-For set by these proxies
+        proxy_headers=True,
+        forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS,
+        ws_per_message_deflate=settings.WS_PER_MESSAGE_DEFLATE,
         log_level="info"
     )
@@ -53,6 +53,8 @@ CREATE TABLE IF NOT EXISTS reservations (
     FOREIGN KEY (group_id) REFERENCES cgroups(id) ON DELETE RESTRICT ON UPDATE CASCADE,
     
     INDEX idx_group_time (group_id, start_time, end_time),
+    INDEX idx_group_start_id (group_id, start_time, id),
+    INDEX idx_group_updated_id (group_id, updated_at, id),
     INDEX idx_user_id (user_id),
     INDEX idx_status (status),
     INDEX idx_start_time (start_time),
@@ -60,8 +62,59 @@ CREATE TABLE IF NOT EXISTS reservations (
     CONSTRAINT chk_end_after_start CHECK (end_time > start_time)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- ============================================
+-- Table: reservation_slots
+-- One row per time bucket (RESERVATION_SLOT_MINUTES) touched by an
+-- active reservation. The primary key rejects concurrent double bookings
+-- in the same transaction as the reservation insert. A conflict on a
+-- partly covered edge bucket is checked against reservations first.
+-- ============================================
+CREATE TABLE IF NOT EXISTS reservation_slots (
+    group_id INT NOT NULL,
+    time_bucket DATETIME NOT NULL,
+    reservation_id INT NOT NULL,
+    
+    PRIMARY KEY (group_id, time_bucket),
+    FOREIGN KEY (group_id) REFERENCES cgroups(id) ON DELETE CASCADE ON UPDATE CASCADE,
+    FOREIGN KEY (reservation_id) REFERENCES reservations(id) ON DELETE CASCADE ON UPDATE CASCADE,
+    
+    INDEX idx_reservation_id (reservation_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ============================================
+-- Table: reservations_history
+-- Completed and cancelled reservations moved out of the hot reservations
+-- table by archive_reservations.py. Partitioned by month of start_time;
+-- the archiver splits new monthly partitions off p_future as needed.
+-- Partitioned InnoDB tables cannot have foreign keys, and the partitioning
+-- column must be part of the primary key.
+-- ============================================
+CREATE TABLE IF NOT EXISTS reservations_history (
+    id INT NOT NULL,
+    user_id INT NOT NULL,
+    group_id INT NOT NULL,
+    start_time DATETIME NOT NULL,
+    end_time DATETIME NOT NULL,
+    status ENUM('pending', 'approved', 'completed', 'cancelled') NOT NULL,
+    notes TEXT DEFAULT NULL,
+    created_at TIMESTAMP NULL DEFAULT NULL,
+    updated_at TIMESTAMP NULL DEFAULT NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    PRIMARY KEY (id, start_time),
+    INDEX idx_history_group_start_id (group_id, start_time, id),
+    INDEX idx_history_group_end (group_id, end_time),
+    INDEX idx_history_user_id (user_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+PARTITION BY RANGE (TO_DAYS(start_time)) (
+    PARTITION p_future VALUES LESS THAN MAXVALUE
+);
+
 -- ============================================
 -- Table: fuel_logs
+-- reservation_id has no foreign key: the reservation may live in either
+-- reservations or reservations_history.
+-- Existing databases: ALTER TABLE fuel_logs DROP FOREIGN KEY fuel_logs_ibfk_1;
 -- ============================================
 CREATE TABLE IF NOT EXISTS fuel_logs (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -73,7 +126,6 @@ CREATE TABLE IF NOT EXISTS fuel_logs (
     cost_paid DECIMAL(8,2) DEFAULT 0.00 COMMENT 'Cost paid for fuel',
     logged_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     
-    FOREIGN KEY (reservation_id) REFERENCES reservations(id) ON DELETE CASCADE ON UPDATE CASCADE,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE RESTRICT ON UPDATE CASCADE,
     
     INDEX idx_reservation_id (reservation_id),
@@ -105,6 +157,55 @@ CREATE TABLE IF NOT EXISTS rules (
     UNIQUE KEY unique_active_rule (group_id, rule_type, is_active)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- ============================================
+-- Table: outbox
+-- Group events written in the same transaction as the change they
+-- describe. The outbox dispatcher claims them (claimed_at), broadcasts
+-- them to WebSocket clients and deletes them, so rows only live until the
+-- next dispatch.
+-- ============================================
+CREATE TABLE IF NOT EXISTS outbox (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    group_id INT NOT NULL,
+    event_type VARCHAR(50) NOT NULL,
+    payload JSON NOT NULL,
+    -- Existing databases: ALTER TABLE outbox ADD COLUMN claimed_at DATETIME NULL AFTER payload;
+    claimed_at DATETIME NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    FOREIGN KEY (group_id) REFERENCES cgroups(id) ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ============================================
+-- Table: refresh_tokens
+-- One row per login session; rotated by POST /auth/refresh.
+-- Only a SHA-256 hash of each token is stored.
+-- ============================================
+CREATE TABLE IF NOT EXISTS refresh_tokens (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    token_hash VARCHAR(64) NOT NULL UNIQUE,
+    expires_at DATETIME NOT NULL,
+    revoked_at DATETIME NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE ON UPDATE CASCADE,
+    INDEX idx_user (user_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ============================================
+-- Table: revoked_tokens
+-- Access tokens revoked before expiry, by JWT ID. Loaded into an
+-- in-memory Bloom filter by every server worker.
+-- ============================================
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    jti VARCHAR(32) PRIMARY KEY,
+    expires_at DATETIME NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    INDEX idx_expires (expires_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 -- ============================================
 -- Trigger: Update fuel_balance after fuel_log insert
 -- ============================================
@@ -0,0 +1,51 @@
+"""
+Tests for the in-memory interval index.
+Run with: pytest test_interval_index.py
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from app.models.models import ReservationStatus
+from app.services.interval_index import GroupIntervalIndex, ReservationIntervalIndex
+
+
+def loaded_index(group_id):
+    index = ReservationIntervalIndex(ttl_seconds=60)
+    index._groups[group_id] = GroupIntervalIndex()
+    return index
+
+
+def test_events_from_other_workers_are_applied():
+    index = loaded_index(1)
+    index.apply_event(1, "reservation_series_created", [
+        {"id": 1, "start_time": "2030-01-07T10:00:00", "end_time": "2030-01-07T11:00:00", "status": "approved"},
+        {"id": 2, "start_time": "2030-01-14T10:00:00", "end_time": "2030-01-14T11:00:00", "status": "pending"},
+    ])
+    index.apply_event(1, "reservation_updated", {
+        "id": 1, "start_time": "2030-01-07T12:00:00", "end_time": "2030-01-07T13:00:00", "status": "approved"
+    })
+    index.apply_event(1, "reservation_deleted", {"id": 2})
+
+    assert index._groups[1].by_id == {1: (datetime(2030, 1, 7, 12), datetime(2030, 1, 7, 13))}
+
+
+def test_cancellation_event_removes_the_interval():
+    index = loaded_index(1)
+    index.apply_change(1, 1, datetime(2030, 1, 7, 10), datetime(2030, 1, 7, 11), ReservationStatus.APPROVED)
+    assert len(index._groups[1]) == 1
+    index.apply_event(1, "reservation_updated", {
+        "id": 1, "start_time": "2030-01-07T10:00:00", "end_time": "2030-01-07T11:00:00", "status": "cancelled"
+    })
+
+    assert len(index._groups[1]) == 0
+
+
+def test_offset_aware_times_are_converted_to_utc():
+    index = loaded_index(1)
+    plus_two = timezone(timedelta(hours=2))
+    index.apply_change(
+        1, 1, datetime(2030, 1, 7, 12, tzinfo=plus_two), datetime(2030, 1, 7, 13, tzinfo=plus_two),
+        ReservationStatus.APPROVED,
+    )
+
+    assert index._groups[1].by_id == {1: (datetime(2030, 1, 7, 10), datetime(2030, 1, 7, 11))}
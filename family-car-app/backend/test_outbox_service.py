@@ -0,0 +1,26 @@
+"""
+Tests for claiming outbox events.
+Run with: pytest test_outbox_service.py
+"""
+
+from app.models.models import Group, OutboxEvent
+from app.services.outbox_service import OutboxService
+
+
+def test_group_events_are_not_claimed_past_another_claim(db, group):
+    other = Group(name="Neighbours")
+    db.add(other)
+    db.flush()
+    for group_id in (group.id, group.id, other.id, group.id, other.id):
+        OutboxService.add(db, group_id, "reservation_updated", {"id": 1})
+    db.commit()
+
+    first = OutboxService.claim_batch(db, limit=2)
+    second = OutboxService.claim_batch(db, limit=10)
+
+    assert [event.id for event in first] == [1, 2]
+    # Event 4 of the first group waits until events 1 and 2 are removed
+    assert [event.id for event in second] == [3, 5]
+
+    OutboxService.remove(db, [1, 2])
+    assert [event.id for event in OutboxService.claim_batch(db, limit=10)] == [4]
@@ -0,0 +1,78 @@
+"""
+Tests for the number of queries run by reservation listings.
+Run with: pytest test_reservation_queries.py
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.models.models import Reservation, ReservationStatus, User
+from app.schemas.schemas import ReservationResponse
+from app.services.reservation_service import ReservationService
+
+
+def add_reservations(db, group_id, user_ids, count, start):
+    db.add_all([
+        Reservation(
+            user_id=user_ids[i % len(user_ids)], group_id=group_id,
+            start_time=start + timedelta(hours=2 * i), end_time=start + timedelta(hours=2 * i + 1),
+            status=ReservationStatus.APPROVED,
+        )
+        for i in range(count)
+    ])
+    db.commit()
+    # Start from an empty identity map, as a request does
+    db.expunge_all()
+
+
+def add_members(db, group_id, count=5):
+    members = [
+        User(group_id=group_id, username=f"member{i}", password_hash="x", full_name=f"Member {i}")
+        for i in range(count)
+    ]
+    db.add_all(members)
+    db.flush()
+    return [member.id for member in members]
+
+
+def list_with_users(engine, db, group_id):
+    """List a group's reservations as the API returns them, recording every statement."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        reservations, _ = ReservationService.get_reservations(db, group_id)
+        responses = [ReservationResponse.model_validate(reservation) for reservation in reservations]
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return responses, statements
+
+
+def test_listing_500_reservations_runs_fixed_number_of_queries(engine, db, group):
+    group_id = group.id
+    add_reservations(db, group_id, add_members(db, group_id), 500, datetime(2030, 1, 7, 8, 0))
+
+    responses, statements = list_with_users(engine, db, group_id)
+
+    assert len(responses) == 500
+    assert {response.user.username for response in responses} == {f"member{i}" for i in range(5)}
+    # Reservations, their users and the history range check; not one query per row
+    assert len(statements) <= 3, statements
+
+
+def test_query_count_does_not_grow_with_rows(engine, db, group):
+    group_id = group.id
+    # Enough distinct users that lazy loading would show up as extra queries
+    user_ids = add_members(db, group_id, count=50)
+
+    add_reservations(db, group_id, user_ids, 10, datetime(2030, 1, 7, 8, 0))
+    _, few = list_with_users(engine, db, group_id)
+
+    add_reservations(db, group_id, user_ids, 490, datetime(2031, 1, 6, 8, 0))
+    _, many = list_with_users(engine, db, group_id)
+
+    assert len(many) == len(few)
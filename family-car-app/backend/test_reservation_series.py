@@ -0,0 +1,34 @@
+"""
+Tests for expanding recurring reservation series.
+Run with: pytest test_reservation_series.py
+"""
+
+from datetime import date, datetime, time
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.schemas import ReservationSeriesCreate
+from app.services.reservation_service import ReservationService
+
+
+def test_occurrences_keep_local_time_across_dst():
+    # Berlin switches from CET (+01:00) to CEST (+02:00) on 2030-03-31
+    series = ReservationSeriesCreate(
+        start_date=date(2030, 3, 29), end_date=date(2030, 4, 1),
+        start_time=time(8, 0), end_time=time(9, 0),
+        weekdays=[0, 4], timezone="Europe/Berlin",
+    )
+
+    assert ReservationService.expand_series(series) == [
+        (datetime(2030, 3, 29, 7), datetime(2030, 3, 29, 8)),
+        (datetime(2030, 4, 1, 6), datetime(2030, 4, 1, 7)),
+    ]
+
+
+def test_unknown_timezone_is_rejected():
+    with pytest.raises(ValidationError):
+        ReservationSeriesCreate(
+            start_date=date(2030, 3, 29), end_date=date(2030, 4, 1),
+            start_time=time(8, 0), end_time=time(9, 0), timezone="Mars/Olympus",
+        )
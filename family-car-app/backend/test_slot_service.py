@@ -0,0 +1,60 @@
+"""
+Tests for reservation slot buckets.
+Run with: pytest test_slot_service.py
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.models.models import Reservation, ReservationSlot, ReservationStatus
+from app.services.slot_service import SlotService
+
+
+def add_reservation(db, group, user, start_time, end_time):
+    reservation = Reservation(
+        user_id=user.id, group_id=group.id,
+        start_time=start_time, end_time=end_time,
+        status=ReservationStatus.APPROVED,
+    )
+    db.add(reservation)
+    db.flush()
+    return reservation
+
+
+def test_buckets_cover_every_touched_bucket():
+    buckets = SlotService.buckets_for(datetime(2030, 1, 7, 10, 5), datetime(2030, 1, 7, 10, 25))
+    assert buckets == [datetime(2030, 1, 7, 10, 0), datetime(2030, 1, 7, 10, 15)]
+
+
+def test_back_to_back_on_bucket_boundary_share_no_bucket():
+    first = SlotService.buckets_for(datetime(2030, 1, 7, 10, 0), datetime(2030, 1, 7, 11, 0))
+    second = SlotService.buckets_for(datetime(2030, 1, 7, 11, 0), datetime(2030, 1, 7, 12, 0))
+    assert not set(first) & set(second)
+
+
+def test_unaligned_overlapping_claim_is_rejected(db, group, user):
+    """A booking that passed the overlap check concurrently still fails on the unique key."""
+    first = add_reservation(db, group, user, datetime(2030, 1, 7, 10, 5), datetime(2030, 1, 7, 11, 5))
+    SlotService.claim(db, [(first.id, group.id, first.start_time, first.end_time)])
+
+    second = add_reservation(db, group, user, datetime(2030, 1, 7, 10, 50), datetime(2030, 1, 7, 11, 50))
+    with pytest.raises(IntegrityError):
+        SlotService.claim(db, [(second.id, group.id, second.start_time, second.end_time)])
+
+
+def test_covered_buckets_skip_partial_edges():
+    buckets = SlotService.buckets_for(datetime(2030, 1, 7, 10, 5), datetime(2030, 1, 7, 10, 45), edges=False)
+    assert buckets == [datetime(2030, 1, 7, 10, 15), datetime(2030, 1, 7, 10, 30)]
+
+
+def test_back_to_back_inside_a_bucket_is_accepted(db, group, user):
+    first = add_reservation(db, group, user, datetime(2030, 1, 7, 10, 0), datetime(2030, 1, 7, 10, 5))
+    SlotService.claim(db, [(first.id, group.id, first.start_time, first.end_time)])
+
+    second = add_reservation(db, group, user, datetime(2030, 1, 7, 10, 5), datetime(2030, 1, 7, 10, 30))
+    SlotService.claim(db, [(second.id, group.id, second.start_time, second.end_time)])
+
+    held = db.query(ReservationSlot.time_bucket).filter(ReservationSlot.reservation_id == second.id).all()
+    assert [bucket for (bucket,) in held] == [datetime(2030, 1, 7, 10, 15)]
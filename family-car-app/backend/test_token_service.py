@@ -0,0 +1,49 @@
+"""
+Tests for refresh token rotation.
+Run with: pytest test_token_service.py
+"""
+
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.models.models import RefreshToken
+from app.services.token_service import TokenService
+
+
+def test_concurrent_refresh_gets_the_same_successor(db, user):
+    token = TokenService.create_refresh_token(db, user.id)
+
+    _, first = TokenService.rotate_refresh_token(db, token)
+    _, second = TokenService.rotate_refresh_token(db, token)
+
+    assert second == first
+    assert TokenService.rotate_refresh_token(db, first)[0].id == user.id
+
+
+def test_reuse_after_grace_window_revokes_all_sessions(db, user):
+    token = TokenService.create_refresh_token(db, user.id)
+    other_session = TokenService.create_refresh_token(db, user.id)
+    _, successor = TokenService.rotate_refresh_token(db, token)
+    for row in db.query(RefreshToken).filter(RefreshToken.revoked_at.isnot(None)):
+        row.revoked_at -= timedelta(seconds=settings.REFRESH_REUSE_GRACE_SECONDS + 1)
+    db.commit()
+
+    with pytest.raises(HTTPException):
+        TokenService.rotate_refresh_token(db, token)
+    for remaining in (successor, other_session):
+        with pytest.raises(HTTPException):
+            TokenService.rotate_refresh_token(db, remaining)
+
+
+def test_reuse_after_successor_was_used_revokes_all_sessions(db, user):
+    token = TokenService.create_refresh_token(db, user.id)
+    _, successor = TokenService.rotate_refresh_token(db, token)
+    _, latest = TokenService.rotate_refresh_token(db, successor)
+
+    with pytest.raises(HTTPException):
+        TokenService.rotate_refresh_token(db, token)
+    with pytest.raises(HTTPException):
+        TokenService.rotate_refresh_token(db, latest)
@@ -0,0 +1,57 @@
+"""
+Tests for routing group events to topic subscriptions.
+Run with: pytest test_topic_index.py
+"""
+
+from datetime import datetime
+
+from app.services.topic_index import GroupTopicIndex, Subscription, select
+from app.services.websocket_manager import merge_events
+
+
+def window(start_hour, end_hour):
+    return Subscription(window_start=datetime(2030, 1, 7, start_hour), window_end=datetime(2030, 1, 7, end_hour))
+
+
+def moved(reservation_id, previous, current):
+    return {"type": "reservation_updated", "data": {
+        "id": reservation_id, "user_id": 1,
+        "start_time": f"2030-01-07T{current[0]:02d}:00:00", "end_time": f"2030-01-07T{current[1]:02d}:00:00",
+        "previous_start_time": f"2030-01-07T{previous[0]:02d}:00:00",
+        "previous_end_time": f"2030-01-07T{previous[1]:02d}:00:00",
+    }}
+
+
+def test_window_subscription_gets_only_overlapping_events():
+    index = GroupTopicIndex()
+    index.add("morning", window(8, 12))
+    index.add("evening", window(17, 21))
+
+    message = {"type": "reservation_created", "data": {
+        "id": 1, "user_id": 1, "start_time": "2030-01-07T09:00:00", "end_time": "2030-01-07T10:00:00"
+    }}
+
+    assert set(index.route(message)) == {"morning"}
+
+
+def test_update_reaches_the_window_the_reservation_left():
+    index = GroupTopicIndex()
+    index.add("morning", window(8, 12))
+    index.add("afternoon", window(13, 16))
+    index.add("evening", window(17, 21))
+
+    message = moved(1, previous=(9, 10), current=(14, 15))
+
+    assert set(index.route(message)) == {"morning", "afternoon"}
+    assert select(message, window(8, 12)) == message
+
+
+def test_merged_moves_keep_the_first_previous_times():
+    merged = merge_events(moved(1, previous=(9, 10), current=(14, 15)), moved(1, previous=(14, 15), current=(18, 19)))
+
+    index = GroupTopicIndex()
+    index.add("morning", window(8, 12))
+    index.add("evening", window(17, 21))
+
+    assert merged["data"]["previous_start_time"] == "2030-01-07T09:00:00"
+    assert set(index.route(merged)) == {"morning", "evening"}
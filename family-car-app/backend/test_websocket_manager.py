@@ -0,0 +1,38 @@
+"""
+Tests for WebSocket send queues.
+Run with: pytest test_websocket_manager.py
+"""
+
+import asyncio
+import json
+
+from app.services.websocket_manager import ConnectionManager
+
+
+class StalledWebSocket:
+    """A client that accepts but never reads."""
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, data):
+        await asyncio.Event().wait()
+
+
+def test_dropped_event_is_followed_by_snapshot_required():
+    async def scenario():
+        manager = ConnectionManager(max_queue=2, overflow_policy="drop_oldest", coalesce_window_ms=0)
+        websocket = StalledWebSocket()
+        await manager.connect(websocket, 1)
+        for reservation_id in range(1, 5):
+            await manager.deliver_to_group({"type": "reservation_updated", "data": {"id": reservation_id}}, 1)
+        queued = [json.loads(frame) for _, frame in manager.clients[websocket].queue]
+        manager.disconnect(websocket, 1)
+        return queued
+
+    queued = asyncio.run(scenario())
+
+    assert [message["type"] for message in queued] == [
+        "reservation_updated", "reservation_updated", "snapshot_required"
+    ]
+    assert queued[-1]["data"]["seq"] == queued[-2]["seq"] == 4
@@ -34,11 +34,11 @@ export const AuthProvider = ({ children }) => {
           setToken(savedToken);
           setUser(JSON.parse(savedUser));
           
-          // Verify token is still valid
+          // Verify token is still valid (refreshing it if it expired)
           await authAPI.verifyToken();
           
           // Connect to WebSocket
-          wsService.connect(savedToken);
+          wsService.connect(localStorage.getItem('token'));
         } catch (error) {
           console.error('Token verification failed:', error);
           logout();
@@ -57,12 +57,13 @@ export const AuthProvider = ({ children }) => {
   const login = async (credentials) => {
     try {
       const response = await authAPI.login(credentials);
-      const { access_token, user: userData } = response.data;
+      const { access_token, refresh_token, user: userData } = response.data;
 
       // Save to state and localStorage
       setToken(access_token);
       setUser(userData);
       localStorage.setItem('token', access_token);
+      localStorage.setItem('refresh_token', refresh_token);
       localStorage.setItem('user', JSON.stringify(userData));
 
       // Connect to WebSocket
@@ -83,12 +84,13 @@ export const AuthProvider = ({ children }) => {
   const register = async (data) => {
     try {
       const response = await authAPI.register(data);
-      const { access_token, user: userData } = response.data;
+      const { access_token, refresh_token, user: userData } = response.data;
 
       // Save to state and localStorage
       setToken(access_token);
       setUser(userData);
       localStorage.setItem('token', access_token);
+      localStorage.setItem('refresh_token', refresh_token);
       localStorage.setItem('user', JSON.stringify(userData));
 
       // Connect to WebSocket
@@ -107,9 +109,16 @@ export const AuthProvider = ({ children }) => {
    * Logout user.
    */
   const logout = () => {
+    // Revoke the session on the server; local state is cleared either way
+    const savedToken = localStorage.getItem('token');
+    if (savedToken) {
+      authAPI.logout(savedToken, localStorage.getItem('refresh_token')).catch(() => {});
+    }
+
     setToken(null);
     setUser(null);
     localStorage.removeItem('token');
+    localStorage.removeItem('refresh_token');
     localStorage.removeItem('user');
     
     // Disconnect WebSocket
@@ -34,11 +34,62 @@ const Dashboard = () => {
 
   useEffect(() => { loadReservations(); }, [filter]);
 
+  const matchesFilter = (res) => {
+    if (filter === 'my') return res.user_id === user.id;
+    if (filter === 'upcoming') return res.status === 'approved';
+    return true;
+  };
+
+  useEffect(() => {
+    // Events were missed while disconnected: fetch only what changed since
+    // the last sync, and reload everything if that is not possible
+    const catchUp = async () => {
+      let since = wsService.changesCursor;
+      if (!since) {
+        loadReservations();
+        return;
+      }
+      try {
+        const changed = [];
+        let page;
+        do {
+          page = (await reservationsAPI.getChanges({ since })).data;
+          changed.push(...page.changes);
+          since = page.next_cursor;
+        } while (page.has_more);
+        wsService.changesCursor = since;
+
+        const byId = new Map(changed.map((res) => [res.id, res]));
+        setReservations((prev) => {
+          const kept = prev.filter((res) => !byId.has(res.id));
+          const merged = [...kept, ...[...byId.values()].filter(matchesFilter)];
+          return merged.sort((a, b) => new Date(b.start_time) - new Date(a.start_time));
+        });
+      } catch (error) {
+        console.error('Failed to fetch reservation changes:', error);
+        loadReservations();
+      }
+    };
+
+    wsService.on('snapshot_required', catchUp);
+    return () => wsService.off('snapshot_required', catchUp);
+  }, [filter]);
+
   useEffect(() => {
     const handleReservationCreated = (data) => {
-      setReservations((prev) => [data, ...prev]);
+      // Events are delivered at least once; ignore a repeat
+      setReservations((prev) => (prev.some((res) => res.id === data.id) ? prev : [data, ...prev]));
       toast.success('New reservation created!');
     };
+    const handleReservationSeriesCreated = (data) => {
+      // One event carries every booked occurrence; add the ones not listed yet
+      setReservations((prev) => {
+        const known = new Set(prev.map((res) => res.id));
+        const added = data.filter((res) => !known.has(res.id) && matchesFilter(res));
+        return [...added, ...prev].sort((a, b) => new Date(b.start_time) - new Date(a.start_time));
+      });
+      toast.success(`${data.length} reservations created!`);
+    };
     const handleReservationUpdated = (data) => {
       setReservations((prev) => prev.map((res) => (res.id === data.id ? data : res)));
       toast.success('Reservation updated!');
@@ -49,15 +100,17 @@ const Dashboard = () => {
     };
 
     wsService.on('reservation_created', handleReservationCreated);
+    wsService.on('reservation_series_created', handleReservationSeriesCreated);
     wsService.on('reservation_updated', handleReservationUpdated);
     wsService.on('reservation_deleted', handleReservationDeleted);
 
     return () => {
       wsService.off('reservation_created', handleReservationCreated);
+      wsService.off('reservation_series_created', handleReservationSeriesCreated);
       wsService.off('reservation_updated', handleReservationUpdated);
       wsService.off('reservation_deleted', handleReservationDeleted);
     };
-  }, []);
+  }, [filter]);
 
   const handleReservationCreated = () => {
     setShowCreateModal(false);
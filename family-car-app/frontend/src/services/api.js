@@ -134,15 +134,69 @@ api.interceptors.request.use(
   (error) => Promise.reject(error)
 );
 
+// ==================================
+// Access token refresh
+// ==================================
+let refreshPromise = null;
+
+// Requests whose 401 means bad credentials, not an expired access token
+const NO_REFRESH_URLS = ['/auth/login', '/auth/register', '/auth/refresh'];
+
+/**
+ * Exchange the stored refresh token for a new access token.
+ * Concurrent callers share one request, since each refresh token works once.
+ */
+export const refreshAccessToken = () => {
+  if (!refreshPromise) {
+    const refreshToken = localStorage.getItem('refresh_token');
+    const request = refreshToken
+      ? axios.post(`${API_BASE_URL}/auth/refresh`, { refresh_token: refreshToken })
+      : Promise.reject(new Error('No refresh token'));
+
+    refreshPromise = request
+      .then((response) => {
+        const { access_token, refresh_token, user } = response.data;
+        localStorage.setItem('token', access_token);
+        localStorage.setItem('refresh_token', refresh_token);
+        localStorage.setItem('user', JSON.stringify(user));
+        return access_token;
+      })
+      .finally(() => {
+        refreshPromise = null;
+      });
+  }
+  return refreshPromise;
+};
+
 // ==================================
 // Response interceptor – handle 401
 // ==================================
 api.interceptors.response.use(
   (response) => response,
-  (error) => {
+  async (error) => {
+    const original = error.config;
+
+    // Access token expired or revoked: refresh once and retry
+    if (
+      error.response?.status === 401 &&
+      original &&
+      !original._retried &&
+      !NO_REFRESH_URLS.includes(original.url)
+    ) {
+      original._retried = true;
+      try {
+        const token = await refreshAccessToken();
+        original.headers.Authorization = `Bearer ${token}`;
+        return api(original);
+      } catch (refreshError) {
+        // Session is over; fall through and clear auth data
+      }
+    }
+
     if (error.response?.status === 401) {
       // Clear auth data ONLY
       localStorage.removeItem('token');
+      localStorage.removeItem('refresh_token');
       localStorage.removeItem('user');
 
       // ❗ אל תעשה redirect כאן
@@ -162,6 +216,11 @@ export const authAPI = {
   login: (credentials) => api.post('/auth/login', credentials),
   register: (data) => api.post('/auth/register', data),
   verifyToken: () => api.post('/auth/verify'),
+  // Token passed explicitly: local auth data is cleared before the request goes out
+  logout: (token, refreshToken) =>
+    api.post('/auth/logout', refreshToken ? { refresh_token: refreshToken } : undefined, {
+      headers: { Authorization: `Bearer ${token}` },
+    }),
 };
 
 // ============================================
@@ -181,6 +240,8 @@ export const usersAPI = {
 export const reservationsAPI = {
   create: (data) => api.post('/reservations', data),
   getAll: (params) => api.get('/reservations', { params }),
+  getAvailability: (params) => api.get('/reservations/availability', { params }),
+  getChanges: (params) => api.get('/reservations/changes', { params }),
   getById: (id) => api.get(`/reservations/${id}`),
   update: (id, data) => api.put(`/reservations/${id}`, data),
   delete: (id) => api.delete(`/reservations/${id}`),
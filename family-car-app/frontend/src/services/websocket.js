@@ -3,6 +3,8 @@
  * Manages WebSocket connection and event handling.
  */
 
+import { refreshAccessToken } from './api';
+
 const WS_BASE_URL = 'ws://localhost:8000';
 
 class WebSocketService {
@@ -12,6 +14,14 @@ class WebSocketService {
     this.reconnectAttempts = 0;
     this.maxReconnectAttempts = 5;
     this.reconnectDelay = 3000;
+    // Position in the group's event stream, used to resume after a reconnect
+    this.epoch = null;
+    this.lastSeq = null;
+    // Cursor for /reservations/changes: the client holds every change before it.
+    // Lets listeners catch up after snapshot_required instead of reloading.
+    this.changesCursor = null;
+    // Topic subscription ({ events, mine, from, to }); null receives everything
+    this.subscription = null;
   }
 
   /**
@@ -23,7 +33,16 @@ class WebSocketService {
       return;
     }
 
-    const wsUrl = `${WS_BASE_URL}/ws?token=${token}`;
+    let wsUrl = `${WS_BASE_URL}/ws?token=${token}`;
+    if (this.lastSeq !== null) {
+      wsUrl += `&resume_from=${this.lastSeq}&epoch=${this.epoch}`;
+    }
+    if (this.subscription) {
+      const { events, mine, from, to } = this.subscription;
+      if (events) wsUrl += `&events=${events.join(',')}`;
+      if (mine) wsUrl += '&mine=true';
+      if (from && to) wsUrl += `&from=${encodeURIComponent(from)}&to=${encodeURIComponent(to)}`;
+    }
     
     try {
       this.ws = new WebSocket(wsUrl);
@@ -49,10 +68,24 @@ class WebSocketService {
         this.emit('error', error);
       };
 
-      this.ws.onclose = () => {
+      this.ws.onclose = (event) => {
         console.log('WebSocket disconnected');
         this.emit('disconnected', {});
-        this.attemptReconnect(token);
+        if (event.code === 1008) {
+          // Access token expired or revoked: reconnect with a refreshed one
+          refreshAccessToken()
+            .then((newToken) => this.attemptReconnect(newToken))
+            .catch(() => console.error('WebSocket token refresh failed'));
+          return;
+        }
+        if (event.code === 4400) {
+          // Subscription parameters rejected: retrying them would fail again,
+          // so fall back to receiving every group event
+          console.error('WebSocket subscription rejected:', event.reason);
+          this.subscription = null;
+          this.emit('subscription_rejected', { detail: event.reason });
+        }
+        this.attemptReconnect(localStorage.getItem('token') || token);
       };
     } catch (error) {
       console.error('Error connecting to WebSocket:', error);
@@ -76,6 +109,17 @@ class WebSocketService {
     }, this.reconnectDelay);
   }
 
+  /**
+   * Receive only some group events: { events: [...], mine: true, from, to }.
+   * Pass null to receive everything again. Kept across reconnects.
+   */
+  subscribe(subscription) {
+    this.subscription = subscription;
+    if (this.ws?.readyState === WebSocket.OPEN) {
+      this.send({ type: 'subscribe', data: subscription || {} });
+    }
+  }
+
   /**
    * Disconnect from WebSocket server.
    */
@@ -84,13 +128,48 @@ class WebSocketService {
       this.ws.close();
       this.ws = null;
     }
+    this.epoch = null;
+    this.lastSeq = null;
+    this.changesCursor = null;
   }
 
   /**
    * Handle incoming WebSocket message.
    */
   handleMessage(message) {
-    const { type, data } = message;
+    const { type, data, seq } = message;
+
+    if (type === 'ping') {
+      // Server heartbeat; connections that stop answering are closed
+      this.send({ type: 'pong', data });
+      return;
+    }
+
+    if (type === 'connected') {
+      this.epoch = data.epoch;
+      // Fresh connection: start from the current position. When resuming,
+      // the replayed events that follow advance lastSeq instead.
+      if (this.lastSeq === null) {
+        this.lastSeq = data.seq;
+      }
+      if (this.changesCursor === null) {
+        this.changesCursor = data.changes_cursor ?? null;
+      }
+    } else if (type === 'snapshot_required') {
+      // Missed events are no longer buffered; listeners catch up from
+      // changesCursor, or refetch everything when it is null
+      this.epoch = data.epoch;
+      this.lastSeq = data.seq;
+    } else if (seq !== undefined) {
+      this.lastSeq = seq;
+    }
+
+    if (type === 'batch') {
+      // Several coalesced events in one frame; deliver them in order
+      data.forEach((event) => this.emit(event.type, event.data));
+      return;
+    }
+
     this.emit(type, data);
   }
 